@@ -4,24 +4,79 @@ This module provides the base functionality that all specific data collectors
 (DVF, SIRENE, INSEE, PLU) will inherit from.
 """
 
+import asyncio
+import gzip
+import hashlib
+import inspect
+import json
 import logging
-import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+import aiohttp
+import requests
+from tenacity import stop_after_attempt, wait_exponential
 
 from config.config_loader import get_config
 from utils.gcs_client import get_gcs_client
 from utils.utils import (
-    setup_logging, download_file_with_retry, upload_to_gcs,
-    NetworkError, StorageError
+    setup_logging, build_http_session, download_file_with_retry, download_file_async,
+    upload_to_gcs, dumps_json, extract_json_field, NetworkError, StorageError
 )
 
 
+# Last run time per (bucket, last_run.json path), shared by collectors in the process
+_LAST_RUN_CACHE: Dict[Tuple[str, str], datetime] = {}
+
+# Signature of the last saved metadata per (bucket, last_run.sig path)
+_METADATA_SIG_CACHE: Dict[Tuple[str, str], str] = {}
+
+# Run-specific fields left out of the metadata signature, at any nesting level
+# (collector results carry their own timestamps and per-layer timings)
+_SIGNATURE_EXCLUDED_FIELDS = frozenset({
+    'start_time', 'end_time', 'duration_seconds',
+    'timestamp', 'processing_time_seconds', 'watermark'
+})
+
+# Custom object metadata keys and the source response headers they record,
+# used for conditional requests on later runs
+_SOURCE_VALIDATOR_HEADERS = {
+    'source_etag': 'ETag',
+    'source_last_modified': 'Last-Modified'
+}
+
+# Ask for the stored bytes as-is: byte ranges must not be transport-encoded
+IDENTITY_ENCODING = {'Accept-Encoding': 'identity'}
+
+# Resumable upload chunk size for streamed uploads (a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Size of each byte range fetched for parallel composite uploads
+_RANGE_PART_SIZE = 64 * 1024 * 1024
+
+# GCS limit on the number of objects combined by one compose request
+_MAX_COMPOSE_COMPONENTS = 32
+
+# Minimum interval between runs for each update schedule
+_SCHEDULE_DELTAS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(days=7),
+    'monthly': timedelta(days=30),
+    'yearly': timedelta(days=365)
+}
+
+
 class BaseCollector(ABC):
     """Abstract base class for data collectors."""
     
+    # Download pool shared by every collector in the process (created lazily)
+    _download_executor: Optional[ThreadPoolExecutor] = None
+    _download_executor_lock = threading.Lock()
+    
     def __init__(self, collector_name: str):
         """Initialize the base collector.
         
@@ -43,6 +98,35 @@ class BaseCollector(ABC):
         self.max_retries = self.config.get('processing_config.max_retries', 3)
         self.retry_delay = self.config.get('processing_config.retry_delay_seconds', 30)
         self.timeout = self.config.get('processing_config.timeout_seconds', 300)
+        self.chunk_size = self.config.get('processing_config.chunk_size_bytes', 1024 * 1024)
+        self.max_concurrent_downloads = self.config.get('processing_config.max_concurrent_downloads', 8)
+        self.update_schedule = self.config.get(
+            f'processing_config.update_schedule.{collector_name}',
+            'daily'
+        )
+        self.schedule_interval = _SCHEDULE_DELTAS.get(self.update_schedule)
+        
+        # Feature flags
+        self.enable_idempotency_check = self.config.get('features.enable_idempotency_check', True)
+        self.enable_file_comparison = self.config.get('features.enable_file_comparison', True)
+        
+        # Progress counters updated by report_progress()/report_error() during collect()
+        self._progress: Dict[str, Any] = {'files_collected': 0, 'errors': []}
+        self._progress_lock = threading.Lock()
+        
+        # Download retry policy built once from the processing configuration
+        self._download_with_retry = download_file_with_retry.retry_with(
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_exponential(multiplier=1, min=4, max=self.retry_delay)
+        )
+        
+        # HTTP sessions reused across downloads (the aiohttp one is created lazily)
+        self.http_session = build_http_session()
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        
+        # One limit on concurrent streamed transfers, shared by every pool a collector
+        # nests (files, years, byte-range parts) so the session's pool is not exceeded
+        self._transfer_slots = threading.BoundedSemaphore(self.max_concurrent_downloads)
         
         # Paths
         self.raw_path = f"raw/{collector_name}"
@@ -75,6 +159,9 @@ class BaseCollector(ABC):
     def validate_data(self, data: Any) -> bool:
         """Validate collected data before storage.
         
+        When validating many records, bind the method once outside the loop
+        (``validate = self.validate_data``) rather than looking it up per record.
+        
         Args:
             data: Data to validate
             
@@ -85,7 +172,17 @@ class BaseCollector(ABC):
     
     def run(self) -> Dict[str, Any]:
         """Run the complete collection process."""
+        return asyncio.run(self.run_async())
+    
+    async def run_async(self) -> Dict[str, Any]:
+        """Run the complete collection process as a coroutine.
+        
+        Subclasses may define collect() as a coroutine; synchronous collect()
+        implementations and blocking GCS calls are run in a worker thread so
+        several collectors can be awaited concurrently.
+        """
         start_time = datetime.now(timezone.utc)
+        start_ns = time.perf_counter_ns()
         result = {
             'collector': self.collector_name,
             'start_time': start_time.isoformat(),
@@ -94,17 +191,25 @@ class BaseCollector(ABC):
             'errors': []
         }
         
+        with self._progress_lock:
+            self._progress = {'files_collected': 0, 'errors': []}
+        
         try:
             self.logger.info(f"Starting {self.collector_name} collection")
             
             # Check if collection should run (idempotency)
-            if self.should_collect():
+            if await asyncio.to_thread(self.should_collect):
                 # Run the collection
-                collection_result = self.collect()
+                collect = self.collect
+                if inspect.iscoroutinefunction(collect):
+                    collection_result = await collect()
+                else:
+                    collection_result = await asyncio.to_thread(collect)
                 result.update(collection_result)
+                self._merge_progress(result)
                 
                 # Save metadata
-                self.save_metadata(result)
+                await asyncio.to_thread(self.save_metadata, result, start_time)
                 
                 result['status'] = 'completed'
             else:
@@ -121,9 +226,11 @@ class BaseCollector(ABC):
             })
         
         finally:
-            end_time = datetime.now(timezone.utc)
-            result['end_time'] = end_time.isoformat()
-            result['duration_seconds'] = (end_time - start_time).total_seconds()
+            # The aiohttp session is bound to this event loop
+            await self.aclose()
+            
+            result['end_time'] = datetime.now(timezone.utc).isoformat()
+            result['duration_seconds'] = (time.perf_counter_ns() - start_ns) / 1e9
             
             self.logger.info(
                 f"Completed {self.collector_name} collection - "
@@ -134,79 +241,224 @@ class BaseCollector(ABC):
         
         return result
     
+    def report_progress(self, file_path: str) -> None:
+        """Record a successfully collected file.
+        
+        Subclasses can call this after each upload instead of returning a
+        running count from collect(). Safe to call from worker threads.
+        
+        Args:
+            file_path: GCS path of the collected file
+        """
+        with self._progress_lock:
+            self._progress['files_collected'] += 1
+            count = self._progress['files_collected']
+        self.logger.info(f"Collected {file_path} ({count} files so far)")
+    
+    def report_error(self, error: str, **context: Any) -> None:
+        """Record a non-fatal collection error.
+        
+        Args:
+            error: Error description
+            **context: Additional fields stored with the error (e.g. url)
+        """
+        with self._progress_lock:
+            self._progress['errors'].append({'error': error, **context})
+        self.logger.error(error)
+    
+    def _merge_progress(self, result: Dict[str, Any]) -> None:
+        """Add counters reported during collect() to the run result."""
+        with self._progress_lock:
+            files_collected = self._progress['files_collected']
+            errors = list(self._progress['errors'])
+        
+        if files_collected:
+            result['files_collected'] = result.get('files_collected', 0) + files_collected
+        if errors:
+            result['errors'] = list(result.get('errors', [])) + errors
+    
     def should_collect(self) -> bool:
         """Check if collection should run based on idempotency rules.
         
         Returns:
             True if collection should proceed, False otherwise
         """
-        if not self.config.get('features.enable_idempotency_check', True):
+        if not self.enable_idempotency_check:
             return True
         
         # Check last run metadata
         last_run_path = f"{self.metadata_path}/last_run.json"
+        cache_key = (self.gcs_client.bucket_name, last_run_path)
         
         try:
-            # Download last run metadata if exists
-            temp_path = "/tmp/last_run.json"
-            self.gcs_client.download_file(last_run_path, temp_path)
-            
-            with open(temp_path, 'r') as f:
-                last_run = json.load(f)
-            
-            # Check update schedule
-            schedule = self.config.get(
-                f'processing_config.update_schedule.{self.collector_name}',
-                'daily'
-            )
+            last_run_time = _LAST_RUN_CACHE.get(cache_key)
+            if last_run_time is None:
+                last_run_time = self._fetch_last_run_time(last_run_path)
+                if last_run_time is None:
+                    return True
+                _LAST_RUN_CACHE[cache_key] = last_run_time
             
-            last_run_time = datetime.fromisoformat(last_run['end_time'])
-            time_since_last_run = datetime.now(timezone.utc) - last_run_time
-            
-            # Simple schedule check (can be enhanced)
-            if schedule == 'daily' and time_since_last_run.days < 1:
-                return False
-            elif schedule == 'weekly' and time_since_last_run.days < 7:
-                return False
-            elif schedule == 'monthly' and time_since_last_run.days < 30:
-                return False
-            elif schedule == 'yearly' and time_since_last_run.days < 365:
+            if not self._schedule_elapsed(last_run_time):
                 return False
             
         except Exception as e:
             # If no metadata or error, proceed with collection
-            self.logger.debug(f"No previous run metadata found: {e}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"No previous run metadata found: {e}")
         
         return True
     
-    def save_metadata(self, metadata: Dict[str, Any]) -> None:
+    def _fetch_last_run_time(self, last_run_path: str) -> Optional[datetime]:
+        """Get the time of the last completed run from GCS.
+        
+        The object's update time is read from its metadata first so the
+        document body is only downloaded when that is unavailable. Runs whose
+        metadata did not change only touch last_run_touch.txt, so the later of
+        the two objects is used.
+        
+        Args:
+            last_run_path: GCS path of last_run.json
+            
+        Returns:
+            Time of the last run, or None if no run was recorded
+        """
+        blob = self.gcs_client.get_blob(last_run_path)
+        if blob is None:
+            return None
+        
+        touch_blob = self.gcs_client.get_blob(f"{self.metadata_path}/last_run_touch.txt")
+        touch_time = touch_blob.updated if touch_blob is not None else None
+        
+        if blob.updated is not None:
+            last_run_time = blob.updated
+        else:
+            # Read last run metadata in memory
+            data = self.gcs_client.download_as_bytes(last_run_path)
+            
+            end_time = extract_json_field(data, 'end_time')
+            if end_time is None:
+                return touch_time
+            last_run_time = datetime.fromisoformat(end_time)
+        
+        if touch_time is not None and touch_time > last_run_time:
+            return touch_time
+        return last_run_time
+    
+    def _schedule_elapsed(self, last_run_time: datetime) -> bool:
+        """Check whether the update schedule allows a new run.
+        
+        Args:
+            last_run_time: Time of the last run
+            
+        Returns:
+            True if enough time has passed since the last run
+        """
+        if self.schedule_interval is None:
+            return True
+        
+        time_since_last_run = datetime.now(timezone.utc) - last_run_time
+        return time_since_last_run >= self.schedule_interval
+    
+    def save_metadata(self, metadata: Dict[str, Any],
+                      run_time: Optional[datetime] = None) -> None:
         """Save collection metadata to GCS.
         
+        When the metadata matches the previous run apart from its timestamps,
+        the run record and last_run.json are left untouched and only
+        last_run_touch.txt is updated.
+        
         Args:
             metadata: Metadata dictionary to save
+            run_time: Time used to name the run record (defaults to now)
         """
-        # Save timestamped metadata
-        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-        metadata_file = f"{self.metadata_path}/run_{timestamp}.json"
-        
-        temp_path = f"/tmp/metadata_{timestamp}.json"
-        with open(temp_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        self.gcs_client.upload_file(
-            temp_path,
-            metadata_file,
-            content_type='application/json'
-        )
+        run_time = run_time or datetime.now(timezone.utc)
+        last_run_path = f"{self.metadata_path}/last_run.json"
+        signature_path = f"{self.metadata_path}/last_run.sig"
+        signature = self._metadata_signature(metadata)
         
-        # Also save as last_run.json
-        self.gcs_client.copy_file(
-            metadata_file,
-            f"{self.metadata_path}/last_run.json"
-        )
+        if signature == self._fetch_metadata_signature(signature_path):
+            self.gcs_client.upload_from_bytes(
+                run_time.isoformat().encode('utf-8'),
+                f"{self.metadata_path}/last_run_touch.txt",
+                content_type='text/plain'
+            )
+            self.logger.info(f"Metadata unchanged for {self.collector_name}, skipping last_run.json update")
+        else:
+            # Save timestamped metadata
+            timestamp = run_time.strftime('%Y%m%d_%H%M%S')
+            metadata_file = f"{self.metadata_path}/run_{timestamp}.json"
+            # GCS decompresses gzip-encoded objects for clients that do not accept it
+            payload = gzip.compress(dumps_json(metadata), compresslevel=1)
+            
+            # Write the run record and last_run.json in parallel from memory
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                uploads = [
+                    executor.submit(
+                        self.gcs_client.upload_from_bytes,
+                        payload,
+                        gcs_path,
+                        content_type='application/json',
+                        content_encoding='gzip'
+                    )
+                    for gcs_path in (metadata_file, last_run_path)
+                ]
+                for upload in uploads:
+                    upload.result()
+            
+            self.gcs_client.upload_from_bytes(
+                signature.encode('ascii'), signature_path, content_type='text/plain'
+            )
+            _METADATA_SIG_CACHE[(self.gcs_client.bucket_name, signature_path)] = signature
+        
+        _LAST_RUN_CACHE[(self.gcs_client.bucket_name, last_run_path)] = datetime.now(timezone.utc)
+    
+    @staticmethod
+    def _metadata_signature(metadata: Dict[str, Any]) -> str:
+        """Compute a stable hash of metadata, ignoring run timestamps and timings.
+        
+        Args:
+            metadata: Metadata dictionary
+            
+        Returns:
+            Hex digest of the metadata content
+        """
+        def strip_run_fields(value: Any) -> Any:
+            if isinstance(value, dict):
+                return {
+                    k: strip_run_fields(v) for k, v in value.items()
+                    if k not in _SIGNATURE_EXCLUDED_FIELDS
+                }
+            if isinstance(value, list):
+                return [strip_run_fields(item) for item in value]
+            return value
         
-        # Cleanup temp file
-        os.remove(temp_path)
+        content = strip_run_fields(metadata)
+        encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _fetch_metadata_signature(self, signature_path: str) -> Optional[str]:
+        """Get the signature of the last saved metadata, cached in-process.
+        
+        Args:
+            signature_path: GCS path of last_run.sig
+            
+        Returns:
+            Stored signature, or None if none could be read
+        """
+        cache_key = (self.gcs_client.bucket_name, signature_path)
+        signature = _METADATA_SIG_CACHE.get(cache_key)
+        if signature is not None:
+            return signature
+        
+        try:
+            signature = self.gcs_client.download_as_bytes(signature_path).decode('ascii')
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"No previous metadata signature found: {e}")
+            return None
+        
+        _METADATA_SIG_CACHE[cache_key] = signature
+        return signature
     
     def download_file(self, url: str, local_path: str) -> bool:
         """Download a file with retry logic using centralized utility.
@@ -219,12 +471,101 @@ class BaseCollector(ABC):
             True if successful, False otherwise
         """
         try:
-            chunk_size = self.config.get('processing_config.chunk_size_bytes', 8192)
-            return download_file_with_retry(
+            return self._download_with_retry(
                 url=url,
                 local_path=local_path,
                 timeout=self.timeout,
-                chunk_size=chunk_size
+                chunk_size=self.chunk_size,
+                session=self.http_session
+            )
+        except (NetworkError, StorageError) as e:
+            self.logger.error(f"Failed to download {url}: {e}")
+            return False
+    
+    def _get_download_executor(self) -> ThreadPoolExecutor:
+        """Return the shared download thread pool, creating it on first use."""
+        executor = BaseCollector._download_executor
+        if executor is None:
+            with BaseCollector._download_executor_lock:
+                executor = BaseCollector._download_executor
+                if executor is None:
+                    executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrent_downloads,
+                        thread_name_prefix="collector-download"
+                    )
+                    BaseCollector._download_executor = executor
+        return executor
+    
+    def download_files(self, url_to_path: Dict[str, str]) -> Dict[str, bool]:
+        """Download several files concurrently using the shared thread pool.
+        
+        Each download keeps the per-file retry logic of download_file().
+        
+        Args:
+            url_to_path: Mapping of URL to local destination path
+            
+        Returns:
+            Mapping of URL to download success
+            
+        Raises:
+            Exception: The first unexpected error raised by a download; pending
+                downloads are cancelled before it is propagated
+        """
+        executor = self._get_download_executor()
+        futures = {
+            executor.submit(self.download_file, url, local_path): url
+            for url, local_path in url_to_path.items()
+        }
+        
+        results = {}
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+        
+        return results
+    
+    def _get_aio_session(self) -> aiohttp.ClientSession:
+        """Return the collector's aiohttp session, creating it on first use."""
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20)
+            )
+        return self._aio_session
+    
+    async def aclose(self) -> None:
+        """Close the collector's aiohttp session if one was opened."""
+        if self._aio_session is not None:
+            await self._aio_session.close()
+            self._aio_session = None
+    
+    async def __aenter__(self) -> 'BaseCollector':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+    
+    async def _adownload(self, url: str, local_path: str) -> bool:
+        """Download a file asynchronously using centralized utility.
+        
+        Args:
+            url: URL to download from
+            local_path: Local path to save file
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            return await download_file_async(
+                url=url,
+                local_path=local_path,
+                timeout=self.timeout,
+                chunk_size=self.chunk_size,
+                max_attempts=self.max_retries,
+                session=self._get_aio_session()
             )
         except (NetworkError, StorageError) as e:
             self.logger.error(f"Failed to download {url}: {e}")
@@ -241,16 +582,174 @@ class BaseCollector(ABC):
             True if uploaded or already exists with same content, False on error
         """
         try:
-            check_existing = self.config.get('features.enable_file_comparison', True)
             return upload_to_gcs(
                 local_path=local_path,
                 gcs_path=gcs_path,
-                check_existing=check_existing
+                check_existing=self.enable_file_comparison,
+                bucket=self.gcs_client.bucket
             )
         except StorageError as e:
             self.logger.error(f"Failed to upload {local_path} to {gcs_path}: {e}")
             return False
     
+    def upload_bytes_to_gcs(self, data: bytes, gcs_path: str,
+                            content_type: Optional[str] = None) -> bool:
+        """Upload in-memory content to GCS without writing a local file.
+        
+        Unlike upload_to_gcs(), no content comparison is done.
+        
+        Args:
+            data: Content to upload
+            gcs_path: GCS destination path
+            content_type: MIME type of the content
+            
+        Returns:
+            True if uploaded, False on error
+        """
+        try:
+            self.gcs_client.upload_from_bytes(data, gcs_path, content_type=content_type)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to upload {len(data)} bytes to {gcs_path}: {e}")
+            return False
+    
+    def upload_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """Upload several files to GCS concurrently.
+        
+        Unlike upload_to_gcs(), no content comparison is done.
+        
+        Args:
+            pairs: List of (local_path, gcs_path) tuples
+            
+        Returns:
+            Mapping of GCS path to upload success
+        """
+        results = self.gcs_client.upload_many(pairs, max_workers=self.max_concurrent_downloads)
+        
+        uploaded = {}
+        for (local_path, gcs_path), error in zip(pairs, results):
+            if error is not None:
+                self.logger.error(f"Failed to upload {local_path} to {gcs_path}: {error}")
+            uploaded[gcs_path] = error is None
+        return uploaded
+    
+    @staticmethod
+    def _get_source_validators(blob: Any) -> Dict[str, str]:
+        """Build conditional request headers from an object's stored source metadata.
+        
+        Args:
+            blob: Previously uploaded GCS object, or None
+            
+        Returns:
+            If-None-Match/If-Modified-Since headers, empty if none were stored
+        """
+        metadata = blob.metadata if blob is not None else None
+        if not metadata:
+            return {}
+        
+        validators = {}
+        if metadata.get('source_etag'):
+            validators['If-None-Match'] = metadata['source_etag']
+        if metadata.get('source_last_modified'):
+            validators['If-Modified-Since'] = metadata['source_last_modified']
+        return validators
+    
+    @staticmethod
+    def _get_source_metadata(response: requests.Response) -> Dict[str, str]:
+        """Collect the source ETag/Last-Modified headers to store on the object."""
+        return {
+            key: response.headers[header]
+            for key, header in _SOURCE_VALIDATOR_HEADERS.items()
+            if header in response.headers
+        }
+    
+    @staticmethod
+    def _check_identity_encoding(url: str, response: requests.Response) -> None:
+        """Ensure a response body is the stored file rather than a transport encoding of it.
+        
+        Args:
+            url: URL of the file
+            response: Streamed response about to be uploaded
+            
+        Raises:
+            NetworkError: If the server applied a Content-Encoding anyway
+        """
+        content_encoding = response.headers.get('Content-Encoding')
+        if content_encoding not in (None, 'identity'):
+            raise NetworkError(f"Unexpected Content-Encoding '{content_encoding}' for {url}")
+    
+    def _stream_ranges_to_gcs(self, url: str, gcs_path: str, size: int,
+                              content_type: str, metadata: Dict[str, str]) -> None:
+        """Upload a large file as byte ranges fetched in parallel, then compose them.
+        
+        Each range takes a transfer slot. If any part fails nothing is composed,
+        so an existing object at gcs_path is left untouched.
+        
+        Args:
+            url: URL of the file (the server must accept range requests)
+            gcs_path: Destination path in GCS
+            size: Size of the file in bytes
+            content_type: MIME type of the composed object
+            metadata: Custom metadata stored on the composed object
+            
+        Raises:
+            NetworkError: If the server does not honour a range request or
+                transport-encodes a part
+        """
+        part_count = min(_MAX_COMPOSE_COMPONENTS, -(-size // _RANGE_PART_SIZE))
+        part_size = -(-size // part_count)
+        part_paths = [f"{gcs_path}.part{index:02d}" for index in range(part_count)]
+        
+        def upload_part(index: int) -> None:
+            start = index * part_size
+            end = min(start + part_size, size) - 1
+            headers = dict(IDENTITY_ENCODING, Range=f'bytes={start}-{end}')
+            if 'source_etag' in metadata:
+                # A changed source answers with a full 200 body instead of the range
+                headers['If-Range'] = metadata['source_etag']
+            
+            with self._transfer_slots, \
+                    self.http_session.get(url, stream=True, timeout=self.timeout,
+                                          headers=headers) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise NetworkError(f"Range request not honoured for {url}")
+                self._check_identity_encoding(url, response)
+                
+                response.raw.decode_content = False
+                stream = response.raw
+                if index == part_count - 1:
+                    stream = self._wrap_last_range_part(stream, gcs_path, end - start + 1)
+                self.gcs_client.upload_from_stream(
+                    stream,
+                    part_paths[index],
+                    size=end - start + 1,
+                    content_type=content_type,
+                    chunk_size=UPLOAD_CHUNK_SIZE
+                )
+        
+        self.logger.info(f"Uploading {url} as {part_count} parallel parts")
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_downloads) as executor:
+                list(executor.map(upload_part, range(part_count)))
+            
+            self.gcs_client.compose(
+                part_paths,
+                gcs_path,
+                content_type=content_type,
+                metadata=metadata or None
+            )
+        finally:
+            self.gcs_client.delete_files(part_paths)
+    
+    def _wrap_last_range_part(self, stream: BinaryIO, gcs_path: str, part_size: int) -> BinaryIO:
+        """Return the stream uploaded for the final byte range of a composed file.
+        
+        Subclasses override this to validate trailing file structures while
+        the part is uploaded.
+        """
+        return stream
+    
     def get_existing_files(self, prefix: str) -> List[str]:
         """Get list of existing files in GCS with given prefix.
         
@@ -260,4 +759,28 @@ class BaseCollector(ABC):
         Returns:
             List of file paths
         """
-        return self.gcs_client.list_files(prefix=prefix)
\ No newline at end of file
+        return self.gcs_client.list_files(prefix=prefix)
+
+
+async def gather_collectors(collectors: List[BaseCollector]) -> List[Dict[str, Any]]:
+    """Run several collectors concurrently on the current event loop.
+    
+    Args:
+        collectors: Collector instances to run
+        
+    Returns:
+        List of collection results, in the same order as collectors
+    """
+    return await asyncio.gather(*(collector.run_async() for collector in collectors))
+
+
+def run_collectors(collectors: List[BaseCollector]) -> List[Dict[str, Any]]:
+    """Run several collectors concurrently and wait for all of them.
+    
+    Args:
+        collectors: Collector instances to run
+        
+    Returns:
+        List of collection results, in the same order as collectors
+    """
+    return asyncio.run(gather_collectors(collectors))
@@ -5,19 +5,29 @@ data.gouv.fr. It downloads yearly property transaction files and stores them
 in Google Cloud Storage with proper organization and idempotency checks.
 """
 
+import asyncio
 import re
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from urllib.parse import urljoin, urlparse
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+from google.api_core.exceptions import GoogleAPIError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
-from collectors.base_collector import BaseCollector
+from collectors.base_collector import IDENTITY_ENCODING, UPLOAD_CHUNK_SIZE, BaseCollector
 from utils.utils import (
-    NetworkError, StorageError, ValidationError,
-    setup_logging, download_file_with_retry, upload_to_gcs,
-    file_exists_in_gcs, get_file_metadata
+    NetworkError, StorageError, ValidationError, setup_logging
+)
+
+
+# Link in an autoindex listing, followed by the optional date and size columns
+_LISTING_LINK_RE = re.compile(
+    rb'<a\s+href="([^"]+)"[^>]*>[^<]*</a>\s*(?:(\d{2}-[A-Za-z]{3}-\d{4})\s+[\d:]+)?\s*(\d+)?',
+    re.IGNORECASE
 )
 
 
@@ -31,12 +41,22 @@ class DVFCollector(BaseCollector):
         # DVF-specific configuration
         self.base_url = self.collector_config.get('base_url', 'https://files.data.gouv.fr/geo-dvf/latest/csv/')
         self.download_subdirs = self.collector_config.get('download_subdirs', False)
-        self.years_to_collect = self.collector_config.get('years', None)  # None = all available
+        years = self.collector_config.get('years', None)  # None = all available
+        self.years_to_collect = frozenset(map(str, years)) if years else None
+        
+        # Files above this size are fetched as parallel byte ranges and composed in GCS
+        self.large_file_threshold = (
+            self.config.get('processing_config.large_file_threshold_mb', 100) * 1024 * 1024
+        )
         
         # File patterns
         self.main_file_pattern = 'full.csv.gz'
         self.year_pattern = re.compile(r'^(20\d{2})/?$')
         
+        # Parsed directory listings per URL, reused within a collection run
+        self._listing_cache: Dict[str, Dict[str, Dict]] = {}
+        self._listing_cache_lock = threading.Lock()
+        
         self.logger.info(f"Initialized DVF collector with base URL: {self.base_url}")
     
     def collect(self) -> Dict[str, Any]:
@@ -53,22 +73,35 @@ class DVFCollector(BaseCollector):
             'errors': []
         }
         
+        with self._listing_cache_lock:
+            self._listing_cache.clear()
+        
         try:
             # Get available years
             available_years = self._get_available_years()
             self.logger.info(f"Found available years: {available_years}")
             
-            # Filter years if configured
+            # Filter years if configured (available years are already sorted)
             if self.years_to_collect:
                 years_to_process = [year for year in available_years if year in self.years_to_collect]
                 self.logger.info(f"Filtering to configured years: {years_to_process}")
             else:
                 years_to_process = available_years
             
-            # Process each year
-            for year in sorted(years_to_process):
+            # Fetch every listing the year walk needs up front, concurrently on one thread
+            if self.download_subdirs and years_to_process:
+                asyncio.run(self._aprefetch_listings(years_to_process))
+            
+            # Process years concurrently (transfers share one limit); results are reduced in year order
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_downloads) as executor:
+                futures = [
+                    (year, executor.submit(self._process_year, year))
+                    for year in years_to_process
+                ]
+            
+            for year, future in futures:
                 try:
-                    year_result = self._process_year(year)
+                    year_result = future.result()
                     results['files_collected'] += year_result['files_collected']
                     results['files_skipped'] += year_result['files_skipped']
                     results['total_size_bytes'] += year_result['total_size_bytes']
@@ -109,16 +142,17 @@ class DVFCollector(BaseCollector):
         try:
             self.logger.info(f"Fetching available years from {self.base_url}")
             
-            response = requests.get(self.base_url, timeout=self.timeout)
+            response = self.http_session.get(self.base_url, timeout=self.timeout)
             response.raise_for_status()
             
-            # Parse HTML directory listing
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Look for links that match year pattern in the HTML directory listing
             years = []
-            
-            # Look for links that match year pattern
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+            for link in _LISTING_LINK_RE.finditer(response.content):
+                # Cheap prefix test keeps non-year links (assets, parent dir) off the regex
+                raw_href = link.group(1)
+                if not (raw_href.startswith(b'20') and raw_href[2:4].isdigit()):
+                    continue
+                href = raw_href.decode('utf-8')
                 match = self.year_pattern.match(href)
                 if match:
                     year = match.group(1)
@@ -127,8 +161,9 @@ class DVFCollector(BaseCollector):
             if not years:
                 raise ValidationError("No valid years found in directory listing")
             
-            self.logger.info(f"Found {len(years)} available years: {sorted(years)}")
-            return sorted(years)
+            years.sort()
+            self.logger.info(f"Found {len(years)} available years: {years}")
+            return years
             
         except requests.exceptions.RequestException as e:
             raise NetworkError(f"Failed to fetch directory listing from {self.base_url}: {e}")
@@ -154,8 +189,18 @@ class DVFCollector(BaseCollector):
         self.logger.info(f"Processing year {year}")
         
         try:
+            # One listing of the year directory serves the main file size and the
+            # subdirectory walk; without subdirectories the main file needs no listing
+            year_listing = None
+            if self.download_subdirs:
+                try:
+                    year_listing = self._get_directory_listing(urljoin(self.base_url, f"{year}/"))
+                except NetworkError as e:
+                    self.logger.warning(f"Falling back to per-file requests for year {year}: {e}")
+            
             # Process main file (full.csv.gz)
-            main_result = self._process_main_file(year)
+            main_info = year_listing.get(self.main_file_pattern) if year_listing else None
+            main_result = self._process_main_file(year, main_info)
             results['files_collected'] += main_result['files_collected']
             results['files_skipped'] += main_result['files_skipped']
             results['total_size_bytes'] += main_result['total_size_bytes']
@@ -166,6 +211,9 @@ class DVFCollector(BaseCollector):
             # Process subdirectories if configured
             if self.download_subdirs:
                 for subdir in ['communes', 'departements']:
+                    if year_listing is not None and f"{subdir}/" not in year_listing:
+                        self.logger.info(f"No {subdir} directory for year {year}")
+                        continue
                     try:
                         subdir_result = self._process_subdirectory(year, subdir)
                         results['files_collected'] += subdir_result['files_collected']
@@ -196,11 +244,12 @@ class DVFCollector(BaseCollector):
         
         return results
     
-    def _process_main_file(self, year: str) -> Dict[str, Any]:
+    def _process_main_file(self, year: str, listing_info: Optional[Dict] = None) -> Dict[str, Any]:
         """Process the main full.csv.gz file for a year.
         
         Args:
             year: Year to process
+            listing_info: File info from the year directory listing, if already fetched
             
         Returns:
             Dictionary with processing results
@@ -220,47 +269,34 @@ class DVFCollector(BaseCollector):
             
             self.logger.info(f"Processing main file: {file_url}")
             
-            # Get remote file metadata
-            remote_metadata = self._get_remote_file_metadata(file_url)
-            
-            # Check if we need to download
-            should_download, reason = self._should_download_file(gcs_path, remote_metadata)
-            
-            if not should_download:
-                self.logger.info(f"Skipping {file_url}: {reason}")
-                results['files_skipped'] = 1
-                return results
-            
-            # Download and upload file
-            local_path = f"/tmp/dvf_{year}_{self.main_file_pattern}"
-            
-            # Download file
-            success = download_file_with_retry(
-                url=file_url,
-                local_path=local_path,
-                timeout=self.timeout,
-                chunk_size=self.config.get('processing_config.chunk_size_bytes', 8192)
-            )
-            
-            if not success:
-                raise NetworkError(f"Failed to download {file_url}")
-            
-            # Upload to GCS
-            upload_success = upload_to_gcs(
-                local_path=local_path,
-                gcs_path=gcs_path,
-                check_existing=False  # We already checked above
-            )
-            
-            if not upload_success:
-                raise StorageError(f"Failed to upload {local_path} to {gcs_path}")
-            
-            # Clean up local file
-            import os
-            os.remove(local_path)
+            # With validators from a previous upload, one conditional GET replaces HEAD + compare
+            validators = self._read_source_validators(gcs_path)
+            if validators:
+                uploaded_size = self._stream_url_to_gcs(file_url, gcs_path, validators=validators)
+                if uploaded_size is None:
+                    self.logger.info(f"Skipping {file_url}: not modified")
+                    results['files_skipped'] = 1
+                    return results
+            else:
+                # Get remote file metadata, from the listing when it has the size
+                if listing_info and listing_info.get('size'):
+                    remote_metadata = listing_info
+                else:
+                    remote_metadata = self._get_remote_file_metadata(file_url)
+                
+                # Check if we need to download
+                should_download, reason = self._should_download_file(gcs_path, remote_metadata)
+                
+                if not should_download:
+                    self.logger.info(f"Skipping {file_url}: {reason}")
+                    results['files_skipped'] = 1
+                    return results
+                
+                # Stream the file straight into GCS
+                uploaded_size = self._stream_url_to_gcs(file_url, gcs_path, remote_metadata.get('size'))
             
             results['files_collected'] = 1
-            results['total_size_bytes'] = remote_metadata.get('size', 0)
+            results['total_size_bytes'] = uploaded_size
             
             self.logger.info(f"Successfully processed main file for year {year}")
             
@@ -306,19 +342,34 @@ class DVFCollector(BaseCollector):
                 self.logger.info(f"No files found in {subdir_url}")
                 return results
             
-            # Process each file
+            # One listing of the GCS prefix replaces per-file existence/metadata lookups
+            gcs_index = self._load_gcs_index(f"{self.raw_path}/{year}/{subdir}/")
+            
+            csv_files = []
             for filename, file_info in files.items():
+                if filename.endswith('.csv.gz') or filename.endswith('.csv'):
+                    csv_files.append((filename, file_info))
+                else:
+                    self.logger.debug(f"Skipping non-CSV file: {filename}")
+            
+            # Process files concurrently (transfers share one limit); results are reduced in listing order
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_downloads) as executor:
+                futures = [
+                    (filename, executor.submit(
+                        self._process_subdir_file, year, subdir, filename, file_info, gcs_index
+                    ))
+                    for filename, file_info in csv_files
+                ]
+            
+            for filename, future in futures:
                 try:
-                    if filename.endswith('.csv.gz') or filename.endswith('.csv'):
-                        file_result = self._process_subdir_file(year, subdir, filename, file_info)
-                        results['files_collected'] += file_result['files_collected']
-                        results['files_skipped'] += file_result['files_skipped']
-                        results['total_size_bytes'] += file_result['total_size_bytes']
-                        
-                        if file_result.get('errors'):
-                            results['errors'].extend(file_result['errors'])
-                    else:
-                        self.logger.debug(f"Skipping non-CSV file: {filename}")
+                    file_result = future.result()
+                    results['files_collected'] += file_result['files_collected']
+                    results['files_skipped'] += file_result['files_skipped']
+                    results['total_size_bytes'] += file_result['total_size_bytes']
+                    
+                    if file_result.get('errors'):
+                        results['errors'].extend(file_result['errors'])
                         
                 except Exception as e:
                     error_msg = f"Error processing file {filename} in {subdir}: {e}"
@@ -343,7 +394,8 @@ class DVFCollector(BaseCollector):
         
         return results
     
-    def _process_subdir_file(self, year: str, subdir: str, filename: str, file_info: Dict) -> Dict[str, Any]:
+    def _process_subdir_file(self, year: str, subdir: str, filename: str, file_info: Dict,
+                             gcs_index: Optional[Dict[str, Dict]] = None) -> Dict[str, Any]:
         """Process a single file from a subdirectory.
         
         Args:
@@ -351,6 +403,7 @@ class DVFCollector(BaseCollector):
             subdir: Subdirectory name
             filename: Name of the file
             file_info: File metadata from directory listing
+            gcs_index: Metadata of the files already under the subdirectory's GCS prefix
             
         Returns:
             Dictionary with processing results
@@ -368,39 +421,15 @@ class DVFCollector(BaseCollector):
             gcs_path = f"{self.raw_path}/{year}/{subdir}/{filename}"
             
             # Check if we need to download
-            should_download, reason = self._should_download_file(gcs_path, file_info)
+            should_download, reason = self._should_download_file(gcs_path, file_info, gcs_index)
             
             if not should_download:
                 self.logger.debug(f"Skipping {filename}: {reason}")
                 results['files_skipped'] = 1
                 return results
             
-            # Download and upload file
-            local_path = f"/tmp/dvf_{year}_{subdir}_{filename}"
-            
-            # Download file
-            success = download_file_with_retry(
-                url=file_url,
-                local_path=local_path,
-                timeout=self.timeout
-            )
-            
-            if not success:
-                raise NetworkError(f"Failed to download {file_url}")
-            
-            # Upload to GCS
-            upload_success = upload_to_gcs(
-                local_path=local_path,
-                gcs_path=gcs_path,
-                check_existing=False
-            )
-            
-            if not upload_success:
-                raise StorageError(f"Failed to upload {local_path} to {gcs_path}")
-            
-            # Clean up
-            import os
-            os.remove(local_path)
+            # Stream the file straight into GCS
+            self._stream_url_to_gcs(file_url, gcs_path, file_info.get('size'))
             
             results['files_collected'] = 1
             results['total_size_bytes'] = file_info.get('size', 0)
@@ -418,6 +447,136 @@ class DVFCollector(BaseCollector):
         
         return results
     
+    def _stream_url_to_gcs(self, file_url: str, gcs_path: str, size: Optional[int] = None,
+                           validators: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """Copy a remote file into GCS without writing it to local disk.
+        
+        The source ETag and Last-Modified headers are stored as custom metadata
+        on the object so later runs can issue a conditional request.
+        
+        Args:
+            file_url: URL of the file
+            gcs_path: Destination path in GCS
+            size: Expected size in bytes, if known
+            validators: Conditional request headers (If-None-Match/If-Modified-Since)
+            
+        Returns:
+            Number of bytes uploaded, or None if the source was not modified
+            
+        Raises:
+            NetworkError: If the download fails after all retries
+            StorageError: If the upload fails after all retries
+        """
+        try:
+            return self._stream_url_to_gcs_with_retry(file_url, gcs_path, size, validators)
+        except requests.exceptions.RequestException as e:
+            raise NetworkError(f"Failed to download {file_url}: {e}")
+        except GoogleAPIError as e:
+            raise StorageError(f"Failed to upload {file_url} to {gcs_path}: {e}")
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((requests.exceptions.RequestException, GoogleAPIError)),
+        reraise=True
+    )
+    def _stream_url_to_gcs_with_retry(self, file_url: str, gcs_path: str, size: Optional[int],
+                                      validators: Optional[Dict[str, str]]) -> Optional[int]:
+        """Perform one streamed copy, restarting from scratch on each retry."""
+        headers = dict(IDENTITY_ENCODING, **(validators or {}))
+        content_type = 'application/gzip' if file_url.endswith('.gz') else 'text/csv'
+        
+        if size is not None and size <= self.large_file_threshold:
+            with self._transfer_slots, \
+                    self.http_session.get(file_url, stream=True, timeout=self.timeout,
+                                          headers=headers) as response:
+                if response.status_code == 304:
+                    return None
+                response.raise_for_status()
+                return self._upload_response(file_url, gcs_path, size, content_type, response)
+        
+        # Possibly large: probe a single byte to run the conditional check and learn the size.
+        # The slot is released before the range parts below take their own.
+        with self._transfer_slots, \
+                self.http_session.get(file_url, stream=True, timeout=self.timeout,
+                                      headers=dict(headers, Range='bytes=0-0')) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            if response.status_code != 206:
+                # The server ignored the range, so this is already the whole file
+                return self._upload_response(file_url, gcs_path, size, content_type, response)
+            self._check_identity_encoding(file_url, response)
+            
+            total = response.headers.get('Content-Range', '').rpartition('/')[2]
+            if total.isdigit():
+                size = int(total)
+            source_metadata = self._get_source_metadata(response)
+        
+        if size is not None and size > self.large_file_threshold:
+            self._stream_ranges_to_gcs(file_url, gcs_path, size, content_type, source_metadata)
+            return size
+        
+        with self._transfer_slots, \
+                self.http_session.get(file_url, stream=True, timeout=self.timeout,
+                                      headers=IDENTITY_ENCODING) as response:
+            response.raise_for_status()
+            return self._upload_response(file_url, gcs_path, size, content_type, response)
+    
+    def _upload_response(self, file_url: str, gcs_path: str, size: Optional[int],
+                         content_type: str, response: requests.Response) -> int:
+        """Upload a full streamed response body to GCS as served.
+        
+        Args:
+            file_url: URL of the file
+            gcs_path: Destination path in GCS
+            size: Expected size in bytes, if known
+            content_type: MIME type of the object
+            response: Streamed response holding the whole file
+            
+        Returns:
+            Number of bytes uploaded
+        """
+        self._check_identity_encoding(file_url, response)
+        
+        if 'content-length' in response.headers:
+            content_length = int(response.headers['content-length'])
+            if size is not None and content_length != size:
+                self.logger.warning(
+                    f"{file_url} is {content_length} bytes, listing reported {size}"
+                )
+            size = content_length
+        source_metadata = self._get_source_metadata(response)
+        
+        # Keep the bytes exactly as served (the files are already gzipped)
+        response.raw.decode_content = False
+        
+        self.gcs_client.upload_from_stream(
+            response.raw,
+            gcs_path,
+            size=size,
+            content_type=content_type,
+            metadata=source_metadata or None,
+            chunk_size=UPLOAD_CHUNK_SIZE
+        )
+        return size or 0
+    
+    def _read_source_validators(self, gcs_path: str) -> Dict[str, str]:
+        """Build conditional request headers from an object's stored source metadata.
+        
+        Args:
+            gcs_path: GCS path of the previously uploaded file
+            
+        Returns:
+            If-None-Match/If-Modified-Since headers, empty if none were stored
+        """
+        try:
+            blob = self.gcs_client.get_blob(gcs_path)
+        except Exception as e:
+            self.logger.warning(f"Error reading source metadata for {gcs_path}: {e}")
+            return {}
+        return self._get_source_validators(blob)
+    
     def _get_remote_file_metadata(self, url: str) -> Dict[str, Any]:
         """Get metadata for a remote file using HEAD request.
         
@@ -428,7 +587,7 @@ class DVFCollector(BaseCollector):
             Dictionary with file metadata
         """
         try:
-            response = requests.head(url, timeout=self.timeout)
+            response = self.http_session.head(url, timeout=self.timeout)
             response.raise_for_status()
             
             metadata = {}
@@ -459,61 +618,159 @@ class DVFCollector(BaseCollector):
         Returns:
             Dictionary mapping filename to file info
         """
+        return {
+            name: info
+            for name, info in self._get_directory_listing(url).items()
+            if not name.endswith('/')
+        }
+    
+    def _get_directory_listing(self, url: str) -> Dict[str, Dict]:
+        """Get the entries of a directory from its HTML listing, cached per run.
+        
+        Args:
+            url: Directory URL
+            
+        Returns:
+            Dictionary mapping entry name (subdirectories end with '/') to entry info
+            
+        Raises:
+            NetworkError: If the listing cannot be fetched
+        """
+        with self._listing_cache_lock:
+            listing = self._listing_cache.get(url)
+        if listing is not None:
+            return listing
+        
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self.http_session.get(url, timeout=self.timeout)
             response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise NetworkError(f"Failed to get directory listing for {url}: {e}")
+        
+        listing = self._parse_directory_listing(response.content)
+        
+        with self._listing_cache_lock:
+            self._listing_cache[url] = listing
+        return listing
+    
+    async def _aprefetch_listings(self, years: List[str]) -> None:
+        """Fetch year and subdirectory listings concurrently into the listing cache.
+        
+        Listings that fail to load are left out of the cache; the per-year walk
+        then fetches them again synchronously and reports the error.
+        
+        Args:
+            years: Years whose directories will be walked
+        """
+        connector = aiohttp.TCPConnector(limit=32, limit_per_host=16, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            year_urls = [urljoin(self.base_url, f"{year}/") for year in years]
+            year_listings = await asyncio.gather(
+                *(self._afetch_listing(session, url) for url in year_urls),
+                return_exceptions=True
+            )
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            files = {}
+            subdir_urls = [
+                urljoin(year_url, f"{subdir}/")
+                for year_url, listing in zip(year_urls, year_listings)
+                if not isinstance(listing, BaseException)
+                for subdir in ['communes', 'departements']
+                if f"{subdir}/" in listing
+            ]
+            await asyncio.gather(
+                *(self._afetch_listing(session, url) for url in subdir_urls),
+                return_exceptions=True
+            )
+    
+    async def _afetch_listing(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Dict]:
+        """Fetch and cache one directory listing asynchronously.
+        
+        Args:
+            session: Client session to issue the request on
+            url: Directory URL
             
-            # Parse directory listing
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                # Skip parent directory and subdirectories
-                if href in ['./', '../'] or href.endswith('/'):
-                    continue
-                
-                # Extract file info from the listing
-                file_info = {'name': href}
-                
-                # Try to extract size and date from the text
-                link_text = link.parent.get_text() if link.parent else ""
-                
-                # Simple pattern matching for size and date
-                # This may need adjustment based on actual HTML format
-                parts = link_text.split()
-                for i, part in enumerate(parts):
-                    if part.isdigit() and len(part) > 3:  # Likely a file size
-                        file_info['size'] = int(part)
-                    elif '-' in part and len(part) >= 8:  # Likely a date
-                        file_info['date'] = part
-                
-                files[href] = file_info
+        Returns:
+            Dictionary mapping entry name to entry info
+        """
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with session.get(url, timeout=timeout) as response:
+            response.raise_for_status()
+            content = await response.read()
+        
+        listing = self._parse_directory_listing(content)
+        with self._listing_cache_lock:
+            self._listing_cache[url] = listing
+        return listing
+    
+    @staticmethod
+    def _parse_directory_listing(content: bytes) -> Dict[str, Dict]:
+        """Parse the entries of an HTML directory listing.
+        
+        Args:
+            content: Raw HTML of the listing
             
-            return files
+        Returns:
+            Dictionary mapping entry name (subdirectories end with '/') to entry info
+        """
+        listing = {}
+        
+        # Each link is followed by its date and size columns
+        for link in _LISTING_LINK_RE.finditer(content):
+            href = link.group(1).decode('utf-8')
+            # Skip current and parent directory
+            if href in ['./', '../']:
+                continue
             
-        except requests.exceptions.RequestException as e:
-            raise NetworkError(f"Failed to get directory listing for {url}: {e}")
+            entry_info = {'name': href}
+            date, size = link.group(2), link.group(3)
+            if size:
+                entry_info['size'] = int(size)
+            if date:
+                entry_info['date'] = date.decode('ascii')
+            
+            listing[href] = entry_info
+        
+        return listing
     
-    def _should_download_file(self, gcs_path: str, remote_metadata: Dict) -> Tuple[bool, str]:
+    def _load_gcs_index(self, prefix: str) -> Optional[Dict[str, Dict]]:
+        """List the files already stored under a GCS prefix.
+        
+        Args:
+            prefix: GCS prefix to list
+            
+        Returns:
+            Dictionary mapping GCS path to file metadata, or None if the listing
+            failed and files must be checked individually
+        """
+        try:
+            return self.gcs_client.list_files_metadata(prefix)
+        except Exception as e:
+            self.logger.warning(f"Error listing gs://{prefix}, checking files individually: {e}")
+            return None
+    
+    def _should_download_file(self, gcs_path: str, remote_metadata: Dict,
+                              gcs_index: Optional[Dict[str, Dict]] = None) -> Tuple[bool, str]:
         """Determine if a file should be downloaded based on metadata comparison.
         
         Args:
             gcs_path: GCS path of the file
             remote_metadata: Metadata of the remote file
+            gcs_index: Listing of the file's GCS prefix from _load_gcs_index(); when
+                omitted the file is looked up individually
             
         Returns:
             Tuple of (should_download, reason)
         """
         try:
-            # Check if file exists in GCS
-            if not file_exists_in_gcs(gcs_path):
-                return True, "File does not exist in GCS"
+            if gcs_index is not None:
+                gcs_metadata = gcs_index.get(gcs_path)
+            else:
+                # Existence and size come back from a single metadata request
+                blob = self.gcs_client.get_blob(gcs_path)
+                gcs_metadata = {'size': blob.size} if blob is not None else None
             
-            # Get GCS file metadata
-            gcs_metadata = get_file_metadata(gcs_path)
-            if not gcs_metadata:
-                return True, "Cannot get GCS file metadata"
+            if gcs_metadata is None:
+                return True, "File does not exist in GCS"
             
             # Compare file sizes
             remote_size = remote_metadata.get('size')
@@ -545,26 +802,19 @@ class DVFCollector(BaseCollector):
         if not isinstance(data, dict):
             return False
         
-        # Check required fields
-        required_fields = ['files_collected', 'files_skipped', 'total_size_bytes', 'years_processed']
-        for field in required_fields:
-            if field not in data:
-                return False
-        
-        # Validate data types
-        if not isinstance(data['files_collected'], int) or data['files_collected'] < 0:
-            return False
-        
-        if not isinstance(data['files_skipped'], int) or data['files_skipped'] < 0:
-            return False
-        
-        if not isinstance(data['total_size_bytes'], int) or data['total_size_bytes'] < 0:
-            return False
-        
-        if not isinstance(data['years_processed'], list):
-            return False
-        
-        return True
+        # A single lookup per field; missing fields come back as None and
+        # fail the type checks. bool is rejected along with other int subclasses.
+        get = data.get
+        files_collected = get('files_collected')
+        files_skipped = get('files_skipped')
+        total_size_bytes = get('total_size_bytes')
+        
+        return (
+            type(files_collected) is int and files_collected >= 0
+            and type(files_skipped) is int and files_skipped >= 0
+            and type(total_size_bytes) is int and total_size_bytes >= 0
+            and type(get('years_processed')) is list
+        )
 
 
 # Cloud Function entry point
@@ -14,30 +14,344 @@ Author: Claude Code Assistant
 Created: 2025-06-25
 """
 
+import asyncio
 import json
 import logging
+import os
 import re
+import tempfile
+import threading
+import time
 import zipfile
+from collections import Counter
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
-from typing import Dict, List, Optional, Union
-from urllib.parse import urljoin, urlparse
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
+import yaml
+from google.api_core.exceptions import GoogleAPIError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
-from collectors.base_collector import BaseCollector
+try:
+    import ijson
+except ImportError:  # pragma: no cover - ijson is optional
+    ijson = None
+
+from collectors.base_collector import UPLOAD_CHUNK_SIZE, BaseCollector
 from utils import (
     FranceDataError,
     NetworkError,
     ValidationError,
-    download_file_with_retry,
+    compute_crc32c,
+    dumps_json,
+    forget_crc32c,
+    loads_json,
+    save_stream,
     setup_logging,
-    upload_to_gcs,
-    file_exists_in_gcs,
-    get_file_metadata
+    upload_to_gcs
+)
+
+
+# JSON解析错误（json.JSONDecodeError和UnicodeDecodeError都是ValueError）
+_JSON_ERRORS = (ValueError,) if ijson is None else (ValueError, ijson.JSONError)
+
+# 顶层值结束时的ijson事件
+_TOP_LEVEL_END_EVENTS = frozenset(('end_map', 'end_array', 'string', 'number', 'boolean', 'null'))
+
+_JSON_WHITESPACE = re.compile(r'\s*')
+
+# data.gouv.fr资源列表和远程文件元数据的进程内缓存（Cloud Function热实例间复用）
+# 键为(请求方法, URL)，值为(写入时的monotonic时间, 结果)；只缓存成功的响应
+_RESPONSE_CACHE: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+
+# 按URL路径扩展名识别的格式（.zip另需URL中带有shp/shape才视为Shapefile）
+_SUFFIX_FORMATS = {
+    '.geojson': 'geojson',
+    '.json': 'geojson',
+    '.gpkg': 'geopackage'
+}
+
+_SHAPEFILE_TOKEN = re.compile(r'shp|shape')
+
+# format字段中的格式关键字，按判断优先级排列（'json'同时覆盖'geojson'）
+_FORMAT_FIELD_PATTERNS = (
+    (_SHAPEFILE_TOKEN, 'shapefile'),
+    (re.compile(r'json'), 'geojson'),
+    (re.compile(r'gpkg|geopackage'), 'geopackage')
 )
 
+# 需要随机访问本地文件才能验证的格式（ZIP中央目录、SQLite文件头），其余格式直接流式上传
+_LOCAL_VALIDATION_FORMATS = frozenset(('shapefile', 'geopackage'))
+
+# Shapefile ZIP中解压校验CRC的文件大小上限
+_ZIP_CRC_CHECK_MAX_SIZE = 1024 * 1024
+
+# SQLite数据库（GeoPackage）的文件头
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+
+# Cloud Function入口解析过的配置文件，键为路径，值为(文件mtime_ns, 配置)；热实例直接复用
+_CONFIG_CACHE: Dict[str, Tuple[int, Dict]] = {}
+
+# 有libyaml时使用C实现的安全加载器
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# IGN IRIS数据下载链接模板（基于研究结果），{year}为数据年份
+_IGN_DATASET_TEMPLATES = {
+    'iris_lambert93_shp': {
+        'url': 'https://data.geopf.fr/telechargement/download/CONTOURS-IRIS/CONTOURS-IRIS_3-0__SHP_LAMB93_FXX_{year}-01-01/',
+        'filename': 'contours_iris_lambert93_{year}.zip',
+        'data_type': 'iris',
+        'format': 'shapefile',
+        'projection': 'lambert93'
+    },
+    'iris_lambert93_gpkg': {
+        'url': 'https://data.geopf.fr/telechargement/download/CONTOURS-IRIS/CONTOURS-IRIS_3-0__GPKG_LAMB93_FXX_{year}-01-01/',
+        'filename': 'contours_iris_lambert93_{year}.gpkg',
+        'data_type': 'iris',
+        'format': 'geopackage',
+        'projection': 'lambert93'
+    }
+}
+
+# 与原始GeoJSON一同上传的按行分隔副本（每行一个要素）
+_GEOJSON_SEQ_SUFFIX = '.geojsonl'
+_GEOJSON_SEQ_CONTENT_TYPE = 'application/x-ndjson'
+
+
+class _GeoJSONChecker:
+    """依次检查GeoJSON（或按行分隔的GeoJSONSeq）的顶层值"""
+    
+    def __init__(self):
+        self.value_count = 0
+        self._first_type = None
+        self._type = None
+        self._feature_count = 0
+    
+    def handle_event(self, prefix: str, event: str, value: Any) -> None:
+        """处理一个ijson解析事件，只记录顶层type和要素数量"""
+        if prefix == 'type' and event == 'string':
+            self._type = value
+        elif prefix == 'features.item' and event == 'start_map':
+            self._feature_count += 1
+        elif prefix == '' and event in _TOP_LEVEL_END_EVENTS:
+            self.check_value(self._type, self._feature_count)
+            self._type = None
+            self._feature_count = 0
+    
+    def check_value(self, geojson_type: Optional[str], feature_count: int) -> None:
+        """检查一个完整的顶层值"""
+        self.value_count += 1
+        
+        # 基本GeoJSON结构检查
+        if geojson_type is None:
+            raise ValidationError("GeoJSON文件缺少type字段")
+        
+        if geojson_type not in ('FeatureCollection', 'Feature'):
+            raise ValidationError(f"无效的GeoJSON类型: {geojson_type}")
+        
+        # 检查是否有要素
+        if geojson_type == 'FeatureCollection' and feature_count == 0:
+            raise ValidationError("GeoJSON文件不包含任何要素")
+        
+        # GeoJSONSeq的每一行都必须是单个要素
+        if self.value_count == 1:
+            self._first_type = geojson_type
+        elif self._first_type != 'Feature' or geojson_type != 'Feature':
+            raise ValidationError("GeoJSONSeq文件只能包含Feature")
+    
+    def finish(self) -> None:
+        """文件结束时的检查"""
+        if self.value_count == 0:
+            raise ValidationError("无效的JSON格式: 文件为空")
+
+
+class _PipeReader:
+    """管道读端，记录位置供可续传上传使用；写端被中止时以异常代替EOF，避免提交不完整的对象"""
+    
+    def __init__(self, pipe: BinaryIO):
+        self._pipe = pipe
+        self._position = 0
+        self.aborted = False
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._pipe.read(size)
+        # 缓冲读取只在EOF时返回不足请求大小的数据
+        if self.aborted and (size is None or size < 0 or len(data) < size):
+            raise ValidationError("GeoJSONSeq副本已取消")
+        self._position += len(data)
+        return data
+    
+    def close(self) -> None:
+        self._pipe.close()
+
+
+class _FeatureSeqWriter:
+    """
+    把FeatureCollection中的要素逐行写成GeoJSONSeq副本，与原始文件同时上传
+    
+    要素经管道交给后台线程上传。原始文件验证或上传失败时调用abort()，副本的
+    上传随之失败而不会提交；副本上传失败只记录日志，不影响原始文件。
+    """
+    
+    def __init__(self, gcs_client, gcs_path: str, metadata: Dict[str, str], logger: logging.Logger):
+        read_fd, write_fd = os.pipe()
+        self.gcs_path = gcs_path
+        self.feature_count = 0
+        self._logger = logger
+        self._builder = None
+        self._error = None
+        self._pipe = os.fdopen(write_fd, 'wb')
+        self._reader = _PipeReader(os.fdopen(read_fd, 'rb'))
+        self._thread = threading.Thread(
+            target=self._upload, args=(gcs_client, metadata), daemon=True
+        )
+        self._thread.start()
+    
+    def _upload(self, gcs_client, metadata: Dict[str, str]) -> None:
+        try:
+            gcs_client.upload_from_stream(
+                self._reader,
+                self.gcs_path,
+                content_type=_GEOJSON_SEQ_CONTENT_TYPE,
+                metadata=metadata,
+                chunk_size=UPLOAD_CHUNK_SIZE
+            )
+        except Exception as e:
+            self._error = e
+        finally:
+            # 关闭读端，使写端的后续写入立即失败而不是阻塞
+            self._reader.close()
+    
+    def handle_event(self, prefix: str, event: str, value: Any) -> None:
+        """处理一个ijson解析事件，每组装完一个features.item就写出一行"""
+        if self._pipe is None:
+            return
+        if prefix == 'features.item' and event == 'start_map':
+            self._builder = ijson.ObjectBuilder()
+        if self._builder is None:
+            return
+        
+        self._builder.event(event, value)
+        if prefix == 'features.item' and event == 'end_map':
+            feature = self._builder.value
+            self._builder = None
+            try:
+                self._pipe.write(dumps_json(feature) + b'\n')
+                self.feature_count += 1
+            except BrokenPipeError:
+                # 上传线程已失败，停止生成副本
+                self._close_pipe()
+    
+    def finish(self) -> None:
+        """原始文件上传成功后提交副本；没有写出任何要素（如输入已是GeoJSONSeq）时放弃副本"""
+        if self.feature_count == 0:
+            self.abort()
+            return
+        
+        self._close_pipe()
+        self._thread.join()
+        if self._error is not None:
+            self._logger.warning(f"上传GeoJSONSeq副本 {self.gcs_path} 失败: {self._error}")
+        else:
+            self._logger.info(f"已生成GeoJSONSeq副本 {self.gcs_path}（{self.feature_count}个要素）")
+    
+    def abort(self) -> None:
+        """放弃副本，其上传不会提交"""
+        self._reader.aborted = True
+        self._close_pipe()
+        self._thread.join()
+    
+    def _close_pipe(self) -> None:
+        if self._pipe is None:
+            return
+        try:
+            self._pipe.close()
+        except BrokenPipeError:
+            pass
+        self._pipe = None
+
+
+class _ValidatingStream:
+    """
+    边读边验证的只读流，供流式上传使用
+    
+    上传在读到最后一块数据后才提交，所以在返回最后一块数据之前完成验证：
+    验证失败抛出的异常会中止上传，GCS中的对象保持不变。已知大小时以读满
+    该大小作为结束，因为上传方不会再读一次去确认流末尾。
+    """
+    
+    def __init__(self, raw: BinaryIO, file_format: str, size: Optional[int] = None,
+                 feature_writer: Optional[_FeatureSeqWriter] = None):
+        self._raw = raw
+        self._size = size
+        self._position = 0
+        self._finished = False
+        self._checker = None
+        self._feature_writer = feature_writer
+        if file_format == 'geojson':
+            self._checker = _GeoJSONChecker()
+            self._events = ijson.sendable_list()
+            # 浮点数直接解析为float，组装出的要素才能重新序列化
+            self._parser = ijson.parse_coro(self._events, multiple_values=True, use_float=True)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def read(self, size: int = -1) -> bytes:
+        at_end = False
+        if size is None or size < 0:
+            data = self._raw.read()
+            at_end = True
+        else:
+            # 读满请求的大小，短读即表示流已结束
+            chunks = []
+            remaining = size
+            while remaining > 0:
+                chunk = self._raw.read(remaining)
+                if not chunk:
+                    at_end = True
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            data = b''.join(chunks)
+        
+        if data:
+            self._position += len(data)
+            if self._checker is not None:
+                self._parse(self._parser.send, data)
+            if self._size is not None and self._position >= self._size:
+                at_end = True
+        
+        if at_end and not self._finished:
+            self._finished = True
+            self._finish()
+        return data
+    
+    def _parse(self, step, *args) -> None:
+        try:
+            step(*args)
+        except _JSON_ERRORS as e:
+            raise ValidationError(f"无效的JSON格式: {e}") from e
+        for event in self._events:
+            self._checker.handle_event(*event)
+            if self._feature_writer is not None:
+                self._feature_writer.handle_event(*event)
+        del self._events[:]
+    
+    def _finish(self) -> None:
+        if self._checker is None:
+            if self._position == 0:
+                raise ValidationError("文件为空")
+            return
+        
+        self._parse(self._parser.close)
+        self._checker.finish()
+
 
 class INSEEContoursCollector(BaseCollector):
     """INSEE地理边界数据收集器，处理IRIS、市镇、省、大区边界数据"""
@@ -89,6 +403,12 @@ class INSEEContoursCollector(BaseCollector):
         self.target_year = self.insee_config.get('target_year', datetime.now().year)
         self.fallback_years = self.insee_config.get('fallback_years', [2024, 2023, 2022])
         
+        # API响应和远程文件元数据的缓存时间
+        self.api_cache_ttl = self.insee_config.get('api_cache_ttl_hours', 24) * 3600
+        
+        # 流式上传GeoJSON时同时生成按行分隔的GeoJSONSeq副本
+        self.write_geojson_seq = self.insee_config.get('write_geojson_seq', False)
+        
         # 获取GCS配置
         if config:
             gcs_config = config.get('gcs_config', {})
@@ -97,6 +417,9 @@ class INSEEContoursCollector(BaseCollector):
             self.bucket_name = self.config.get('gcs_config.bucket_name', 'france-data-bucket')
         
         self.logger = logging.getLogger(f'{__name__}.INSEEContoursCollector')
+        
+        # 本次收集中已开始的下载，键为GCS路径，值为(源URL, 下载任务)
+        self._inflight: Dict[str, Tuple[str, asyncio.Task]] = {}
     
     def collect(self) -> Dict:
         """
@@ -108,43 +431,29 @@ class INSEEContoursCollector(BaseCollector):
         try:
             self.logger.info("开始INSEE地理边界数据收集...")
             
-            download_results = []
-            
-            # 1. 收集IGN官方数据（如果启用）
-            if self.download_ign_data:
-                self.logger.info("开始收集IGN官方地理边界数据...")
-                ign_results = self._collect_ign_data()
-                download_results.extend(ign_results)
-            
-            # 2. 收集data.gouv.fr数据（如果启用）
-            if self.download_datagouv:
-                self.logger.info("开始收集data.gouv.fr地理数据...")
-                datagouv_results = self._collect_datagouv_data()
-                download_results.extend(datagouv_results)
+            # 三个数据源并发收集，共享同一个下载并发上限
+            download_results = asyncio.run(self._collect_sources())
             
-            # 3. 收集GeoZones标准化数据（如果启用）
-            if self.download_geozones:
-                self.logger.info("开始收集GeoZones标准化标识符数据...")
-                geozones_results = self._collect_geozones_data()
-                download_results.extend(geozones_results)
-            
-            # 统计结果
-            successful_downloads = [r for r in download_results if r['status'] == 'success']
-            failed_downloads = [r for r in download_results if r['status'] == 'failed']
-            skipped_downloads = [r for r in download_results if r['status'] == 'skipped']
+            # 一次遍历统计各状态数量和各数据源的成功数量
+            status_counts = Counter()
+            source_counts = Counter()
+            for r in download_results:
+                status_counts[r['status']] += 1
+                if r['status'] == 'success':
+                    source_counts[r.get('source')] += 1
             
             result = {
                 'collector': 'insee_contours',
-                'status': 'success' if len(failed_downloads) == 0 else 'partial',
+                'status': 'success' if status_counts['failed'] == 0 else 'partial',
                 'timestamp': datetime.now(timezone.utc).isoformat(),
                 'files_processed': len(download_results),
-                'successful_downloads': len(successful_downloads),
-                'failed_downloads': len(failed_downloads),
-                'skipped_downloads': len(skipped_downloads),
+                'successful_downloads': status_counts['success'],
+                'failed_downloads': status_counts['failed'],
+                'skipped_downloads': status_counts['skipped'],
                 'data_sources': {
-                    'ign_official': len([r for r in successful_downloads if r.get('source') == 'ign']),
-                    'datagouv': len([r for r in successful_downloads if r.get('source') == 'datagouv']),
-                    'geozones': len([r for r in successful_downloads if r.get('source') == 'geozones'])
+                    'ign_official': source_counts['ign'],
+                    'datagouv': source_counts['datagouv'],
+                    'geozones': source_counts['geozones']
                 },
                 'details': download_results
             }
@@ -156,57 +465,186 @@ class INSEEContoursCollector(BaseCollector):
             self.logger.error(f"INSEE地理边界数据收集失败: {e}")
             raise FranceDataError(f"INSEE contours collection failed: {e}") from e
     
-    def _collect_ign_data(self) -> List[Dict]:
+    async def _collect_sources(self) -> List[Dict]:
+        """
+        并发收集所有启用的数据源
+        
+        Returns:
+            List[Dict]: 下载结果列表，按IGN、data.gouv.fr、GeoZones的顺序排列
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
+        self._inflight = {}
+        sources = []
+        
+        # 1. IGN官方数据（如果启用）
+        if self.download_ign_data:
+            self.logger.info("开始收集IGN官方地理边界数据...")
+            sources.append(self._collect_ign_data(semaphore))
+        
+        # 2. data.gouv.fr数据（如果启用）
+        if self.download_datagouv:
+            self.logger.info("开始收集data.gouv.fr地理数据...")
+            sources.append(self._collect_datagouv_data(semaphore))
+        
+        # 3. GeoZones标准化数据（如果启用）
+        if self.download_geozones:
+            self.logger.info("开始收集GeoZones标准化标识符数据...")
+            sources.append(self._collect_geozones_data(semaphore))
+        
+        source_results = await asyncio.gather(*sources)
+        return [result for results in source_results for result in results]
+    
+    async def _download_bounded(self, semaphore: asyncio.Semaphore,
+                                download_info: Dict, source: str) -> Dict:
+        """
+        在并发上限内下载单个地理数据文件
+        
+        下载、验证和上传都是阻塞操作，放到工作线程中执行，
+        以便多个文件的网络等待相互重叠。写入同一GCS路径的重复请求不再下载，
+        等第一个请求结束后返回skipped结果（同一URL为duplicate_url，不同URL生成
+        相同文件名为duplicate_gcs_path），duplicate_of记录第一个请求的URL和状态，
+        因此每次实际下载只统计一次，也不会同时写同一个对象。
+        
+        Args:
+            semaphore: 限制同时进行的下载数量
+            download_info: 下载信息字典
+            source: 数据源标识
+            
+        Returns:
+            Dict: 下载结果
+        """
+        key = self._build_gcs_path(download_info, source)
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            async def download() -> Dict:
+                async with semaphore:
+                    return await asyncio.to_thread(self._download_geographic_file, download_info, source)
+            
+            task = asyncio.ensure_future(download())
+            self._inflight[key] = (download_info['url'], task)
+            return await task
+        
+        first_url, task = inflight
+        result = await task
+        if download_info['url'] == first_url:
+            self.logger.debug(f"复用 {key} 的下载结果")
+            reason = 'duplicate_url'
+        else:
+            self.logger.warning(f"{download_info['url']} 与 {first_url} 对应同一GCS路径 {key}，跳过下载")
+            reason = 'duplicate_gcs_path'
+        
+        return {
+            'filename': download_info['filename'],
+            'status': 'skipped',
+            'reason': reason,
+            'url': download_info['url'],
+            'gcs_path': key,
+            'source': source,
+            'data_type': download_info.get('data_type'),
+            'duplicate_of': {'url': first_url, 'status': result.get('status')}
+        }
+    
+    def _build_gcs_path(self, download_info: Dict, source: str) -> str:
+        """
+        构建文件的GCS路径
+        
+        Args:
+            download_info: 下载信息字典
+            source: 数据源标识
+            
+        Returns:
+            str: GCS路径
+        """
+        year = download_info.get('year', self.target_year)
+        return f"raw/insee-contours/{year}/{source}/{download_info['filename']}"
+    
+    async def _collect_ign_data(self, semaphore: Optional[asyncio.Semaphore] = None) -> List[Dict]:
         """
         收集IGN官方地理边界数据
         
+        Args:
+            semaphore: 下载并发上限，默认按max_concurrent_downloads创建
+        
         Returns:
             List[Dict]: 下载结果列表
         """
-        results = []
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
         
-        # IGN IRIS数据下载链接（基于研究结果）
-        ign_datasets = {
-            'iris_lambert93_shp': {
-                'url': f'https://data.geopf.fr/telechargement/download/CONTOURS-IRIS/CONTOURS-IRIS_3-0__SHP_LAMB93_FXX_{self.target_year}-01-01/',
-                'filename': f'contours_iris_lambert93_{self.target_year}.zip',
-                'data_type': 'iris',
-                'format': 'shapefile',
-                'projection': 'lambert93'
-            },
-            'iris_lambert93_gpkg': {
-                'url': f'https://data.geopf.fr/telechargement/download/CONTOURS-IRIS/CONTOURS-IRIS_3-0__GPKG_LAMB93_FXX_{self.target_year}-01-01/',
-                'filename': f'contours_iris_lambert93_{self.target_year}.gpkg',
-                'data_type': 'iris',
-                'format': 'geopackage',
-                'projection': 'lambert93'
-            }
-        }
+        async def download(dataset_id: str, template: Dict) -> Dict:
+            try:
+                # 当年数据可能尚未发布，依次探测目标年份和备选年份
+                year = await asyncio.to_thread(self._find_ign_year, template)
+                dataset_info = self._expand_ign_template(template, year)
+                return await self._download_bounded(semaphore, dataset_info, 'ign')
+            except Exception as e:
+                self.logger.error(f"下载IGN数据集 {dataset_id} 失败: {e}")
+                return {
+                    'dataset_id': dataset_id,
+                    'status': 'failed',
+                    'error': str(e),
+                    'source': 'ign'
+                }
         
-        for dataset_id, dataset_info in ign_datasets.items():
-            if dataset_info['data_type'] in self.data_types and dataset_info['format'] in self.formats:
-                try:
-                    result = self._download_geographic_file(dataset_info, source='ign')
-                    results.append(result)
-                except Exception as e:
-                    self.logger.error(f"下载IGN数据集 {dataset_id} 失败: {e}")
-                    results.append({
-                        'dataset_id': dataset_id,
-                        'status': 'failed',
-                        'error': str(e),
-                        'source': 'ign'
-                    })
+        return list(await asyncio.gather(*(
+            download(dataset_id, template)
+            for dataset_id, template in _IGN_DATASET_TEMPLATES.items()
+            if template['data_type'] in self.data_types and template['format'] in self.formats
+        )))
+    
+    def _find_ign_year(self, template: Dict) -> int:
+        """
+        用HEAD请求找出IGN数据集最近的可用年份
         
-        return results
+        Args:
+            template: IGN数据集模板
+            
+        Returns:
+            int: 依次尝试target_year和fallback_years时第一个可访问的年份
+            
+        Raises:
+            NetworkError: 所有年份都不可访问
+        """
+        years = list(dict.fromkeys([self.target_year, *self.fallback_years]))
+        for year in years:
+            if self._get_remote_file_metadata(template['url'].format(year=year)) is not None:
+                if year != self.target_year:
+                    self.logger.info(f"{template['filename'].format(year=year)} 使用备选年份 {year}")
+                return year
+        
+        raise NetworkError(f"No IGN release available for years {years}: {template['url']}")
     
-    def _collect_datagouv_data(self) -> List[Dict]:
+    @staticmethod
+    def _expand_ign_template(template: Dict, year: int) -> Dict:
+        """
+        按年份展开IGN数据集模板
+        
+        Args:
+            template: IGN数据集模板
+            year: 数据年份
+            
+        Returns:
+            Dict: 下载信息
+        """
+        return {
+            **template,
+            'url': template['url'].format(year=year),
+            'filename': template['filename'].format(year=year),
+            'year': year
+        }
+    
+    async def _collect_datagouv_data(self, semaphore: Optional[asyncio.Semaphore] = None) -> List[Dict]:
         """
         收集data.gouv.fr地理数据
         
+        Args:
+            semaphore: 下载并发上限，默认按max_concurrent_downloads创建
+        
         Returns:
             List[Dict]: 下载结果列表
         """
-        results = []
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
         
         # 已知的data.gouv.fr数据集ID
         datagouv_datasets = {
@@ -228,46 +666,58 @@ class INSEEContoursCollector(BaseCollector):
             }
         }
         
-        for dataset_key, dataset_info in datagouv_datasets.items():
+        async def collect_dataset(dataset_key: str, dataset_info: Dict) -> List[Dict]:
             try:
                 # 获取数据集信息
                 api_url = f"https://www.data.gouv.fr/api/1/datasets/{dataset_info['dataset_id']}/"
-                resources = self._get_dataset_resources(api_url)
+                resources = await asyncio.to_thread(self._get_dataset_resources, api_url)
                 
-                # 下载匹配的资源
+                # 并发下载匹配的资源
+                downloads = []
                 for resource in resources:
-                    if self._should_download_resource(resource, dataset_info):
+                    resource_format = self._detect_format(resource)
+                    if self._should_download_resource(resource, dataset_info, resource_format):
                         download_info = {
                             'url': resource['url'],
-                            'filename': self._generate_filename(resource, dataset_info),
+                            'filename': self._generate_filename(resource, dataset_info, resource_format),
                             'data_type': dataset_info['data_type'],
-                            'format': self._detect_format(resource),
+                            'format': resource_format,
                             'dataset_name': dataset_info['name'],
                             'year': dataset_info['year']
                         }
-                        
-                        result = self._download_geographic_file(download_info, source='datagouv')
-                        results.append(result)
+                        downloads.append(self._download_bounded(semaphore, download_info, 'datagouv'))
+                
+                return list(await asyncio.gather(*downloads))
                 
             except Exception as e:
                 self.logger.error(f"处理data.gouv.fr数据集 {dataset_key} 失败: {e}")
-                results.append({
+                return [{
                     'dataset_key': dataset_key,
                     'status': 'failed',
                     'error': str(e),
                     'source': 'datagouv'
-                })
+                }]
         
-        return results
+        # 先按数据类型过滤，不需要的数据集不请求资源列表
+        dataset_results = await asyncio.gather(*(
+            collect_dataset(dataset_key, dataset_info)
+            for dataset_key, dataset_info in datagouv_datasets.items()
+            if dataset_info['data_type'] == 'all' or dataset_info['data_type'] in self.data_types
+        ))
+        return [result for results in dataset_results for result in results]
     
-    def _collect_geozones_data(self) -> List[Dict]:
+    async def _collect_geozones_data(self, semaphore: Optional[asyncio.Semaphore] = None) -> List[Dict]:
         """
         收集GeoZones标准化标识符数据
         
+        Args:
+            semaphore: 下载并发上限，默认按max_concurrent_downloads创建
+        
         Returns:
             List[Dict]: 下载结果列表
         """
-        results = []
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
         
         # GeoZones API端点
         geozones_endpoints = {
@@ -276,34 +726,37 @@ class INSEEContoursCollector(BaseCollector):
             'departements': 'https://geo.api.gouv.fr/departements',
             'regions': 'https://geo.api.gouv.fr/regions'
         }
+        current_year = datetime.now().year
         
-        for data_type, api_url in geozones_endpoints.items():
-            if data_type in self.data_types:
-                try:
-                    # 获取完整的地理数据（包含边界）
-                    api_url_with_geometry = f"{api_url}?fields=code,nom,contour&format=geojson"
-                    
-                    download_info = {
-                        'url': api_url_with_geometry,
-                        'filename': f'geozones_{data_type}_{datetime.now().year}.geojson',
-                        'data_type': data_type,
-                        'format': 'geojson',
-                        'source': 'geozones_api'
-                    }
-                    
-                    result = self._download_geographic_file(download_info, source='geozones')
-                    results.append(result)
-                    
-                except Exception as e:
-                    self.logger.error(f"下载GeoZones {data_type} 数据失败: {e}")
-                    results.append({
-                        'data_type': data_type,
-                        'status': 'failed',
-                        'error': str(e),
-                        'source': 'geozones'
-                    })
-        
-        return results
+        async def download(data_type: str, api_url: str) -> Dict:
+            try:
+                # 获取完整的地理数据（包含边界）
+                api_url_with_geometry = f"{api_url}?fields=code,nom,contour&format=geojson"
+                
+                download_info = {
+                    'url': api_url_with_geometry,
+                    'filename': f'geozones_{data_type}_{current_year}.geojson',
+                    'data_type': data_type,
+                    'format': 'geojson',
+                    'source': 'geozones_api'
+                }
+                
+                return await self._download_bounded(semaphore, download_info, 'geozones')
+                
+            except Exception as e:
+                self.logger.error(f"下载GeoZones {data_type} 数据失败: {e}")
+                return {
+                    'data_type': data_type,
+                    'status': 'failed',
+                    'error': str(e),
+                    'source': 'geozones'
+                }
+        
+        return list(await asyncio.gather(*(
+            download(data_type, api_url)
+            for data_type, api_url in geozones_endpoints.items()
+            if data_type in self.data_types
+        )))
     
     def _get_dataset_resources(self, api_url: str) -> List[Dict]:
         """
@@ -315,30 +768,39 @@ class INSEEContoursCollector(BaseCollector):
         Returns:
             List[Dict]: 资源列表
         """
+        resources = self._get_cached_response('GET', api_url)
+        if resources is not None:
+            return resources
+        
         try:
-            response = requests.get(api_url, timeout=30)
+            response = self.http_session.get(api_url, timeout=30)
             response.raise_for_status()
             dataset_data = response.json()
             
-            return dataset_data.get('resources', [])
+            resources = dataset_data.get('resources', [])
+            self._cache_response('GET', api_url, resources)
+            return resources
             
         except requests.RequestException as e:
             raise NetworkError(f"Failed to fetch dataset resources from {api_url}: {e}") from e
         except (ValueError, KeyError) as e:
             raise FranceDataError(f"Invalid dataset response from {api_url}: {e}") from e
     
-    def _should_download_resource(self, resource: Dict, dataset_info: Dict) -> bool:
+    def _should_download_resource(self, resource: Dict, dataset_info: Dict,
+                                  resource_format: Optional[str] = None) -> bool:
         """
         判断是否应该下载某个资源
         
         Args:
             resource: 资源信息
             dataset_info: 数据集信息
+            resource_format: 已检测出的文件格式，未提供时重新检测
             
         Returns:
             bool: 是否下载
         """
-        resource_format = self._detect_format(resource)
+        if resource_format is None:
+            resource_format = self._detect_format(resource)
         
         # 检查格式是否匹配
         if resource_format not in self.formats:
@@ -365,26 +827,23 @@ class INSEEContoursCollector(BaseCollector):
             str: 文件格式
         """
         url = resource.get('url', '').lower()
-        format_field = resource.get('format', '').lower()
-        mime_type = resource.get('mime', '').lower()
         
-        # 基于URL扩展名
-        if url.endswith('.zip') and ('shp' in url or 'shape' in url):
-            return 'shapefile'
-        elif url.endswith('.geojson') or url.endswith('.json'):
-            return 'geojson'
-        elif url.endswith('.gpkg'):
-            return 'geopackage'
+        # 基于URL路径扩展名（忽略查询参数）
+        suffix = Path(urlparse(url).path).suffix
+        if suffix == '.zip':
+            if _SHAPEFILE_TOKEN.search(url):
+                return 'shapefile'
+        elif suffix in _SUFFIX_FORMATS:
+            return _SUFFIX_FORMATS[suffix]
         
         # 基于format字段
-        if 'shp' in format_field or 'shape' in format_field:
-            return 'shapefile'
-        elif 'geojson' in format_field or 'json' in format_field:
-            return 'geojson'
-        elif 'gpkg' in format_field or 'geopackage' in format_field:
-            return 'geopackage'
+        format_field = resource.get('format', '').lower()
+        for pattern, file_format in _FORMAT_FIELD_PATTERNS:
+            if pattern.search(format_field):
+                return file_format
         
         # 基于MIME类型
+        mime_type = resource.get('mime', '').lower()
         if 'application/zip' in mime_type:
             return 'shapefile'  # 假设ZIP文件是Shapefile
         elif 'application/json' in mime_type:
@@ -392,20 +851,23 @@ class INSEEContoursCollector(BaseCollector):
         
         return 'unknown'
     
-    def _generate_filename(self, resource: Dict, dataset_info: Dict) -> str:
+    def _generate_filename(self, resource: Dict, dataset_info: Dict,
+                           format_type: Optional[str] = None) -> str:
         """
         生成标准化的文件名
         
         Args:
             resource: 资源信息
             dataset_info: 数据集信息
+            format_type: 已检测出的文件格式，未提供时重新检测
             
         Returns:
             str: 标准化文件名
         """
         data_type = dataset_info['data_type']
         year = dataset_info['year']
-        format_type = self._detect_format(resource)
+        if format_type is None:
+            format_type = self._detect_format(resource)
         
         # 原始文件名
         original_name = resource.get('title', resource.get('url', '').split('/')[-1])
@@ -440,16 +902,17 @@ class INSEEContoursCollector(BaseCollector):
         try:
             # 构建GCS路径
             year = download_info.get('year', self.target_year)
-            gcs_path = f"raw/insee-contours/{year}/{source}/{filename}"
+            gcs_path = self._build_gcs_path(download_info, source)
+            
+            # 已上传的对象保存了源站的ETag/Last-Modified时，用条件请求判断是否更新
+            blob = self.gcs_client.get_blob(gcs_path)
+            validators = self._get_source_validators(blob)
             
-            # 检查文件是否已存在且相同
-            if file_exists_in_gcs(self.gcs_client, self.bucket_name, gcs_path):
-                # 获取远程文件元数据进行比较
+            # 没有校验信息的旧对象：退回到比较文件大小
+            if blob is not None and not validators:
                 remote_metadata = self._get_remote_file_metadata(url)
-                local_metadata = get_file_metadata(self.gcs_client, self.bucket_name, gcs_path)
                 
-                if (local_metadata and remote_metadata and 
-                    local_metadata.get('size') == remote_metadata.get('size')):
+                if remote_metadata and blob.size == remote_metadata.get('size'):
                     self.logger.info(f"文件 {filename} 已存在且相同，跳过下载")
                     return {
                         'filename': filename,
@@ -460,34 +923,47 @@ class INSEEContoursCollector(BaseCollector):
                         'data_type': data_type
                     }
             
-            # 下载文件到临时位置
-            temp_file = Path(f"/tmp/{filename}")
+            object_metadata = {
+                'source_url': url,
+                'data_type': data_type,
+                'format': download_info.get('format', 'unknown'),
+                'source': source,
+                'collection_date': datetime.now(timezone.utc).isoformat(),
+                'target_year': str(year),
+                'projection': download_info.get('projection', 'unknown')
+            }
+            
             self.logger.info(f"开始下载 {filename} 从 {source}...")
             
-            download_file_with_retry(url, str(temp_file))
+            file_format = object_metadata['format']
+            header = None
+            if file_format == 'geopackage':
+                # 先用Range请求只取文件头：源站未修改（304）时直接跳过，
+                # 文件头不对时不必下载整个文件
+                header = self._peek_magic(url, headers=validators)
+                if header is not None and not header.startswith(_SQLITE_MAGIC):
+                    raise ValidationError("不是有效的SQLite/GeoPackage文件")
             
-            # 验证地理数据文件
-            self._validate_geographic_file(temp_file, download_info)
+            # 验证需要本地文件的格式先下载到临时文件，其余格式直接流式写入GCS
+            if file_format == 'geopackage' and header is None:
+                file_size = None
+            elif file_format in _LOCAL_VALIDATION_FORMATS or (file_format == 'geojson' and ijson is None):
+                file_size = self._transfer_via_temp_file(
+                    url, gcs_path, download_info, blob, validators, object_metadata
+                )
+            else:
+                file_size = self._stream_to_gcs(url, gcs_path, file_format, validators, object_metadata)
             
-            # 上传到GCS
-            upload_to_gcs(
-                gcs_client=self.gcs_client,
-                bucket_name=self.bucket_name,
-                source_file=str(temp_file),
-                destination_blob=gcs_path,
-                metadata={
-                    'source_url': url,
-                    'data_type': data_type,
-                    'format': download_info['format'],
+            if file_size is None:
+                self.logger.info(f"文件 {filename} 未修改，跳过")
+                return {
+                    'filename': filename,
+                    'status': 'skipped',
+                    'reason': 'not_modified',
+                    'gcs_path': gcs_path,
                     'source': source,
-                    'collection_date': datetime.now(timezone.utc).isoformat(),
-                    'target_year': str(year),
-                    'projection': download_info.get('projection', 'unknown')
+                    'data_type': data_type
                 }
-            )
-            
-            # 清理临时文件
-            temp_file.unlink()
             
             self.logger.info(f"成功下载并上传 {filename}")
             return {
@@ -496,7 +972,7 @@ class INSEEContoursCollector(BaseCollector):
                 'gcs_path': gcs_path,
                 'source': source,
                 'data_type': data_type,
-                'file_size': temp_file.stat().st_size if temp_file.exists() else None
+                'file_size': file_size
             }
             
         except Exception as e:
@@ -509,6 +985,211 @@ class INSEEContoursCollector(BaseCollector):
                 'data_type': data_type
             }
     
+    def _peek_magic(self, url: str, n: int = 16,
+                    headers: Optional[Dict[str, str]] = None) -> Optional[bytes]:
+        """
+        用Range请求读取远程文件的前n个字节
+        
+        Args:
+            url: 文件URL
+            n: 读取的字节数
+            headers: 额外的请求头（如条件请求头）
+            
+        Returns:
+            Optional[bytes]: 文件开头的字节；源站返回304时为None
+            
+        Raises:
+            NetworkError: 请求失败
+        """
+        request_headers = dict(headers or {}, Range=f'bytes=0-{n - 1}')
+        try:
+            with self.http_session.get(url, headers=request_headers, stream=True, timeout=10) as response:
+                if response.status_code == 304:
+                    return None
+                response.raise_for_status()
+                
+                # 不支持Range的服务器会返回整个文件，只读取前n个字节
+                response.raw.decode_content = True
+                return response.raw.read(n)
+        except requests.RequestException as e:
+            raise NetworkError(f"Failed to read the header of {url}: {e}") from e
+    
+    def _transfer_via_temp_file(self, url: str, gcs_path: str, download_info: Dict,
+                                blob: Optional[Any], validators: Dict[str, str],
+                                object_metadata: Dict[str, str]) -> Optional[int]:
+        """
+        下载到临时文件、验证后上传到GCS
+        
+        Args:
+            url: 文件URL
+            gcs_path: GCS目标路径
+            download_info: 下载信息字典
+            blob: GCS中已有的对象，不存在时为None
+            validators: 条件请求头
+            object_metadata: 保存到对象上的自定义元数据
+            
+        Returns:
+            Optional[int]: 上传的字节数；源站返回304或内容与已有对象相同时为None
+        """
+        # 每次调用使用独立的临时文件：并发下载的多个资源可能生成相同的文件名
+        filename = Path(download_info['filename'])
+        fd, temp_name = tempfile.mkstemp(prefix=f"{filename.stem}_", suffix=filename.suffix)
+        os.close(fd)
+        temp_file = Path(temp_name)
+        try:
+            source_metadata = self._fetch_to_file(url, temp_file, validators)
+            if source_metadata is None:
+                return None
+            
+            # 验证地理数据文件
+            self._validate_geographic_file(temp_file, download_info)
+            file_size = temp_file.stat().st_size
+            
+            # 源站的ETag/Last-Modified变了但内容与已有对象相同（CRC32C在下载时已算出）：
+            # 不重新上传，只更新校验信息，下次即可得到304
+            if blob is not None and blob.crc32c == compute_crc32c(str(temp_file)):
+                blob.metadata = {**(blob.metadata or {}), **source_metadata}
+                blob.patch()
+                return None
+            
+            # 上传到GCS，同时保存源站校验信息供下次条件请求使用
+            upload_to_gcs(
+                local_path=str(temp_file),
+                gcs_path=gcs_path,
+                check_existing=False,
+                bucket=self.gcs_client.bucket,
+                metadata={**object_metadata, **source_metadata}
+            )
+            return file_size
+        finally:
+            # 清理临时文件及其下载时记录的CRC32C（包括下载或验证失败的情况）
+            temp_file.unlink(missing_ok=True)
+            forget_crc32c(str(temp_file))
+    
+    def _stream_to_gcs(self, url: str, gcs_path: str, file_format: str,
+                       validators: Dict[str, str],
+                       object_metadata: Dict[str, str]) -> Optional[int]:
+        """
+        将响应直接流式写入GCS，不经过本地磁盘
+        
+        GeoJSON在传输过程中用ijson验证，验证失败时上传不会提交。启用write_geojson_seq时，
+        FeatureCollection的要素同时写成同名的.geojsonl副本（每行一个要素），下游可逐行读取。
+        
+        Args:
+            url: 文件URL
+            gcs_path: GCS目标路径
+            file_format: 文件格式
+            validators: 条件请求头
+            object_metadata: 保存到对象上的自定义元数据
+            
+        Returns:
+            Optional[int]: 上传的字节数；源站返回304时为None
+            
+        Raises:
+            NetworkError: 重试后仍下载失败
+            ValidationError: 文件内容验证失败
+        """
+        try:
+            return self._stream_to_gcs_with_retry(url, gcs_path, file_format, validators, object_metadata)
+        except requests.RequestException as e:
+            raise NetworkError(f"Failed to download {url}: {e}") from e
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((requests.RequestException, GoogleAPIError)),
+        reraise=True
+    )
+    def _stream_to_gcs_with_retry(self, url: str, gcs_path: str, file_format: str,
+                                  validators: Dict[str, str],
+                                  object_metadata: Dict[str, str]) -> Optional[int]:
+        """执行一次流式传输，每次重试都重新开始"""
+        with self.http_session.get(url, stream=True, timeout=self.timeout,
+                                   headers=validators or {}) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            
+            # 传输压缩时Content-Length是压缩后的大小，解压后的大小未知
+            response.raw.decode_content = True
+            size = None
+            if 'content-length' in response.headers and not response.headers.get('content-encoding'):
+                size = int(response.headers['content-length'])
+            
+            source_metadata = self._get_source_metadata(response)
+            
+            metadata = {**object_metadata, **source_metadata}
+            feature_writer = None
+            if file_format == 'geojson' and self.write_geojson_seq:
+                feature_writer = _FeatureSeqWriter(
+                    self.gcs_client,
+                    str(PurePosixPath(gcs_path).with_suffix(_GEOJSON_SEQ_SUFFIX)),
+                    metadata,
+                    self.logger
+                )
+            
+            stream = _ValidatingStream(response.raw, file_format, size, feature_writer)
+            try:
+                self.gcs_client.upload_from_stream(
+                    stream,
+                    gcs_path,
+                    size=size,
+                    content_type=response.headers.get('content-type'),
+                    metadata=metadata,
+                    chunk_size=UPLOAD_CHUNK_SIZE
+                )
+            except BaseException:
+                if feature_writer is not None:
+                    feature_writer.abort()
+                raise
+            
+            if feature_writer is not None:
+                feature_writer.finish()
+            return stream.tell()
+    
+    def _fetch_to_file(self, url: str, local_path: Path,
+                       validators: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+        """
+        条件下载文件到本地
+        
+        Args:
+            url: 文件URL
+            local_path: 本地保存路径
+            validators: 条件请求头（If-None-Match/If-Modified-Since）
+            
+        Returns:
+            Optional[Dict[str, str]]: 需要保存到对象元数据中的源站ETag/Last-Modified；
+                源站返回304（未修改）时为None
+            
+        Raises:
+            NetworkError: 重试后仍下载失败
+        """
+        try:
+            return self._fetch_to_file_with_retry(url, local_path, validators)
+        except requests.RequestException as e:
+            raise NetworkError(f"Failed to download {url}: {e}") from e
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type(requests.RequestException),
+        reraise=True
+    )
+    def _fetch_to_file_with_retry(self, url: str, local_path: Path,
+                                  validators: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """执行一次条件下载，每次重试都重新开始"""
+        with self.http_session.get(url, stream=True, timeout=self.timeout,
+                                   headers=validators or {}) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            
+            # 写入时同时计算CRC32C，比较和上传时不必再读一遍文件
+            response.raw.decode_content = True
+            save_stream(response.raw, str(local_path), self.chunk_size)
+            
+            return self._get_source_metadata(response)
+    
     def _get_remote_file_metadata(self, url: str) -> Optional[Dict]:
         """
         获取远程文件元数据
@@ -519,19 +1200,52 @@ class INSEEContoursCollector(BaseCollector):
         Returns:
             Optional[Dict]: 文件元数据
         """
+        metadata = self._get_cached_response('HEAD', url)
+        if metadata is not None:
+            return metadata
+        
         try:
-            response = requests.head(url, timeout=10)
+            response = self.http_session.head(url, timeout=10)
             response.raise_for_status()
             
-            return {
+            metadata = {
                 'size': int(response.headers.get('content-length', 0)),
                 'last_modified': response.headers.get('last-modified'),
                 'content_type': response.headers.get('content-type')
             }
+            self._cache_response('HEAD', url, metadata)
+            return metadata
         except Exception as e:
             self.logger.warning(f"无法获取远程文件元数据 {url}: {e}")
             return None
     
+    def _get_cached_response(self, method: str, url: str) -> Any:
+        """
+        读取未过期的缓存响应
+        
+        Args:
+            method: 请求方法
+            url: 请求URL
+            
+        Returns:
+            Any: 缓存的结果，未命中或已过期时为None
+        """
+        entry = _RESPONSE_CACHE.get((method, url))
+        if entry is None or time.monotonic() - entry[0] >= self.api_cache_ttl:
+            return None
+        return entry[1]
+    
+    def _cache_response(self, method: str, url: str, value: Any) -> None:
+        """
+        缓存成功的响应结果
+        
+        Args:
+            method: 请求方法
+            url: 请求URL
+            value: 解析后的结果
+        """
+        _RESPONSE_CACHE[(method, url)] = (time.monotonic(), value)
+    
     def _validate_geographic_file(self, file_path: Path, download_info: Dict) -> None:
         """
         验证地理数据文件的完整性
@@ -566,7 +1280,11 @@ class INSEEContoursCollector(BaseCollector):
     def _validate_shapefile_zip(self, file_path: Path) -> None:
         """验证Shapefile ZIP文件"""
         with zipfile.ZipFile(file_path, 'r') as zip_file:
-            zip_file.testzip()  # 测试ZIP完整性
+            # 打开ZIP时已读取并检查中央目录；只有小文件才解压校验CRC，
+            # 不再像testzip()那样解压整个归档（大的.shp可达数百MB）
+            for info in zip_file.infolist():
+                if info.file_size < _ZIP_CRC_CHECK_MAX_SIZE:
+                    zip_file.read(info)  # CRC不匹配时抛出BadZipFile
             
             file_list = zip_file.namelist()
             
@@ -579,27 +1297,59 @@ class INSEEContoursCollector(BaseCollector):
                 raise ValidationError(f"ZIP文件缺少必需的Shapefile组件 (.shp, .shx, .dbf)")
     
     def _validate_geojson_file(self, file_path: Path) -> None:
-        """验证GeoJSON文件"""
+        """验证GeoJSON文件（也接受按行分隔的GeoJSONSeq）"""
+        checker = _GeoJSONChecker()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                geojson_data = json.load(f)
-            
-            # 基本GeoJSON结构检查
-            if 'type' not in geojson_data:
-                raise ValidationError("GeoJSON文件缺少type字段")
+            with open(file_path, 'rb') as f:
+                if ijson is not None:
+                    # 流式解析，内存占用与文件大小无关
+                    for prefix, event, value in ijson.parse(f, multiple_values=True):
+                        checker.handle_event(prefix, event, value)
+                else:
+                    for geojson_type, feature_count in self._decode_geojson_values(f):
+                        checker.check_value(geojson_type, feature_count)
             
-            if geojson_data['type'] not in ['FeatureCollection', 'Feature']:
-                raise ValidationError(f"无效的GeoJSON类型: {geojson_data['type']}")
+            checker.finish()
             
-            # 检查是否有要素
-            if geojson_data['type'] == 'FeatureCollection':
-                features = geojson_data.get('features', [])
-                if len(features) == 0:
-                    raise ValidationError("GeoJSON文件不包含任何要素")
-                
-        except json.JSONDecodeError as e:
+        except _JSON_ERRORS as e:
             raise ValidationError(f"无效的JSON格式: {e}")
     
+    @staticmethod
+    def _decode_geojson_values(f: BinaryIO) -> Iterator[Tuple[Optional[str], int]]:
+        """
+        没有ijson时整体解码文件，依次产出每个顶层值（GeoJSONSeq可能有多个）
+        
+        Args:
+            f: 以二进制模式打开的文件
+            
+        Yields:
+            Tuple[Optional[str], int]: 每个顶层值的type和features中的要素数量
+        """
+        data = f.read()
+        try:
+            # 普通GeoJSON只有一个顶层值，整体解析最快
+            values = [loads_json(data)]
+        except ValueError:
+            # GeoJSONSeq有多个顶层值（无效JSON在逐个解码时报错）
+            values = INSEEContoursCollector._raw_decode_values(data.decode('utf-8'))
+        
+        for value in values:
+            if isinstance(value, dict):
+                features = value.get('features')
+                yield value.get('type'), len(features) if isinstance(features, list) else 0
+            else:
+                yield None, 0
+    
+    @staticmethod
+    def _raw_decode_values(text: str) -> Iterator[Any]:
+        """依次解码文本中以空白分隔的多个JSON值"""
+        decoder = json.JSONDecoder()
+        pos = _JSON_WHITESPACE.match(text).end()
+        while pos < len(text):
+            value, pos = decoder.raw_decode(text, pos)
+            pos = _JSON_WHITESPACE.match(text, pos).end()
+            yield value
+    
     def _validate_geopackage_file(self, file_path: Path) -> None:
         """验证GeoPackage文件"""
         # 基本文件检查（GeoPackage是SQLite数据库）
@@ -609,7 +1359,7 @@ class INSEEContoursCollector(BaseCollector):
         # 检查文件头（SQLite数据库的魔数）
         with open(file_path, 'rb') as f:
             header = f.read(16)
-            if not header.startswith(b'SQLite format 3\x00'):
+            if not header.startswith(_SQLITE_MAGIC):
                 raise ValidationError("不是有效的SQLite/GeoPackage文件")
     
     def validate_data(self, file_path: str) -> bool:
@@ -644,6 +1394,34 @@ class INSEEContoursCollector(BaseCollector):
             return False
 
 
+def _load_config(config_path: str) -> Dict:
+    """
+    加载YAML配置文件，文件未修改时复用上次解析的结果
+    
+    Args:
+        config_path: 配置文件路径
+        
+    Returns:
+        Dict: 配置字典
+        
+    Raises:
+        FileNotFoundError: 配置文件不存在
+    """
+    try:
+        mtime_ns = os.stat(config_path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"配置文件未找到: {config_path}") from None
+    
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=_YAML_LOADER)
+    _CONFIG_CACHE[config_path] = (mtime_ns, config)
+    return config
+
+
 def insee_contours_collector_main(request=None):  # pylint: disable=unused-argument
     """
     Cloud Function入口点
@@ -654,26 +1432,19 @@ def insee_contours_collector_main(request=None):  # pylint: disable=unused-argum
     Returns:
         str: JSON格式的响应
     """
-    import os
-    
     try:
         # 设置日志
         setup_logging()
         
         # 加载配置
         config_path = os.environ.get('CONFIG_PATH', '/workspace/config/config.yaml')
-        if not os.path.exists(config_path):
-            raise FileNotFoundError(f"配置文件未找到: {config_path}")
-        
-        import yaml
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        config = _load_config(config_path)
         
         # 创建收集器并执行
         collector = INSEEContoursCollector(config)
         result = collector.collect()
         
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return dumps_json(result, indent=True).decode('utf-8')
         
     except Exception as e:
         error_result = {
@@ -682,17 +1453,13 @@ def insee_contours_collector_main(request=None):  # pylint: disable=unused-argum
             'error': str(e),
             'timestamp': datetime.now(timezone.utc).isoformat()
         }
-        return json.dumps(error_result, ensure_ascii=False, indent=2)
+        return dumps_json(error_result, indent=True).decode('utf-8')
 
 
 if __name__ == "__main__":
     # 本地测试
-    import yaml
-    
-    config_path = "../../config/config.yaml"
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    config = _load_config("../../config/config.yaml")
     
     collector = INSEEContoursCollector(config)
     result = collector.collect()
-    print(json.dumps(result, ensure_ascii=False, indent=2))
\ No newline at end of file
+    print(dumps_json(result, indent=True).decode('utf-8'))
\ No newline at end of file
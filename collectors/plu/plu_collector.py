@@ -5,21 +5,165 @@ service using WFS (Web Feature Service) protocol. It supports spatial filtering,
 multiple output formats, and incremental updates.
 """
 
+import functools
+import gzip
+import hashlib
+import io
 import json
 import logging
+import math
 import os
 import tempfile
+import threading
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
-from urllib.parse import urlencode, urlparse
+from typing import Dict, Iterator, List, Optional, Any, Tuple, Union
+from urllib.parse import quote_plus, urlencode, urlparse
 import requests
+import numpy as np
+import pandas as pd
 import geopandas as gpd
+import shapely
 from shapely.geometry import box
 from shapely import wkt
+from pyproj import CRS, Transformer
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+try:
+    import pyogrio
+except ImportError:  # pragma: no cover - pyogrio is optional
+    pyogrio = None
 
 from collectors.base_collector import BaseCollector
+from utils.utils import dumps_json, loads_json
+
+
+# WFS SRS names that PROJ does not know under the same spelling
+_SRS_ALIASES = {'CRS:84': 'OGC:CRS84'}
+
+
+def _parse_srs(srs: str) -> CRS:
+    """Parse an SRS name as used in WFS requests into a pyproj CRS."""
+    return CRS.from_user_input(_SRS_ALIASES.get(srs, srs))
+
+
+_GML_NAMESPACES = ('http://www.opengis.net/gml', 'http://www.opengis.net/gml/3.2')
+
+# Elements wrapping features in WFS 1.x (gml:featureMember) and 2.0 (wfs:member) responses
+_GML_MEMBER_TAGS = frozenset(
+    [f'{{{ns}}}featureMember' for ns in _GML_NAMESPACES] + ['{http://www.opengis.net/wfs/2.0}member']
+)
+
+# GML multi-geometries: collection name -> (GeoJSON type, member element names)
+_GML_MULTI_GEOMETRIES = {
+    'MultiPoint': ('MultiPoint', ('pointMember', 'pointMembers')),
+    'MultiCurve': ('MultiLineString', ('curveMember', 'curveMembers')),
+    'MultiLineString': ('MultiLineString', ('lineStringMember',)),
+    'MultiSurface': ('MultiPolygon', ('surfaceMember', 'surfaceMembers')),
+    'MultiPolygon': ('MultiPolygon', ('polygonMember',)),
+}
+
+
+def _split_gml_tag(tag: str) -> Tuple[str, str]:
+    """Split an ElementTree tag into (namespace, local name)."""
+    if tag.startswith('{'):
+        namespace, _, name = tag[1:].partition('}')
+        return namespace, name
+    return '', tag
+
+
+def _gml_positions(elem: ET.Element) -> List[List[float]]:
+    """Read the coordinates of a GML geometry's pos/posList/coordinates children."""
+    positions = []
+    for child in elem.iter():
+        _, name = _split_gml_tag(child.tag)
+        if name == 'posList':
+            values = [float(v) for v in child.text.split()]
+            dimension = int(child.get('srsDimension') or elem.get('srsDimension') or 2)
+            positions.extend(values[i:i + dimension] for i in range(0, len(values), dimension))
+        elif name == 'pos':
+            positions.append([float(v) for v in child.text.split()])
+        elif name == 'coordinates':
+            # GML 2: "x,y x,y ..."
+            positions.extend([float(v) for v in pair.split(',')] for pair in child.text.split())
+    return positions
+
+
+def _gml_polygon_rings(elem: ET.Element) -> List[List[List[float]]]:
+    """Read the exterior and interior rings of a GML Polygon or Surface patch."""
+    rings = []
+    for child in elem.iter():
+        _, name = _split_gml_tag(child.tag)
+        if name in ('exterior', 'interior', 'outerBoundaryIs', 'innerBoundaryIs'):
+            rings.append(_gml_positions(child))
+    return rings
+
+
+def _gml_geometry(elem: ET.Element) -> Optional[Dict]:
+    """Convert a GML geometry element to a GeoJSON geometry dict.
+    
+    Coordinates are kept in the order the server wrote them.
+    """
+    _, name = _split_gml_tag(elem.tag)
+    if name == 'Point':
+        return {'type': 'Point', 'coordinates': _gml_positions(elem)[0]}
+    if name in ('LineString', 'Curve'):
+        return {'type': 'LineString', 'coordinates': _gml_positions(elem)}
+    if name in ('Polygon', 'Surface'):
+        return {'type': 'Polygon', 'coordinates': _gml_polygon_rings(elem)}
+    if name in _GML_MULTI_GEOMETRIES:
+        geometry_type, member_names = _GML_MULTI_GEOMETRIES[name]
+        parts = []
+        for member in elem:
+            if _split_gml_tag(member.tag)[1] in member_names:
+                for part_elem in member:
+                    part = _gml_geometry(part_elem)
+                    if part is not None:
+                        # A Multi* member may itself be a multi-geometry
+                        parts.extend(part['coordinates'] if part['type'] == geometry_type else [part['coordinates']])
+        return {'type': geometry_type, 'coordinates': parts}
+    return None
+
+
+def _gml_feature(elem: ET.Element) -> Dict:
+    """Convert a GML feature element to a GeoJSON feature dict."""
+    feature = {'type': 'Feature', 'properties': {}, 'geometry': None}
+    for namespace in _GML_NAMESPACES:
+        feature_id = elem.get(f'{{{namespace}}}id')
+        if feature_id is not None:
+            feature['id'] = feature_id
+            break
+    
+    for child in elem:
+        namespace, name = _split_gml_tag(child.tag)
+        if namespace in _GML_NAMESPACES:
+            # gml:boundedBy, gml:name and similar metadata
+            continue
+        if len(child):
+            if feature['geometry'] is None:
+                feature['geometry'] = _gml_geometry(child[0])
+        else:
+            feature['properties'][name] = child.text
+    return feature
+
+
+@functools.lru_cache(maxsize=256)
+def _quote_cql(cql_filter: str) -> str:
+    """URL-encode a CQL filter; every page of a query sends the same one."""
+    return quote_plus(cql_filter)
+
+
+# HTTP statuses worth retrying: the GPU WFS sheds load with 429/502/503/504
+_TRANSIENT_STATUS_CODES = frozenset((429, 502, 503, 504))
+
+
+def _is_transient_wfs_error(error: BaseException) -> bool:
+    """Return whether a failed WFS request should be retried."""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in _TRANSIENT_STATUS_CODES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
 
 
 class PLUCollector(BaseCollector):
@@ -35,6 +179,9 @@ class PLUCollector(BaseCollector):
         self.wfs_version = self.collector_config.get('version', '2.0.0')
         self.output_format = self.collector_config.get('output_format', 'application/json')
         self.max_features = self.collector_config.get('max_features', 5000)
+        self.page_size = min(self.collector_config.get('page_size', 1000), self.max_features)
+        self.max_url_length = self.collector_config.get('max_url_length', 7000)
+        self._wfs_url_prefixes: Dict[str, str] = {}
         
         # Layer configuration
         self.layer_types = self.collector_config.get('layer_types', ['GPU.ZONE_URBA'])
@@ -45,22 +192,59 @@ class PLUCollector(BaseCollector):
         self.use_insee_codes = filter_config.get('use_insee_codes', True)
         self.insee_codes = filter_config.get('insee_codes', [])
         self.default_bbox = filter_config.get('default_bbox', {})
+        self.bbox_grid = filter_config.get('bbox_grid', [1, 1])  # [columns, rows] of bbox tiles
         
         # Output configuration
         self.output_formats = self.collector_config.get('output_formats', ['geojson'])
-        self.input_srs = self.collector_config.get('input_srs', 'EPSG:4326')
         self.output_srs = self.collector_config.get('output_srs', 'EPSG:2154')
+        # Features are requested in input_srs; by default the server already
+        # returns them in output_srs
+        self.input_srs = self.collector_config.get('input_srs', self.output_srs)
+        # Built once and shared by all layers; None when no reprojection is needed
+        self._transformer: Optional[Transformer] = None
+        if not _parse_srs(self.input_srs).equals(_parse_srs(self.output_srs)):
+            self._transformer = Transformer.from_crs(self.input_srs, self.output_srs, always_xy=True)
+        # The bbox is sent in input_srs too, so the server does not reproject it
+        self.request_bbox = (
+            self._project_bbox(self._create_bbox_filter(), self.input_srs) if self.default_bbox else None
+        )
         
         # Processing configuration
         self.enable_incremental = self.collector_config.get('enable_incremental', True)
+        self.timestamp_attribute = self.collector_config.get('timestamp_attribute', 'gpu_timestamp')
+        self.geometry_attribute = self.collector_config.get('geometry_attribute', 'the_geom')
+        self.incremental_state_path = f"{self.metadata_path}/incremental_state.json"
         self.batch_by_department = self.collector_config.get('batch_by_department', True)
         self.validate_geometry = self.collector_config.get('validate_geometry', True)
         
         # Timeouts and retries
         self.wfs_timeout = self.collector_config.get('timeout_seconds', 120)
+        
+        # GetFeature responses cached in GCS across runs; 0 disables the cache
+        self.wfs_cache_ttl = self.collector_config.get('wfs_cache_ttl_hours', 0) * 3600
+        self.wfs_cache_path = f"{self.metadata_path}/wfs_cache"
+        # Incremental queries embed their watermark, so their URLs never repeat
+        # across runs and are not cached
+        self._changed_filter_prefix = f"{self.timestamp_attribute} AFTER "
+        # Oldest request time of the cached responses each layer was built from
+        self._cached_snapshots: Dict[str, datetime] = {}
+        self._cached_snapshots_lock = threading.Lock()
         self.retry_on_empty = self.collector_config.get('retry_on_empty', True)
         self.max_empty_retries = self.collector_config.get('max_empty_retries', 3)
         
+        # Concurrent WFS requests (layers, and INSEE batches within a layer)
+        self.max_parallel_requests = self.collector_config.get('max_parallel_requests', 4)
+        self._request_executor: Optional[ThreadPoolExecutor] = None
+        self._request_executor_lock = threading.Lock()
+        
+        # Transient WFS failures are retried with backoff on the pooled http_session
+        self._wfs_retrying = Retrying(
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_exponential(multiplier=1, min=2, max=self.retry_delay),
+            retry=retry_if_exception(_is_transient_wfs_error),
+            reraise=True
+        )
+        
         self.logger.info(f"Initialized PLU collector with {len(self.layer_types)} layer types")
     
     def collect(self) -> Dict[str, Any]:
@@ -79,10 +263,32 @@ class PLUCollector(BaseCollector):
         
         self.logger.info(f"Starting PLU data collection for {len(self.layer_types)} layer types")
         
-        for layer_type in self.layer_types:
+        if not self.layer_types:
+            return collection_results
+        
+        # Time of the last complete collection of each layer, for incremental runs
+        watermarks = self._load_incremental_state() if self.enable_incremental else {}
+        
+        # Layers are fetched concurrently; results are merged in configuration order
+        try:
+            with ThreadPoolExecutor(
+                max_workers=min(len(self.layer_types), self.max_parallel_requests),
+                thread_name_prefix="plu-layer"
+            ) as executor:
+                futures = [
+                    (layer_type, executor.submit(self._collect_layer_data, layer_type, watermarks.get(layer_type)))
+                    for layer_type in self.layer_types
+                ]
+        finally:
+            # Every request has completed; release the workers on warm instances
+            self._shutdown_request_executor()
+        
+        new_watermarks = {}
+        for layer_type, future in futures:
             try:
-                self.logger.info(f"Processing layer: {layer_type}")
-                layer_result = self._collect_layer_data(layer_type)
+                layer_result = future.result()
+                if layer_result.get('watermark'):
+                    new_watermarks[layer_type] = layer_result['watermark']
                 
                 collection_results['layers_processed'] += 1
                 collection_results['features_collected'] += layer_result.get('features_count', 0)
@@ -104,6 +310,9 @@ class PLUCollector(BaseCollector):
                     'type': type(e).__name__
                 })
         
+        if self.enable_incremental and new_watermarks:
+            self._save_incremental_state({**watermarks, **new_watermarks})
+        
         self.logger.info(
             f"PLU collection completed: {collection_results['layers_processed']} layers, "
             f"{collection_results['features_collected']} features, "
@@ -112,56 +321,127 @@ class PLUCollector(BaseCollector):
         
         return collection_results
     
-    def _collect_layer_data(self, layer_type: str) -> Dict[str, Any]:
+    def _collect_layer_data(self, layer_type: str, changed_since: Optional[str] = None) -> Dict[str, Any]:
         """Collect data for a specific layer type.
         
         Args:
             layer_type: WFS layer name (e.g., 'GPU.ZONE_URBA')
+            changed_since: Only collect features updated after this ISO 8601
+                UTC time (incremental run); None collects everything
             
         Returns:
-            Dictionary with layer collection results
+            Dictionary with layer collection results. 'watermark' holds the
+            time the fetch started, or the request time of the oldest cached
+            response it used, when the layer was completely collected.
         """
+        self.logger.info(f"Processing layer: {layer_type}")
+        
         layer_result = {
             'features_count': 0,
             'files_created': 0,
             'requests_made': 0,
-            'processing_time_seconds': 0
+            'processing_time_seconds': 0,
+            'incremental': changed_since is not None
         }
         
         start_time = datetime.now()
+        # Updates made while the layer is fetched are picked up by the next run
+        watermark = datetime.now(timezone.utc)
+        with self._cached_snapshots_lock:
+            self._cached_snapshots.pop(layer_type, None)
+        
+        changed_filter = None
+        if changed_since:
+            self.logger.info(f"Collecting {layer_type} features updated since {changed_since}")
+            changed_filter = f"{self._changed_filter_prefix}{changed_since}"
         
         # Determine filtering strategy
         if self.use_bbox and self.default_bbox:
             # Use bbox filtering
-            bbox_filter = self._create_bbox_filter()
-            features_data = self._fetch_wfs_data(layer_type, bbox_filter=bbox_filter)
+            features_data = self._fetch_data_by_bbox_tiles(layer_type, self.request_bbox, changed_filter)
         elif self.use_insee_codes and self.insee_codes:
             # Use INSEE code filtering
-            features_data = self._fetch_data_by_insee_codes(layer_type, self.insee_codes)
+            features_data = self._fetch_data_by_insee_codes(layer_type, self.insee_codes, changed_filter)
         else:
             # Fetch all data (use with caution - can be very large)
             self.logger.warning(f"Fetching all data for {layer_type} - this may be slow")
-            features_data = self._fetch_wfs_data(layer_type)
+            features_data = self._fetch_wfs_paged(layer_type, cql_filter=changed_filter)
         
         layer_result['requests_made'] = len(features_data) if isinstance(features_data, list) else 1
         
         # Process and save features
-        if features_data:
+        complete = features_data is not None
+        if features_data and features_data.get('features'):
             processed_data = self._process_features(features_data, layer_type)
+            complete = processed_data is not None
             if processed_data is not None:
                 layer_result['features_count'] = len(processed_data)
                 
                 # Save in different formats
                 for output_format in self.output_formats:
-                    file_created = self._save_layer_data(processed_data, layer_type, output_format)
+                    file_created = self._save_layer_data(
+                        processed_data, layer_type, output_format, changes_only=changed_since is not None
+                    )
                     if file_created:
                         layer_result['files_created'] += 1
+                    else:
+                        complete = False
+        
+        if complete:
+            # Cached pages only reflect the layer as of their original request
+            with self._cached_snapshots_lock:
+                cached_snapshot = self._cached_snapshots.pop(layer_type, None)
+            if cached_snapshot is not None and cached_snapshot < watermark:
+                watermark = cached_snapshot
+            layer_result['watermark'] = watermark.strftime('%Y-%m-%dT%H:%M:%SZ')
         
         end_time = datetime.now()
         layer_result['processing_time_seconds'] = (end_time - start_time).total_seconds()
         
         return layer_result
     
+    def _incremental_signature(self) -> str:
+        """Hash the filter settings that define which features a run covers."""
+        filters = {
+            'bbox': self._create_bbox_filter() if self.use_bbox and self.default_bbox else None,
+            'insee_codes': sorted(self.insee_codes) if self.use_insee_codes else None
+        }
+        return hashlib.sha1(dumps_json(filters)).hexdigest()
+    
+    def _load_incremental_state(self) -> Dict[str, str]:
+        """Load the last complete collection time of each layer.
+        
+        State recorded with different filter settings is ignored, so changing
+        the bbox or INSEE codes triggers a full collection.
+        
+        Returns:
+            Mapping of layer type to ISO 8601 UTC time, empty if none applies
+        """
+        try:
+            state = loads_json(self.gcs_client.download_as_bytes(self.incremental_state_path))
+        except Exception as e:
+            self.logger.info(f"No incremental state found, collecting all features: {e}")
+            return {}
+        
+        if not isinstance(state, dict) or state.get('filter_signature') != self._incremental_signature():
+            self.logger.info("Filter settings changed since the last run, collecting all features")
+            return {}
+        return dict(state.get('layers', {}))
+    
+    def _save_incremental_state(self, watermarks: Dict[str, str]) -> None:
+        """Save the last complete collection time of each layer.
+        
+        Args:
+            watermarks: Mapping of layer type to ISO 8601 UTC time
+        """
+        state = {'filter_signature': self._incremental_signature(), 'layers': watermarks}
+        try:
+            self.gcs_client.upload_from_bytes(
+                dumps_json(state), self.incremental_state_path, content_type='application/json'
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to save incremental state: {e}")
+    
     def _create_bbox_filter(self) -> Dict[str, float]:
         """Create bounding box filter from configuration.
         
@@ -176,127 +456,511 @@ class PLUCollector(BaseCollector):
             'srs': self.default_bbox.get('srs', 'CRS:84')
         }
     
+    @staticmethod
+    def _project_bbox(bbox_filter: Dict, srs: str) -> Dict:
+        """Express a bounding box in another SRS.
+        
+        The result encloses the whole original box; projected bounds are
+        widened to whole units.
+        
+        Args:
+            bbox_filter: Bounding box filter parameters
+            srs: Target SRS name
+            
+        Returns:
+            Bounding box filter in srs, or bbox_filter if already in it
+        """
+        source, target = _parse_srs(bbox_filter['srs']), _parse_srs(srs)
+        if source.equals(target):
+            return bbox_filter
+        
+        transformer = Transformer.from_crs(source, target, always_xy=True)
+        min_x, min_y, max_x, max_y = transformer.transform_bounds(
+            bbox_filter['min_x'], bbox_filter['min_y'], bbox_filter['max_x'], bbox_filter['max_y']
+        )
+        if target.is_projected:
+            min_x, min_y = math.floor(min_x), math.floor(min_y)
+            max_x, max_y = math.ceil(max_x), math.ceil(max_y)
+        return {'min_x': min_x, 'min_y': min_y, 'max_x': max_x, 'max_y': max_y, 'srs': srs}
+    
     def _fetch_wfs_data(self, layer_type: str, bbox_filter: Optional[Dict] = None, 
-                       cql_filter: Optional[str] = None) -> Optional[Dict]:
+                       cql_filter: Optional[str] = None, start_index: Optional[int] = None,
+                       count: Optional[int] = None) -> Optional[Dict]:
         """Fetch data from WFS service with optional filtering.
         
         Args:
             layer_type: WFS layer name
             bbox_filter: Bounding box filter parameters
             cql_filter: CQL (Common Query Language) filter string
+            start_index: Offset of the first feature of a WFS 2.0 page
+            count: Page size; requests up to max_features when not paging
             
         Returns:
             GeoJSON-like feature collection or None if failed
         """
-        params = {
-            'service': 'WFS',
-            'version': self.wfs_version,
-            'request': 'GetFeature',
-            'typename': layer_type,
-            'outputFormat': self.output_format,
-            'maxfeatures': self.max_features,
-            'srsname': self.input_srs
-        }
-        
-        # Add bounding box filter
-        if bbox_filter:
-            bbox_str = f"{bbox_filter['min_x']},{bbox_filter['min_y']},{bbox_filter['max_x']},{bbox_filter['max_y']},{bbox_filter['srs']}"
-            params['bbox'] = bbox_str
-        
-        # Add CQL filter
-        if cql_filter:
-            params['cql_filter'] = cql_filter
-        
-        url = f"{self.wfs_endpoint}?{urlencode(params)}"
+        url = self._build_wfs_url(layer_type, bbox_filter, cql_filter, start_index, count)
         
         self.logger.debug(f"WFS request URL: {url}")
         
         try:
-            response = requests.get(url, timeout=self.wfs_timeout)
-            response.raise_for_status()
+            cacheable = not (cql_filter and self._changed_filter_prefix in cql_filter)
+            cached = self._read_wfs_cache(url) if cacheable else None
+            if cached is not None:
+                content, requested_at = cached
+                self._record_cached_snapshot(layer_type, requested_at)
+            else:
+                requested_at = datetime.now(timezone.utc)
+                content = self._wfs_retrying(self._get_wfs_response, url).content
             
             # Parse response based on format
             if self.output_format == 'application/json':
-                return response.json()
+                data = loads_json(content)
             else:
                 # Handle GML/XML response
-                return self._parse_gml_response(response.text)
+                data = self._parse_gml_response(content)
+            
+            if cacheable and cached is None and data is not None:
+                self._write_wfs_cache(url, content, requested_at)
+            return data
                 
         except requests.exceptions.RequestException as e:
             self.logger.error(f"WFS request failed for {layer_type}: {e}")
             return None
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # json.JSONDecodeError and orjson.JSONDecodeError are both ValueErrors
             self.logger.error(f"Failed to parse JSON response for {layer_type}: {e}")
             return None
     
-    def _fetch_data_by_insee_codes(self, layer_type: str, insee_codes: List[str]) -> Optional[Dict]:
+    def _build_wfs_url(self, layer_type: str, bbox_filter: Optional[Dict] = None,
+                       cql_filter: Optional[str] = None, start_index: Optional[int] = None,
+                       count: Optional[int] = None) -> str:
+        """Build a GetFeature request URL.
+        
+        Args:
+            layer_type: WFS layer name
+            bbox_filter: Bounding box filter parameters
+            cql_filter: CQL (Common Query Language) filter string
+            start_index: Offset of the first feature of a WFS 2.0 page
+            count: Page size; requests up to max_features when not paging
+            
+        Returns:
+            Request URL
+        """
+        # The service/layer/format part is the same for every request of a
+        # layer, so it is encoded once
+        prefix = self._wfs_url_prefixes.get(layer_type)
+        if prefix is None:
+            prefix = f"{self.wfs_endpoint}?" + urlencode({
+                'service': 'WFS',
+                'version': self.wfs_version,
+                'request': 'GetFeature',
+                'typename': layer_type,
+                'outputFormat': self.output_format,
+                'srsname': self.input_srs
+            })
+            self._wfs_url_prefixes[layer_type] = prefix
+        
+        query = [prefix]
+        if count is None:
+            query.append(f"maxfeatures={self.max_features}")
+        else:
+            query.append(f"count={count}&startIndex={start_index or 0}")
+        
+        # Add bounding box filter
+        if bbox_filter:
+            bbox_str = f"{bbox_filter['min_x']},{bbox_filter['min_y']},{bbox_filter['max_x']},{bbox_filter['max_y']},{bbox_filter['srs']}"
+            if cql_filter:
+                # The bbox parameter cannot be combined with cql_filter, so
+                # the bounding box becomes part of the CQL expression
+                cql_filter = f"BBOX({self.geometry_attribute},{bbox_str.rsplit(',', 1)[0]},'{bbox_filter['srs']}') AND ({cql_filter})"
+            else:
+                query.append(f"bbox={quote_plus(bbox_str)}")
+        
+        # Add CQL filter
+        if cql_filter:
+            query.append(f"cql_filter={_quote_cql(cql_filter)}")
+        
+        return '&'.join(query)
+    
+    def _wfs_cache_blob_path(self, url: str) -> str:
+        """Return the GCS path caching the response of a GetFeature URL."""
+        return f"{self.wfs_cache_path}/{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json.gz"
+    
+    def _read_wfs_cache(self, url: str) -> Optional[Tuple[bytes, datetime]]:
+        """Read a cached GetFeature response younger than wfs_cache_ttl.
+        
+        Expired entries are deleted. Cache errors are logged and treated as misses.
+        
+        Args:
+            url: Request URL
+            
+        Returns:
+            Response body and the time its request was sent, or None on a miss
+        """
+        if self.wfs_cache_ttl <= 0:
+            return None
+        
+        try:
+            blob = self.gcs_client.get_blob(self._wfs_cache_blob_path(url))
+            if blob is None or blob.updated is None:
+                return None
+            if (datetime.now(timezone.utc) - blob.updated).total_seconds() >= self.wfs_cache_ttl:
+                blob.delete()
+                return None
+            # Entries written without a request time fall back to the upload time
+            requested_at = blob.updated
+            if blob.metadata and blob.metadata.get('requested_at'):
+                requested_at = datetime.fromisoformat(blob.metadata['requested_at'])
+            content = gzip.decompress(blob.download_as_bytes())
+        except Exception as e:
+            self.logger.warning(f"Failed to read WFS cache for {url}: {e}")
+            return None
+        
+        self.logger.debug(f"WFS cache hit: {url}")
+        return content, requested_at
+    
+    def _write_wfs_cache(self, url: str, content: bytes, requested_at: datetime) -> None:
+        """Store a GetFeature response in the cache, ignoring failures.
+        
+        Args:
+            url: Request URL
+            content: Response body
+            requested_at: Time the request was sent, which bounds the
+                watermark of incremental runs served from this entry
+        """
+        if self.wfs_cache_ttl <= 0:
+            return
+        
+        try:
+            self.gcs_client.upload_from_bytes(
+                gzip.compress(content, compresslevel=1),
+                self._wfs_cache_blob_path(url),
+                content_type='application/gzip',
+                metadata={'requested_at': requested_at.isoformat()}
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to write WFS cache for {url}: {e}")
+    
+    def _record_cached_snapshot(self, layer_type: str, requested_at: datetime) -> None:
+        """Remember the oldest cached response used for a layer."""
+        with self._cached_snapshots_lock:
+            oldest = self._cached_snapshots.get(layer_type)
+            if oldest is None or requested_at < oldest:
+                self._cached_snapshots[layer_type] = requested_at
+    
+    def _fetch_wfs_paged(self, layer_type: str, **filters) -> Optional[Dict]:
+        """Fetch every feature matching the filters in page_size pages.
+        
+        The first page is fetched alone. If it reports numberMatched, all
+        remaining pages are requested at once; otherwise pages are requested
+        max_parallel_requests at a time until one comes back short.
+        
+        Args:
+            layer_type: WFS layer name
+            **filters: bbox_filter and/or cql_filter for _fetch_wfs_data
+            
+        Returns:
+            Feature collection with the pages concatenated in order, or None
+            if any page failed
+        """
+        pages = self._fetch_wfs_pages(layer_type, [0], filters)
+        if pages is None:
+            return None
+        
+        first_page = pages[0]
+        features = list(first_page['features'])
+        number_matched = first_page.get('numberMatched')
+        if not isinstance(number_matched, int):
+            number_matched = None  # GeoServer reports 'unknown' when it did not count
+        
+        offset = self.page_size
+        last_page_full = len(features) == self.page_size
+        while last_page_full:
+            if number_matched is not None:
+                offsets = list(range(offset, number_matched, self.page_size))
+            else:
+                offsets = [offset + i * self.page_size for i in range(self.max_parallel_requests)]
+            if not offsets:
+                break
+            
+            pages = self._fetch_wfs_pages(layer_type, offsets, filters)
+            if pages is None:
+                return None
+            
+            for page in pages:
+                features.extend(page['features'])
+            last_page_full = number_matched is None and all(
+                len(page['features']) == self.page_size for page in pages
+            )
+            offset = offsets[-1] + self.page_size
+        
+        return {'type': 'FeatureCollection', 'features': features}
+    
+    def _fetch_wfs_pages(self, layer_type: str, offsets: List[int],
+                         filters: Dict[str, Any]) -> Optional[List[Dict]]:
+        """Request several pages concurrently on the request pool.
+        
+        Args:
+            layer_type: WFS layer name
+            offsets: startIndex of each page
+            filters: bbox_filter and/or cql_filter for _fetch_wfs_data
+            
+        Returns:
+            Feature collection of each page in offset order, or None if any
+            page failed
+        """
+        pages = list(self._get_request_executor().map(
+            lambda offset: self._fetch_wfs_data(
+                layer_type, start_index=offset, count=self.page_size, **filters
+            ),
+            offsets
+        ))
+        
+        if any(page is None or 'features' not in page for page in pages):
+            self.logger.error(f"WFS paging failed for {layer_type}")
+            return None
+        return pages
+    
+    def _get_wfs_response(self, url: str) -> requests.Response:
+        """Send one GetFeature request on the collector's pooled session.
+        
+        Args:
+            url: Full GetFeature URL
+            
+        Returns:
+            Successful response
+            
+        Raises:
+            requests.RequestException: If the request fails or returns an error status
+        """
+        response = self.http_session.get(url, timeout=self.wfs_timeout)
+        response.raise_for_status()
+        return response
+    
+    def _fetch_data_by_insee_codes(self, layer_type: str, insee_codes: List[str],
+                                   cql_filter: Optional[str] = None) -> Optional[Dict]:
         """Fetch data filtered by INSEE commune codes.
         
         Args:
             layer_type: WFS layer name  
             insee_codes: List of INSEE commune codes
+            cql_filter: Additional CQL condition applied to every batch
             
         Returns:
             Combined feature collection or None if failed
         """
         all_features = []
         
-        # Process INSEE codes in batches to avoid URL length limits
-        batch_size = 10  # Adjust based on URL length limits
+        # Quote each code once, as a CQL string literal
+        quoted_codes = ["'" + code.replace("'", "''") + "'" for code in insee_codes]
+        condition = f" AND ({cql_filter})" if cql_filter else ""
+        
+        # Process INSEE codes in batches as large as the URL length allows
+        batch_size = self._insee_batch_size(layer_type, quoted_codes, condition)
+        
+        # Create CQL filter for each batch of INSEE codes
+        insee_filters = [
+            f"INSEE_COM IN ({','.join(quoted_codes[i:i + batch_size])}){condition}"
+            for i in range(0, len(quoted_codes), batch_size)
+        ]
+        
+        self.logger.debug(f"Fetching data for {len(insee_filters)} INSEE code batches")
+        
+        batch_results = self._fetch_queries(
+            layer_type, [{'cql_filter': insee_filter} for insee_filter in insee_filters]
+        )
+        
+        if any(batch_data is None for batch_data in batch_results):
+            self.logger.error(f"INSEE code batch request failed for {layer_type}")
+            return None
+        
+        for batch_data in batch_results:
+            all_features.extend(batch_data.get('features', []))
+        
+        # Return combined feature collection
+        return {
+            'type': 'FeatureCollection',
+            'features': all_features
+        }
+    
+    def _insee_batch_size(self, layer_type: str, quoted_codes: List[str], condition: str = "") -> int:
+        """Return how many INSEE codes fit in one request within max_url_length.
         
-        for i in range(0, len(insee_codes), batch_size):
-            batch_codes = insee_codes[i:i + batch_size]
+        Args:
+            layer_type: WFS layer name
+            quoted_codes: INSEE codes quoted as CQL string literals
+            condition: CQL appended after the IN list
             
-            # Create CQL filter for INSEE codes
-            insee_filter = "INSEE_COM IN ('" + "','".join(batch_codes) + "')"
+        Returns:
+            Number of codes per batch, at least 1
+        """
+        if not quoted_codes:
+            return 1
+        
+        # URL of an empty IN list on a far page, so paging params are counted too
+        base_length = len(self._build_wfs_url(
+            layer_type, cql_filter=f"INSEE_COM IN (){condition}", start_index=10 ** 9, count=self.page_size
+        ))
+        # Encoded length of the longest code and its separating comma
+        code_length = max(len(quote_plus(code + ',')) for code in quoted_codes)
+        
+        return max(1, (self.max_url_length - base_length) // code_length)
+    
+    def _fetch_data_by_bbox_tiles(self, layer_type: str, bbox_filter: Dict,
+                                  cql_filter: Optional[str] = None) -> Optional[Dict]:
+        """Fetch data for a bounding box split into a bbox_grid of tiles.
+        
+        BBOX filters match features intersecting the box, so a feature
+        crossing a tile edge is returned by each tile; duplicates are dropped
+        by feature id.
+        
+        Args:
+            layer_type: WFS layer name
+            bbox_filter: Bounding box filter parameters
+            cql_filter: Additional CQL condition applied to every tile
             
-            self.logger.debug(f"Fetching data for INSEE codes batch: {batch_codes}")
+        Returns:
+            Combined feature collection, or None if any tile failed
+        """
+        columns, rows = self.bbox_grid
+        tiles = self._tile_bbox(bbox_filter, columns, rows)
+        if len(tiles) == 1:
+            return self._fetch_wfs_paged(layer_type, bbox_filter=tiles[0], cql_filter=cql_filter)
+        
+        tile_results = self._fetch_queries(
+            layer_type, [{'bbox_filter': tile, 'cql_filter': cql_filter} for tile in tiles]
+        )
+        if any(tile_data is None for tile_data in tile_results):
+            self.logger.error(f"Bbox tile request failed for {layer_type}")
+            return None
+        
+        features = []
+        seen_ids = set()
+        for tile_data in tile_results:
+            for feature in tile_data['features']:
+                feature_id = feature.get('id')
+                if feature_id is not None:
+                    if feature_id in seen_ids:
+                        continue
+                    seen_ids.add(feature_id)
+                features.append(feature)
+        
+        return {'type': 'FeatureCollection', 'features': features}
+    
+    @staticmethod
+    def _tile_bbox(bbox_filter: Dict, columns: int, rows: int) -> List[Dict]:
+        """Split a bounding box into a grid of equally sized tiles.
+        
+        Args:
+            bbox_filter: Bounding box filter parameters
+            columns: Number of tiles along x
+            rows: Number of tiles along y
             
-            batch_data = self._fetch_wfs_data(layer_type, cql_filter=insee_filter)
+        Returns:
+            Tile bounding boxes, row by row from min_y, sharing their edges
+        """
+        min_x, min_y = bbox_filter['min_x'], bbox_filter['min_y']
+        step_x = (bbox_filter['max_x'] - min_x) / columns
+        step_y = (bbox_filter['max_y'] - min_y) / rows
+        
+        tiles = []
+        for row in range(rows):
+            for column in range(columns):
+                tiles.append({
+                    'min_x': min_x + column * step_x,
+                    'min_y': min_y + row * step_y,
+                    # Last tiles end exactly on the original bounds
+                    'max_x': bbox_filter['max_x'] if column == columns - 1 else min_x + (column + 1) * step_x,
+                    'max_y': bbox_filter['max_y'] if row == rows - 1 else min_y + (row + 1) * step_y,
+                    'srs': bbox_filter['srs']
+                })
+        return tiles
+    
+    def _fetch_queries(self, layer_type: str, filters_list: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """Run several paged queries concurrently.
+        
+        Queries wait on their pages, which are requested on the request pool,
+        so they run on a short-lived pool of their own.
+        
+        Args:
+            layer_type: WFS layer name
+            filters_list: Filters for each query (bbox_filter and/or cql_filter)
             
-            if batch_data and 'features' in batch_data:
-                all_features.extend(batch_data['features'])
+        Returns:
+            Result of _fetch_wfs_paged for each query, in order
+        """
+        if not filters_list:
+            return []
         
-        if all_features:
-            # Return combined feature collection
-            return {
-                'type': 'FeatureCollection',
-                'features': all_features
-            }
+        with ThreadPoolExecutor(
+            max_workers=min(len(filters_list), self.max_parallel_requests),
+            thread_name_prefix="plu-query"
+        ) as executor:
+            return list(executor.map(
+                lambda filters: self._fetch_wfs_paged(layer_type, **filters),
+                filters_list
+            ))
+    
+    def _get_request_executor(self) -> ThreadPoolExecutor:
+        """Return the pool for individual WFS requests, creating it on first use.
         
-        return None
+        Only leaf GetFeature requests run here; layers, INSEE batches and bbox
+        tiles wait on their pages from their own pools, so they never occupy a
+        request worker and every HTTP request is bounded by max_parallel_requests.
+        """
+        executor = self._request_executor
+        if executor is None:
+            with self._request_executor_lock:
+                executor = self._request_executor
+                if executor is None:
+                    executor = ThreadPoolExecutor(
+                        max_workers=self.max_parallel_requests,
+                        thread_name_prefix="plu-wfs"
+                    )
+                    self._request_executor = executor
+        return executor
     
-    def _parse_gml_response(self, gml_content: str) -> Optional[Dict]:
+    def _shutdown_request_executor(self) -> None:
+        """Shut down the WFS request pool so a later run starts a fresh one."""
+        with self._request_executor_lock:
+            executor, self._request_executor = self._request_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def _parse_gml_response(self, gml_content: Union[str, bytes]) -> Optional[Dict]:
         """Parse GML/XML response to GeoJSON-like structure.
         
+        The document is read with iterparse and each feature member is
+        cleared once converted, so the whole tree is never held in memory.
+        
         Args:
-            gml_content: GML XML content
+            gml_content: GML XML content, as bytes or text
             
         Returns:
             GeoJSON-like feature collection or None if failed
         """
+        if isinstance(gml_content, str):
+            gml_content = gml_content.encode('utf-8')
+        
+        features = []
+        collection = {'type': 'FeatureCollection', 'features': features}
         try:
-            root = ET.fromstring(gml_content)
-            
-            # This is a simplified GML parser - in production, consider using
-            # libraries like OGR/GDAL or lxml for robust GML parsing
-            features = []
-            
-            # Find feature members (this depends on the specific GML structure)
-            for member in root.findall('.//{http://www.opengis.net/gml}featureMember'):
-                # Extract properties and geometry
-                # This is a basic implementation - needs expansion for full GML support
-                feature = {
-                    'type': 'Feature',
-                    'properties': {},
-                    'geometry': None
-                }
-                features.append(feature)
+            root = None
+            for event, elem in ET.iterparse(io.BytesIO(gml_content), events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                        number_matched = elem.get('numberMatched', '')
+                        if number_matched.isdigit():
+                            collection['numberMatched'] = int(number_matched)
+                    continue
+                
+                if elem.tag in _GML_MEMBER_TAGS:
+                    for feature_elem in elem:
+                        features.append(_gml_feature(feature_elem))
+                    elem.clear()
             
-            return {
-                'type': 'FeatureCollection',
-                'features': features
-            }
+            return collection
             
         except ET.ParseError as e:
             self.logger.error(f"Failed to parse GML response: {e}")
@@ -317,34 +981,47 @@ class PLUCollector(BaseCollector):
             return None
         
         try:
-            # Convert to GeoDataFrame
-            gdf = gpd.GeoDataFrame.from_features(features_data['features'])
-            
-            if gdf.empty:
+            features = features_data['features']
+            if not features:
                 self.logger.warning(f"Empty GeoDataFrame for layer {layer_type}")
                 return None
             
-            # Set coordinate system
-            gdf.crs = self.input_srs
+            # Build attribute columns in one pass and parse all geometries in
+            # GEOS instead of calling shape() per feature
+            properties = pd.DataFrame([feature.get('properties') or {} for feature in features])
+            geometries = shapely.from_geojson(np.array(
+                [
+                    dumps_json(feature['geometry']) if feature.get('geometry') is not None else None
+                    for feature in features
+                ],
+                dtype=object
+            ))
+            gdf = gpd.GeoDataFrame(properties, geometry=geometries, crs=self.input_srs)
             
             # Convert to target coordinate system if different
-            if self.output_srs != self.input_srs:
-                gdf = gdf.to_crs(self.output_srs)
+            if self._transformer is not None:
+                gdf = self._reproject(gdf)
             
             # Validate geometries if enabled
             if self.validate_geometry:
-                invalid_geoms = ~gdf.geometry.is_valid
+                geometries = np.asarray(gdf.geometry.values)
+                # Missing geometries are not invalid, they have nothing to repair
+                invalid_geoms = ~(shapely.is_valid(geometries) | shapely.is_missing(geometries))
                 if invalid_geoms.any():
                     self.logger.warning(
                         f"Found {invalid_geoms.sum()} invalid geometries in {layer_type}, "
-                        "attempting to fix with buffer(0)"
+                        "attempting to fix with make_valid"
                     )
-                    gdf.loc[invalid_geoms, 'geometry'] = gdf.loc[invalid_geoms, 'geometry'].buffer(0)
+                    gdf.loc[invalid_geoms, gdf.geometry.name] = shapely.make_valid(geometries[invalid_geoms])
             
-            # Add metadata columns
-            gdf['collection_timestamp'] = datetime.now(timezone.utc).isoformat()
-            gdf['layer_type'] = layer_type
-            gdf['source'] = 'GPU_WFS'
+            # Add metadata columns, stored as single-category categoricals
+            # (one byte per row) since every row holds the same value
+            codes = np.zeros(len(gdf), dtype=np.int8)
+            gdf['collection_timestamp'] = pd.Categorical.from_codes(
+                codes, categories=[datetime.now(timezone.utc).isoformat()]
+            )
+            gdf['layer_type'] = pd.Categorical.from_codes(codes, categories=[layer_type])
+            gdf['source'] = pd.Categorical.from_codes(codes, categories=['GPU_WFS'])
             
             self.logger.info(f"Processed {len(gdf)} features for layer {layer_type}")
             
@@ -354,76 +1031,163 @@ class PLUCollector(BaseCollector):
             self.logger.error(f"Failed to process features for {layer_type}: {e}")
             return None
     
+    def _reproject(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Reproject geometries to output_srs with the shared transformer.
+        
+        Args:
+            gdf: GeoDataFrame in input_srs
+            
+        Returns:
+            GeoDataFrame in output_srs
+        """
+        transformer = self._transformer
+        geometries = shapely.transform(
+            np.asarray(gdf.geometry.values),
+            lambda coords: np.column_stack(transformer.transform(coords[:, 0], coords[:, 1]))
+        )
+        return gdf.set_geometry(gpd.GeoSeries(geometries, index=gdf.index, crs=self.output_srs))
+    
     def _save_layer_data(self, gdf: gpd.GeoDataFrame, layer_type: str, 
-                        output_format: str) -> bool:
+                        output_format: str, changes_only: bool = False) -> bool:
         """Save layer data in specified format.
         
         Args:
             gdf: GeoDataFrame to save
             layer_type: Layer type for filename
-            output_format: Output format ('geojson', 'geopackage', etc.)
+            output_format: Output format ('geojson', 'geojsonseq' or 'geopackage')
+            changes_only: The data holds only features updated since the last
+                run; the filename gets a '_changes' suffix
             
         Returns:
             True if file was saved successfully, False otherwise
         """
         timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+        if changes_only:
+            timestamp += '_changes'
         layer_safe = layer_type.replace('.', '_').lower()
         
         if output_format == 'geojson':
             filename = f"{layer_safe}_{timestamp}.geojson"
             return self._save_as_geojson(gdf, filename)
+        elif output_format == 'geojsonseq':
+            filename = f"{layer_safe}_{timestamp}.geojsonl"
+            return self._save_as_geojson(gdf, filename, line_delimited=True)
         elif output_format == 'geopackage':
             filename = f"{layer_safe}_{timestamp}.gpkg"
-            return self._save_as_geopackage(gdf, filename)
+            return self._save_as_geopackage(gdf, filename, layer=layer_safe)
         else:
             self.logger.error(f"Unsupported output format: {output_format}")
             return False
     
-    def _save_as_geojson(self, gdf: gpd.GeoDataFrame, filename: str) -> bool:
+    def _save_as_geojson(self, gdf: gpd.GeoDataFrame, filename: str,
+                         line_delimited: bool = False) -> bool:
         """Save GeoDataFrame as GeoJSON.
         
+        Features are encoded one at a time into memory, without the GDAL
+        GeoJSON driver, and uploaded without a local file.
+        
         Args:
             gdf: GeoDataFrame to save
             filename: Output filename
+            line_delimited: Write one Feature per line (GeoJSONSeq) instead of
+                a FeatureCollection
             
         Returns:
             True if successful, False otherwise
         """
+        label = 'GeoJSONSeq' if line_delimited else 'GeoJSON'
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.geojson', delete=False) as tmp_file:
-                gdf.to_file(tmp_file.name, driver='GeoJSON')
-                
-                # Upload to GCS
-                gcs_path = f"{self.raw_path}/{filename}"
-                success = self.upload_to_gcs(tmp_file.name, gcs_path)
-                
-                # Cleanup
-                os.unlink(tmp_file.name)
-                
-                if success:
-                    self.logger.info(f"Saved GeoJSON: {gcs_path}")
-                    return True
-                else:
-                    self.logger.error(f"Failed to upload GeoJSON: {gcs_path}")
-                    return False
+            buffer = io.BytesIO()
+            if line_delimited:
+                for feature_json in self._iter_feature_json(gdf):
+                    buffer.write(feature_json + b'\n')
+            else:
+                buffer.write(b'{"type":"FeatureCollection",')
+                crs_json = self._geojson_crs_json(gdf)
+                if crs_json:
+                    buffer.write(b'"crs":' + crs_json + b',')
+                buffer.write(b'"features":[')
+                for index, feature_json in enumerate(self._iter_feature_json(gdf)):
+                    if index:
+                        buffer.write(b',\n')
+                    buffer.write(feature_json)
+                buffer.write(b']}\n')
+            
+            # Upload to GCS
+            gcs_path = f"{self.raw_path}/{filename}"
+            success = self.upload_bytes_to_gcs(
+                buffer.getvalue(),
+                gcs_path,
+                content_type='application/x-ndjson' if line_delimited else 'application/geo+json'
+            )
+            
+            if success:
+                self.logger.info(f"Saved {label}: {gcs_path}")
+                return True
+            else:
+                self.logger.error(f"Failed to upload {label}: {gcs_path}")
+                return False
                     
         except Exception as e:
-            self.logger.error(f"Failed to save GeoJSON {filename}: {e}")
+            self.logger.error(f"Failed to save {label} {filename}: {e}")
             return False
     
-    def _save_as_geopackage(self, gdf: gpd.GeoDataFrame, filename: str) -> bool:
+    @staticmethod
+    def _iter_feature_json(gdf: gpd.GeoDataFrame) -> Iterator[bytes]:
+        """Encode each row of a GeoDataFrame as a GeoJSON Feature.
+        
+        Geometries are serialized in one vectorized shapely call.
+        
+        Args:
+            gdf: GeoDataFrame to encode
+            
+        Yields:
+            One compact JSON Feature per row
+        """
+        geometries = shapely.to_geojson(np.asarray(gdf.geometry.values))
+        properties = gdf.drop(columns=gdf.geometry.name)
+        # NaN is not valid JSON; missing values become null
+        properties = properties.astype(object).where(properties.notna(), None)
+        
+        for record, geometry in zip(properties.to_dict('records'), geometries):
+            yield (
+                b'{"type":"Feature","properties":' + dumps_json(record)
+                + b',"geometry":' + (geometry.encode('utf-8') if geometry is not None else b'null')
+                + b'}'
+            )
+    
+    @staticmethod
+    def _geojson_crs_json(gdf: gpd.GeoDataFrame) -> Optional[bytes]:
+        """Return the legacy GeoJSON crs member for non-WGS84 data, if any."""
+        if gdf.crs is None:
+            return None
+        epsg = gdf.crs.to_epsg()
+        if epsg is None or epsg == 4326:
+            return None
+        return dumps_json({'type': 'name', 'properties': {'name': f'urn:ogc:def:crs:EPSG::{epsg}'}})
+    
+    def _save_as_geopackage(self, gdf: gpd.GeoDataFrame, filename: str,
+                            layer: Optional[str] = None) -> bool:
         """Save GeoDataFrame as GeoPackage.
         
+        Writes through pyogrio's columnar GDAL path when it is installed and
+        falls back to GeoDataFrame.to_file otherwise.
+        
         Args:
             gdf: GeoDataFrame to save
             filename: Output filename
+            layer: GeoPackage layer name, defaults to the filename stem
             
         Returns:
             True if successful, False otherwise
         """
+        layer = layer or Path(filename).stem
         try:
             with tempfile.NamedTemporaryFile(suffix='.gpkg', delete=False) as tmp_file:
-                gdf.to_file(tmp_file.name, driver='GPKG')
+                if pyogrio is not None:
+                    pyogrio.write_dataframe(gdf, tmp_file.name, driver='GPKG', layer=layer)
+                else:
+                    gdf.to_file(tmp_file.name, driver='GPKG', layer=layer)
                 
                 # Upload to GCS
                 gcs_path = f"{self.raw_path}/{filename}"
@@ -14,31 +14,110 @@ Author: Claude Code Assistant
 Created: 2025-06-25
 """
 
+import io
 import json
 import logging
 import re
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
+import yaml
+from google.api_core.exceptions import GoogleAPIError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
-from collectors.base_collector import BaseCollector
+from collectors.base_collector import IDENTITY_ENCODING, UPLOAD_CHUNK_SIZE, BaseCollector
 from utils import (
     FranceDataError,
     NetworkError,
     ValidationError,
-    download_file_with_retry,
-    setup_logging,
-    upload_to_gcs,
-    file_exists_in_gcs,
-    get_file_metadata
+    setup_logging
 )
 
 
+# 有libyaml时使用C实现的安全加载器
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# 目录列表中链接的href属性
+_LINK_HREF_RE = re.compile(rb'<a\s+href="([^"]+)"', re.IGNORECASE)
+
+# SIRENE文件命名模式: YYYY-MM-01-Stock*.zip（分组: 年、月、Stock后接的类型）
+_SIRENE_FILE_RE = re.compile(r'^(\d{4})-(\d{2})-01-(Stock[^_-]*).*\.zip$')
+
+# 流式校验ZIP时保留的末尾字节数，需容纳中央目录和结束记录（含最长65535字节的注释）
+_ZIP_TAIL_SIZE = 1024 * 1024
+
+
+class _ZipValidatingStream:
+    """
+    边读边保留ZIP末尾字节的只读流，供流式上传使用
+    
+    ZIP的中央目录位于文件末尾。上传在读到最后一块数据后才提交，所以在返回最后
+    一块数据之前用保留的末尾字节解析中央目录：验证失败抛出的异常会中止上传，
+    GCS中的对象保持不变。已知大小时以读满该大小作为结束，因为上传方不会再读一次
+    去确认流末尾。
+    """
+    
+    def __init__(self, raw, name: str, size: Optional[int] = None):
+        self._raw = raw
+        self._name = name
+        self._size = size
+        self._position = 0
+        self._finished = False
+        self._tail = b''
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def read(self, size: int = -1) -> bytes:
+        at_end = False
+        if size is None or size < 0:
+            data = self._raw.read()
+            at_end = True
+        else:
+            # 读满请求的大小，短读即表示流已结束
+            chunks = []
+            remaining = size
+            while remaining > 0:
+                chunk = self._raw.read(remaining)
+                if not chunk:
+                    at_end = True
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            data = b''.join(chunks)
+        
+        if data:
+            self._position += len(data)
+            if len(data) >= _ZIP_TAIL_SIZE:
+                self._tail = data[-_ZIP_TAIL_SIZE:]
+            else:
+                self._tail = (self._tail + data)[-_ZIP_TAIL_SIZE:]
+            if self._size is not None and self._position >= self._size:
+                at_end = True
+        
+        if at_end and not self._finished:
+            self._finished = True
+            self._finish()
+        return data
+    
+    def _finish(self) -> None:
+        if self._size is not None and self._position != self._size:
+            raise ValidationError(
+                f"ZIP文件 {self._name} 不完整: 收到 {self._position} 字节，应为 {self._size} 字节"
+            )
+        try:
+            # 末尾字节包含完整的中央目录时，zipfile把前面缺失的部分当作前置数据处理
+            with zipfile.ZipFile(io.BytesIO(self._tail)) as zip_file:
+                SireneCollector._check_csv_members(zip_file, self._name)
+        except zipfile.BadZipFile as e:
+            raise ValidationError(f"无效的ZIP文件 {self._name}: {e}") from e
+
+
 class SireneCollector(BaseCollector):
     """SIRENE数据收集器，处理INSEE企业名录数据"""
     
@@ -79,6 +158,14 @@ class SireneCollector(BaseCollector):
         self.download_optional = self.sirene_config.get('download_optional', False)
         self.months_back = self.sirene_config.get('months_back', 3)  # 默认获取最近3个月
         
+        # 并发下载/上传的线程数（I/O密集型，线程池即可）
+        self.max_workers = self.sirene_config.get('max_workers', 8)
+        
+        # 超过该大小的文件按字节范围并行下载，分段上传后在GCS中合并
+        self.large_file_threshold = (
+            self.config.get('processing_config.large_file_threshold_mb', 100) * 1024 * 1024
+        )
+        
         # 获取GCS配置
         if config:
             gcs_config = config.get('gcs_config', {})
@@ -106,12 +193,17 @@ class SireneCollector(BaseCollector):
             files_to_download = self._filter_files_to_download(available_files)
             self.logger.info(f"需要下载 {len(files_to_download)} 个文件")
             
-            # 下载文件
+            # 并发下载文件；结果按文件列表顺序汇总
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                futures = [
+                    (file_info, executor.submit(self._download_file, file_info))
+                    for file_info in files_to_download
+                ]
+            
             download_results = []
-            for file_info in files_to_download:
+            for file_info, future in futures:
                 try:
-                    result = self._download_file(file_info)
-                    download_results.append(result)
+                    download_results.append(future.result())
                 except Exception as e:
                     self.logger.error(f"下载文件 {file_info['filename']} 失败: {e}")
                     download_results.append({
@@ -153,17 +245,18 @@ class SireneCollector(BaseCollector):
         try:
             self.logger.info(f"扫描SIRENE数据源: {self.base_url}")
             
-            response = requests.get(self.base_url, timeout=30)
+            response = self.http_session.get(self.base_url, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
             files = []
             
-            # 解析目录列表
-            for link in soup.find_all('a'):
-                href = link.get('href')
-                if not href or href.startswith('/') or href.startswith('?'):
+            # 直接在响应字节上匹配链接，不构建HTML文档树
+            for link in _LINK_HREF_RE.finditer(response.content):
+                # 先用前缀快速排除非日期链接（上级目录、排序参数等）
+                raw_href = link.group(1)
+                if not raw_href[:4].isdigit():
                     continue
+                href = raw_href.decode('utf-8')
                 
                 # 匹配SIRENE文件命名模式
                 if self._is_sirene_file(href):
@@ -192,9 +285,7 @@ class SireneCollector(BaseCollector):
         Returns:
             bool: 是否为SIRENE文件
         """
-        # SIRENE文件命名模式: YYYY-MM-01-Stock*.zip
-        pattern = r'^\d{4}-\d{2}-01-Stock.*\.zip$'
-        return re.match(pattern, filename) is not None
+        return _SIRENE_FILE_RE.match(filename) is not None
     
     def _parse_file_info(self, filename: str) -> Optional[Dict]:
         """
@@ -207,18 +298,16 @@ class SireneCollector(BaseCollector):
             Optional[Dict]: 文件信息字典
         """
         try:
-            # 解析日期: YYYY-MM-01-StockType_utf8.zip
-            parts = filename.split('-')
-            if len(parts) < 4:
+            # 解析日期和类型: YYYY-MM-01-StockType_utf8.zip
+            match = _SIRENE_FILE_RE.match(filename)
+            if match is None:
                 return None
             
-            year = int(parts[0])
-            month = int(parts[1])
+            year_text, month_text, file_type = match.groups()
+            year = int(year_text)
+            month = int(month_text)
             date = datetime(year, month, 1)
             
-            # 解析文件类型
-            file_type = parts[3].split('_')[0]  # Stock后面的类型
-            
             # 判断文件类别
             category = self._categorize_file(filename)
             
@@ -233,7 +322,7 @@ class SireneCollector(BaseCollector):
                 'is_required': category == 'stock'
             }
             
-        except (ValueError, IndexError) as e:
+        except ValueError as e:
             self.logger.warning(f"无法解析文件名 {filename}: {e}")
             return None
     
@@ -316,14 +405,15 @@ class SireneCollector(BaseCollector):
             # 构建GCS路径
             gcs_path = f"raw/sirene/{file_info['year']}/{filename}"
             
-            # 检查文件是否已存在且相同
-            if file_exists_in_gcs(self.gcs_client, self.bucket_name, gcs_path):
-                # 获取远程文件元数据进行比较
+            # 已上传的对象保存了源站的ETag/Last-Modified时，用条件请求判断是否更新
+            blob = self.gcs_client.get_blob(gcs_path)
+            validators = self._get_source_validators(blob)
+            
+            # 没有校验信息的旧对象：退回到比较文件大小
+            if blob is not None and not validators:
                 remote_metadata = self._get_remote_file_metadata(url)
-                local_metadata = get_file_metadata(self.gcs_client, self.bucket_name, gcs_path)
                 
-                if (local_metadata and remote_metadata and 
-                    local_metadata.get('size') == remote_metadata.get('size')):
+                if remote_metadata and blob.size == remote_metadata.get('size'):
                     self.logger.info(f"文件 {filename} 已存在且相同，跳过下载")
                     return {
                         'filename': filename,
@@ -332,39 +422,32 @@ class SireneCollector(BaseCollector):
                         'gcs_path': gcs_path
                     }
             
-            # 下载文件到临时位置
-            temp_file = Path(f"/tmp/{filename}")
-            self.logger.info(f"开始下载 {filename}...")
-            
-            download_file_with_retry(url, str(temp_file))
+            object_metadata = {
+                'source_url': url,
+                'file_type': file_info['file_type'],
+                'category': file_info['category'],
+                'collection_date': datetime.now(timezone.utc).isoformat(),
+                'source_date': file_info['date'].isoformat()
+            }
             
-            # 验证ZIP文件
-            self._validate_zip_file(temp_file)
-            
-            # 上传到GCS
-            upload_to_gcs(
-                gcs_client=self.gcs_client,
-                bucket_name=self.bucket_name,
-                source_file=str(temp_file),
-                destination_blob=gcs_path,
-                metadata={
-                    'source_url': url,
-                    'file_type': file_info['file_type'],
-                    'category': file_info['category'],
-                    'collection_date': datetime.now(timezone.utc).isoformat(),
-                    'source_date': file_info['date'].isoformat()
+            # 响应直接流式写入GCS，不经过本地磁盘
+            self.logger.info(f"开始下载 {filename}...")
+            file_size = self._stream_to_gcs(url, gcs_path, validators, object_metadata)
+            if file_size is None:
+                self.logger.info(f"文件 {filename} 未修改，跳过")
+                return {
+                    'filename': filename,
+                    'status': 'skipped',
+                    'reason': 'not_modified',
+                    'gcs_path': gcs_path
                 }
-            )
-            
-            # 清理临时文件
-            temp_file.unlink()
             
             self.logger.info(f"成功下载并上传 {filename}")
             return {
                 'filename': filename,
                 'status': 'success',
                 'gcs_path': gcs_path,
-                'file_size': temp_file.stat().st_size if temp_file.exists() else None
+                'file_size': file_size
             }
             
         except Exception as e:
@@ -375,6 +458,100 @@ class SireneCollector(BaseCollector):
                 'error': str(e)
             }
     
+    def _stream_to_gcs(self, url: str, gcs_path: str, validators: Dict[str, str],
+                       object_metadata: Dict[str, str]) -> Optional[int]:
+        """
+        条件下载文件并直接流式写入GCS，传输过程中验证ZIP结构
+        
+        Args:
+            url: 文件URL
+            gcs_path: GCS目标路径
+            validators: 条件请求头（If-None-Match/If-Modified-Since）
+            object_metadata: 保存到对象上的自定义元数据
+            
+        Returns:
+            Optional[int]: 上传的字节数；源站返回304（未修改）时为None
+            
+        Raises:
+            NetworkError: 重试后仍下载失败
+            ValidationError: ZIP文件验证失败
+        """
+        try:
+            return self._stream_to_gcs_with_retry(url, gcs_path, validators, object_metadata)
+        except requests.RequestException as e:
+            raise NetworkError(f"Failed to download {url}: {e}") from e
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((requests.RequestException, GoogleAPIError)),
+        reraise=True
+    )
+    def _stream_to_gcs_with_retry(self, url: str, gcs_path: str, validators: Dict[str, str],
+                                  object_metadata: Dict[str, str]) -> Optional[int]:
+        """执行一次流式传输，每次重试都重新开始"""
+        # 先用单字节的Range请求探测：同时完成条件检查并取得文件总大小。
+        # 探测占用的传输名额在分段下载开始前释放
+        probe_headers = {**(validators or {}), **IDENTITY_ENCODING, 'Range': 'bytes=0-0'}
+        with self._transfer_slots, \
+                self.http_session.get(url, stream=True, timeout=self.timeout,
+                                      headers=probe_headers) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            
+            if response.status_code != 206:
+                # 源站忽略了Range，响应本身就是完整文件
+                return self._upload_response(response, gcs_path, object_metadata)
+            self._check_identity_encoding(url, response)
+            
+            total = response.headers.get('Content-Range', '').rpartition('/')[2]
+            size = int(total) if total.isdigit() else None
+            metadata = {**object_metadata, **self._get_source_metadata(response)}
+        
+        if size is not None and size > self.large_file_threshold:
+            self._stream_ranges_to_gcs(url, gcs_path, size, 'application/zip', metadata)
+            return size
+        
+        with self._transfer_slots, \
+                self.http_session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            return self._upload_response(response, gcs_path, object_metadata)
+    
+    def _upload_response(self, response: requests.Response, gcs_path: str,
+                         object_metadata: Dict[str, str]) -> int:
+        """
+        把完整的响应体流式上传到GCS，传输过程中验证ZIP结构
+        
+        Args:
+            response: 以stream=True发起的完整响应
+            gcs_path: GCS目标路径
+            object_metadata: 保存到对象上的自定义元数据
+            
+        Returns:
+            int: 上传的字节数
+        """
+        # 传输压缩时Content-Length是压缩后的大小，解压后的大小未知
+        response.raw.decode_content = True
+        size = None
+        if 'content-length' in response.headers and not response.headers.get('content-encoding'):
+            size = int(response.headers['content-length'])
+        
+        stream = _ZipValidatingStream(response.raw, Path(gcs_path).name, size)
+        self.gcs_client.upload_from_stream(
+            stream,
+            gcs_path,
+            size=size,
+            content_type='application/zip',
+            metadata={**object_metadata, **self._get_source_metadata(response)},
+            chunk_size=UPLOAD_CHUNK_SIZE
+        )
+        return stream.tell()
+    
+    def _wrap_last_range_part(self, stream, gcs_path: str, part_size: int):
+        """最后一段包含ZIP的中央目录，上传时验证；验证失败时不会合并各段"""
+        return _ZipValidatingStream(stream, Path(gcs_path).name, part_size)
+    
     def _get_remote_file_metadata(self, url: str) -> Optional[Dict]:
         """
         获取远程文件元数据
@@ -386,12 +563,13 @@ class SireneCollector(BaseCollector):
             Optional[Dict]: 文件元数据
         """
         try:
-            response = requests.head(url, timeout=10)
+            response = self.http_session.head(url, timeout=10)
             response.raise_for_status()
             
             return {
                 'size': int(response.headers.get('content-length', 0)),
                 'last_modified': response.headers.get('last-modified'),
+                'etag': response.headers.get('etag'),
                 'content_type': response.headers.get('content-type')
             }
         except Exception as e:
@@ -413,11 +591,7 @@ class SireneCollector(BaseCollector):
                 # 测试ZIP文件完整性
                 zip_file.testzip()
                 
-                # 检查是否包含CSV文件
-                csv_files = [name for name in zip_file.namelist() if name.endswith('.csv')]
-                if not csv_files:
-                    raise ValidationError(f"ZIP文件 {file_path.name} 不包含CSV文件")
-                
+                csv_files = self._check_csv_members(zip_file, file_path.name)
                 self.logger.debug(f"ZIP文件验证通过: {file_path.name}, 包含 {len(csv_files)} 个CSV文件")
                 
         except zipfile.BadZipFile as e:
@@ -425,6 +599,26 @@ class SireneCollector(BaseCollector):
         except Exception as e:
             raise ValidationError(f"ZIP文件验证失败 {file_path.name}: {e}") from e
     
+    @staticmethod
+    def _check_csv_members(zip_file: zipfile.ZipFile, name: str) -> List[str]:
+        """
+        检查ZIP文件是否包含CSV文件
+        
+        Args:
+            zip_file: 已打开的ZIP文件
+            name: 用于错误信息的文件名
+            
+        Returns:
+            List[str]: ZIP中的CSV文件名
+            
+        Raises:
+            ValidationError: 如果不包含CSV文件
+        """
+        csv_files = [member for member in zip_file.namelist() if member.endswith('.csv')]
+        if not csv_files:
+            raise ValidationError(f"ZIP文件 {name} 不包含CSV文件")
+        return csv_files
+    
     def validate_data(self, file_path: str) -> bool:
         """
         验证SIRENE数据文件
@@ -474,9 +668,8 @@ def sirene_collector_main(request=None):  # pylint: disable=unused-argument
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"配置文件未找到: {config_path}")
         
-        import yaml
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=_YAML_LOADER)
         
         # 创建收集器并执行
         collector = SireneCollector(config)
@@ -496,11 +689,9 @@ def sirene_collector_main(request=None):  # pylint: disable=unused-argument
 
 if __name__ == "__main__":
     # 本地测试
-    import yaml
-    
     config_path = "../../config/config.yaml"
     with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YAML_LOADER)
     
     collector = SireneCollector(config)
     result = collector.collect()
@@ -5,12 +5,29 @@ and merge with environment variables.
 """
 
 import os
+import re
 import yaml
 from typing import Dict, Any, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
 
+# libyaml-backed safe loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# ${VAR_NAME} or ${VAR_NAME:-default} inside a configuration string
+_ENV_VAR_RE = re.compile(r'\$\{([^}:]+)(?::-([^}]*))?\}')
+
+
+def _resolve_env_var(match: 're.Match[str]') -> str:
+    """Return the value of the environment variable named by a ${...} match."""
+    name, default = match.group(1), match.group(2)
+    value = os.environ.get(name, default)
+    if value is None:
+        raise ConfigError(f"Environment variable '{name}' not found")
+    return value
+
+
 class ConfigLoader:
     """Handles loading and merging configuration from YAML and environment variables."""
     
@@ -27,6 +44,7 @@ class ConfigLoader:
             'config.yaml'
         )
         self._config: Dict[str, Any] = {}
+        self._flat: Dict[str, Any] = {}
         self._load_env_vars()
         self._load_config()
     
@@ -40,42 +58,84 @@ class ConfigLoader:
         """Load configuration from YAML file and process environment variables."""
         try:
             with open(self.config_path, 'r', encoding='utf-8') as file:
-                self._config = yaml.safe_load(file) or {}
+                self._config = yaml.load(file, Loader=_YAML_LOADER) or {}
             
             # Process environment variable substitutions
             self._substitute_env_vars(self._config)
             
+            # Index every value by its dot path so get() is a single lookup
+            self._flat = self._flatten(self._config)
+            
         except FileNotFoundError:
             raise ConfigError(f"Configuration file not found: {self.config_path}")
         except yaml.YAMLError as e:
             raise ConfigError(f"Error parsing YAML configuration: {e}")
     
     def _substitute_env_vars(self, obj: Any) -> Any:
-        """Recursively substitute environment variables in configuration.
+        """Substitute environment variables in configuration strings in place.
         
-        Environment variables are specified as ${VAR_NAME} in the YAML file.
+        Environment variables are specified as ${VAR_NAME} (or ${VAR_NAME:-default})
+        anywhere in a YAML string value; a string may reference several variables.
+        Nested containers are walked with an explicit stack rather than recursion.
         
         Args:
             obj: Configuration object to process
             
         Returns:
             Processed configuration object
+            
+        Raises:
+            ConfigError: If a referenced variable is unset and has no default
         """
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                obj[key] = self._substitute_env_vars(value)
-        elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                obj[i] = self._substitute_env_vars(item)
-        elif isinstance(obj, str) and obj.startswith('${') and obj.endswith('}'):
-            env_var = obj[2:-1]
-            value = os.environ.get(env_var)
-            if value is None:
-                raise ConfigError(f"Environment variable '{env_var}' not found")
-            return value
+        if isinstance(obj, str):
+            return _ENV_VAR_RE.sub(_resolve_env_var, obj) if '${' in obj else obj
+        
+        stack = [obj]
+        while stack:
+            container = stack.pop()
+            if isinstance(container, dict):
+                items = container.items()
+            elif isinstance(container, list):
+                items = enumerate(container)
+            else:
+                continue
+            
+            for key, value in items:
+                if isinstance(value, str):
+                    if '${' in value:
+                        container[key] = _ENV_VAR_RE.sub(_resolve_env_var, value)
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
         
         return obj
     
+    @staticmethod
+    def _flatten(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Map the dot path of every value in the configuration to the value.
+        
+        Nested sections are indexed as well as leaves, so 'gcs_config' and
+        'gcs_config.bucket_name' both resolve. Keys that are not strings or that
+        contain a dot cannot be addressed with dot notation and are skipped.
+        
+        Args:
+            config: Configuration dictionary
+            
+        Returns:
+            Dictionary from dot path to value
+        """
+        flat: Dict[str, Any] = {}
+        stack = [('', config)]
+        while stack:
+            prefix, section = stack.pop()
+            for key, value in section.items():
+                if not isinstance(key, str) or '.' in key:
+                    continue
+                path = prefix + key
+                flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((path + '.', value))
+        return flat
+    
     def get(self, key: str, default: Any = None) -> Any:
         """Get a configuration value by key.
         
@@ -88,16 +148,7 @@ class ConfigLoader:
         Returns:
             Configuration value
         """
-        keys = key.split('.')
-        value = self._config
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        
-        return value
+        return self._flat.get(key, default)
     
     def get_required(self, key: str) -> Any:
         """Get a required configuration value by key.
@@ -7,6 +7,7 @@ asynchronously with failure isolation and comprehensive status tracking.
 import json
 import logging
 import os
+import tempfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
@@ -389,26 +390,27 @@ class MasterScheduler:
             timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
             report_path = f"scheduler/reports/execution_{timestamp}.json"
             
-            # Save to temporary file
-            temp_path = f"/tmp/scheduler_report_{timestamp}.json"
-            with open(temp_path, 'w') as f:
-                json.dump(self.execution_results, f, indent=2)
+            # Save to a uniquely named temporary file
+            with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+                json.dump(self.execution_results, f, separators=(',', ':'))
+                temp_path = f.name
             
-            # Upload to GCS
-            self.gcs_client.upload_file(
-                temp_path,
-                report_path,
-                content_type='application/json'
-            )
-            
-            # Also save as latest report
-            self.gcs_client.copy_file(
-                report_path,
-                "scheduler/reports/latest_execution.json"
-            )
-            
-            # Cleanup
-            os.remove(temp_path)
+            try:
+                # Upload to GCS
+                self.gcs_client.upload_file(
+                    temp_path,
+                    report_path,
+                    content_type='application/json'
+                )
+                
+                # Also save as latest report
+                self.gcs_client.copy_file(
+                    report_path,
+                    "scheduler/reports/latest_execution.json"
+                )
+            finally:
+                # Cleanup
+                os.remove(temp_path)
             
             self.logger.info(f"Execution report saved to {report_path}")
             
@@ -422,21 +424,25 @@ class MasterScheduler:
             Dictionary with last execution results or None if not found
         """
         try:
-            temp_path = "/tmp/last_execution.json"
-            self.gcs_client.download_file(
-                "scheduler/reports/latest_execution.json",
-                temp_path
-            )
-            
-            with open(temp_path, 'r') as f:
-                last_execution = json.load(f)
+            with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+                temp_path = f.name
             
-            os.remove(temp_path)
+            try:
+                self.gcs_client.download_file(
+                    "scheduler/reports/latest_execution.json",
+                    temp_path
+                )
+                
+                with open(temp_path, 'r') as f:
+                    last_execution = json.load(f)
+            finally:
+                os.remove(temp_path)
             
             return last_execution
             
         except Exception as e:
-            self.logger.debug(f"No previous execution found: {e}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"No previous execution found: {e}")
             return None
 
 
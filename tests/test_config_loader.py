@@ -70,6 +70,73 @@ def test_env_var_substitution():
     return True
 
 
+def test_embedded_env_var_substitution():
+    """Test substitution of embedded, repeated and defaulted variables."""
+    print("\nTesting embedded environment variable substitution...")
+    
+    os.environ['TEST_CONFIG_PROJECT'] = 'proj'
+    os.environ['TEST_CONFIG_BUCKET'] = 'bucket'
+    os.environ.pop('TEST_CONFIG_MISSING', None)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / 'config.yaml'
+        config_path.write_text(
+            'gcs:\n'
+            '  uri: "gs://${TEST_CONFIG_PROJECT}/${TEST_CONFIG_BUCKET}/raw"\n'
+            '  region: "${TEST_CONFIG_MISSING:-europe-west9}"\n'
+            '  paths:\n'
+            '    - "${TEST_CONFIG_BUCKET}"\n'
+            '    - ["${TEST_CONFIG_PROJECT}-x", 3]\n',
+            encoding='utf-8'
+        )
+        config = ConfigLoader(str(config_path))
+        
+        assert config.get('gcs.uri') == 'gs://proj/bucket/raw'
+        assert config.get('gcs.region') == 'europe-west9'
+        assert config.get('gcs.paths') == ['bucket', ['proj-x', 3]]
+        print("✓ Embedded variables substituted")
+        
+        config_path.write_text('gcs:\n  bucket: "prefix-${TEST_CONFIG_MISSING}"\n', encoding='utf-8')
+        try:
+            ConfigLoader(str(config_path))
+            print("✗ Should have raised ConfigError for missing variable")
+            return False
+        except ConfigError as e:
+            assert 'TEST_CONFIG_MISSING' in str(e)
+            print("✓ ConfigError raised for missing variable")
+    
+    return True
+
+
+def test_dot_path_lookup():
+    """Test dot-path lookups of sections, leaves and missing keys."""
+    print("\nTesting dot-path lookups...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / 'config.yaml'
+        config_path.write_text(
+            'a:\n'
+            '  b:\n'
+            '    c: 1\n'
+            '    empty: null\n'
+            '  items: [1, 2]\n'
+            '  "dotted.key": 5\n',
+            encoding='utf-8'
+        )
+        config = ConfigLoader(str(config_path))
+        
+        assert config.get('a.b.c') == 1
+        assert config.get('a.b') == {'c': 1, 'empty': None}
+        assert config.get('a.items') == [1, 2]
+        assert config.get('a.b.empty', 'default') is None
+        assert config.get('a.b.missing', 'default') == 'default'
+        assert config.get('a.items.0', 'default') == 'default'
+        assert config.get('a.dotted.key', 'default') == 'default'
+        print("✓ Dot-path lookups working")
+    
+    return True
+
+
 def test_required_fields():
     """Test required field validation."""
     print("\nTesting required field validation...")
@@ -132,6 +199,8 @@ def main():
     tests = [
         test_config_loading,
         test_env_var_substitution,
+        test_embedded_env_var_substitution,
+        test_dot_path_lookup,
         test_required_fields,
         test_config_validation,
     ]
@@ -1,10 +1,14 @@
 """Unit tests for DVF collector."""
 
+import asyncio
 import unittest
 from unittest.mock import Mock, patch, mock_open, MagicMock
 import tempfile
 import os
-from datetime import datetime, timezone
+import threading
+import time
+import gzip
+from datetime import datetime, timedelta, timezone
 
 import requests
 from bs4 import BeautifulSoup
@@ -72,7 +76,7 @@ class TestDVFCollector(unittest.TestCase):
             raise ValueError(f"Required config key not found: {key}")
         return result
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_available_years_success(self, mock_get):
         """Test successful parsing of available years."""
         # Mock HTML response with year directories
@@ -101,7 +105,7 @@ class TestDVFCollector(unittest.TestCase):
             timeout=300
         )
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_available_years_network_error(self, mock_get):
         """Test network error handling in year parsing."""
         mock_get.side_effect = requests.exceptions.ConnectionError("Network error")
@@ -109,7 +113,7 @@ class TestDVFCollector(unittest.TestCase):
         with self.assertRaises(NetworkError):
             self.collector._get_available_years()
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_available_years_no_years_found(self, mock_get):
         """Test validation error when no years found."""
         html_content = '<html><body><a href="../">../</a></body></html>'
@@ -122,7 +126,7 @@ class TestDVFCollector(unittest.TestCase):
         with self.assertRaises(ValidationError):
             self.collector._get_available_years()
     
-    @patch('requests.head')
+    @patch('requests.Session.head')
     def test_get_remote_file_metadata_success(self, mock_head):
         """Test successful remote file metadata retrieval."""
         mock_response = Mock()
@@ -143,7 +147,7 @@ class TestDVFCollector(unittest.TestCase):
         }
         self.assertEqual(metadata, expected_metadata)
     
-    @patch('requests.head')
+    @patch('requests.Session.head')
     def test_get_remote_file_metadata_network_error(self, mock_head):
         """Test network error in metadata retrieval."""
         mock_head.side_effect = requests.exceptions.RequestException("Request failed")
@@ -151,10 +155,9 @@ class TestDVFCollector(unittest.TestCase):
         with self.assertRaises(NetworkError):
             self.collector._get_remote_file_metadata('http://example.com/file.csv.gz')
     
-    @patch('collectors.dvf.dvf_collector.file_exists_in_gcs')
-    def test_should_download_file_not_exists(self, mock_file_exists):
+    def test_should_download_file_not_exists(self):
         """Test download decision when file doesn't exist."""
-        mock_file_exists.return_value = False
+        self.collector.gcs_client.get_blob.return_value = None
         
         should_download, reason = self.collector._should_download_file(
             'raw/dvf/2024/full.csv.gz', 
@@ -164,12 +167,9 @@ class TestDVFCollector(unittest.TestCase):
         self.assertTrue(should_download)
         self.assertEqual(reason, "File does not exist in GCS")
     
-    @patch('collectors.dvf.dvf_collector.get_file_metadata')
-    @patch('collectors.dvf.dvf_collector.file_exists_in_gcs')
-    def test_should_download_file_size_mismatch(self, mock_file_exists, mock_get_metadata):
+    def test_should_download_file_size_mismatch(self):
         """Test download decision when file sizes don't match."""
-        mock_file_exists.return_value = True
-        mock_get_metadata.return_value = {'size': 50000000}  # Different size
+        self.collector.gcs_client.get_blob.return_value = Mock(size=50000000)  # Different size
         
         should_download, reason = self.collector._should_download_file(
             'raw/dvf/2024/full.csv.gz',
@@ -179,12 +179,9 @@ class TestDVFCollector(unittest.TestCase):
         self.assertTrue(should_download)
         self.assertIn("Size mismatch", reason)
     
-    @patch('collectors.dvf.dvf_collector.get_file_metadata')
-    @patch('collectors.dvf.dvf_collector.file_exists_in_gcs')
-    def test_should_download_file_same_size(self, mock_file_exists, mock_get_metadata):
+    def test_should_download_file_same_size(self):
         """Test download decision when file sizes match."""
-        mock_file_exists.return_value = True
-        mock_get_metadata.return_value = {'size': 91646818}
+        self.collector.gcs_client.get_blob.return_value = Mock(size=91646818)
         
         should_download, reason = self.collector._should_download_file(
             'raw/dvf/2024/full.csv.gz',
@@ -194,7 +191,23 @@ class TestDVFCollector(unittest.TestCase):
         self.assertFalse(should_download)
         self.assertEqual(reason, "File exists with matching size")
     
-    @patch('requests.get')
+    def test_should_download_file_uses_gcs_index(self):
+        """Test a GCS prefix listing is consulted instead of per-file lookups."""
+        gcs_index = {'raw/dvf/2024/communes/01.csv.gz': {'size': 1000}}
+        
+        should_download, reason = self.collector._should_download_file(
+            'raw/dvf/2024/communes/01.csv.gz', {'size': 1000}, gcs_index
+        )
+        self.assertFalse(should_download)
+        
+        should_download, reason = self.collector._should_download_file(
+            'raw/dvf/2024/communes/02.csv.gz', {'size': 1000}, gcs_index
+        )
+        self.assertTrue(should_download)
+        self.assertEqual(reason, "File does not exist in GCS")
+        self.collector.gcs_client.get_blob.assert_not_called()
+    
+    @patch('requests.Session.get')
     def test_get_files_in_directory_success(self, mock_get):
         """Test successful directory file listing."""
         html_content = '''
@@ -219,21 +232,40 @@ class TestDVFCollector(unittest.TestCase):
         }
         self.assertEqual(files, expected_files)
     
-    @patch('collectors.dvf.dvf_collector.upload_to_gcs')
-    @patch('collectors.dvf.dvf_collector.download_file_with_retry')
-    @patch('os.remove')
-    def test_process_main_file_success(self, mock_remove, mock_download, mock_upload):
-        """Test successful main file processing."""
-        # Mock successful download and upload
-        mock_download.return_value = True
-        mock_upload.return_value = True
+    @patch('requests.Session.get')
+    def test_get_files_in_directory_parses_columns(self, mock_get):
+        """Test date and size columns of an autoindex listing are extracted."""
+        html_content = '''
+        <html><body><pre>
+        <a href="../">../</a>
+        <a href="01.csv.gz">01.csv.gz</a>                                          08-Apr-2025 14:40             1234567
+        <a href="02.csv.gz">02.csv.gz</a>                                          09-Apr-2025 09:05               98765
+        </pre></body></html>
+        '''
+        
+        mock_response = Mock()
+        mock_response.content = html_content.encode()
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        files = self.collector._get_files_in_directory('http://example.com/dir/')
         
-        # Mock file metadata and download decision
-        with patch.object(self.collector, '_get_remote_file_metadata') as mock_metadata, \
-             patch.object(self.collector, '_should_download_file') as mock_should_download:
+        self.assertEqual(files, {
+            '01.csv.gz': {'name': '01.csv.gz', 'size': 1234567, 'date': '08-Apr-2025'},
+            '02.csv.gz': {'name': '02.csv.gz', 'size': 98765, 'date': '09-Apr-2025'}
+        })
+    
+    def test_process_main_file_success(self):
+        """Test successful main file processing."""
+        # Mock file metadata, download decision and streamed copy
+        with patch.object(self.collector, '_read_source_validators', return_value={}), \
+             patch.object(self.collector, '_get_remote_file_metadata') as mock_metadata, \
+             patch.object(self.collector, '_should_download_file') as mock_should_download, \
+             patch.object(self.collector, '_stream_url_to_gcs') as mock_stream:
             
             mock_metadata.return_value = {'size': 91646818}
             mock_should_download.return_value = (True, "New file")
+            mock_stream.return_value = 91646818
             
             result = self.collector._process_main_file('2024')
             
@@ -245,14 +277,16 @@ class TestDVFCollector(unittest.TestCase):
             }
             self.assertEqual(result, expected_result)
             
-            # Verify calls
-            mock_download.assert_called_once()
-            mock_upload.assert_called_once()
-            mock_remove.assert_called_once()
+            mock_stream.assert_called_once_with(
+                'https://files.data.gouv.fr/geo-dvf/latest/csv/2024/full.csv.gz',
+                'raw/dvf/2024/full.csv.gz',
+                91646818
+            )
     
+    @patch.object(DVFCollector, '_read_source_validators', return_value={})
     @patch.object(DVFCollector, '_get_remote_file_metadata')
     @patch.object(DVFCollector, '_should_download_file')
-    def test_process_main_file_skip(self, mock_should_download, mock_metadata):
+    def test_process_main_file_skip(self, mock_should_download, mock_metadata, mock_validators):
         """Test skipping main file when not needed."""
         mock_metadata.return_value = {'size': 91646818}
         mock_should_download.return_value = (False, "File exists with matching size")
@@ -267,13 +301,13 @@ class TestDVFCollector(unittest.TestCase):
         }
         self.assertEqual(result, expected_result)
     
-    @patch('collectors.dvf.dvf_collector.download_file_with_retry')
-    def test_process_main_file_download_failure(self, mock_download):
+    def test_process_main_file_download_failure(self):
         """Test main file processing with download failure."""
-        mock_download.return_value = False
-        
-        with patch.object(self.collector, '_get_remote_file_metadata') as mock_metadata, \
-             patch.object(self.collector, '_should_download_file') as mock_should_download:
+        with patch.object(self.collector, '_read_source_validators', return_value={}), \
+             patch.object(self.collector, '_get_remote_file_metadata') as mock_metadata, \
+             patch.object(self.collector, '_should_download_file') as mock_should_download, \
+             patch.object(self.collector, '_stream_url_to_gcs_with_retry',
+                          side_effect=requests.exceptions.ConnectionError("reset")):
             
             mock_metadata.return_value = {'size': 91646818}
             mock_should_download.return_value = (True, "New file")
@@ -285,6 +319,235 @@ class TestDVFCollector(unittest.TestCase):
             self.assertTrue(len(result['errors']) > 0)
             self.assertIn('NetworkError', result['errors'][0]['type'])
     
+    def test_stream_url_to_gcs(self):
+        """Test the response body is piped to GCS with its source validators."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.status_code = 200
+        mock_response.headers = {'content-length': '10', 'ETag': '"abc123"'}
+        
+        with patch.object(self.collector.http_session, 'get', return_value=mock_response) as mock_get:
+            size = self.collector._stream_url_to_gcs('http://example.com/full.csv.gz', 'raw/dvf/2024/full.csv.gz')
+        
+        # The server ignored the probe's range, so its 200 body is uploaded directly
+        self.assertEqual(size, 10)
+        mock_get.assert_called_once_with('http://example.com/full.csv.gz', stream=True, timeout=300,
+                                         headers={'Accept-Encoding': 'identity', 'Range': 'bytes=0-0'})
+        self.assertFalse(mock_response.raw.decode_content)
+        self.collector.gcs_client.upload_from_stream.assert_called_once_with(
+            mock_response.raw,
+            'raw/dvf/2024/full.csv.gz',
+            size=10,
+            content_type='application/gzip',
+            metadata={'source_etag': '"abc123"'},
+            chunk_size=8 * 1024 * 1024
+        )
+    
+    def test_stream_url_to_gcs_rejects_transport_encoding(self):
+        """Test a transport-encoded body is not uploaded."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.status_code = 200
+        mock_response.headers = {'content-length': '10', 'Content-Encoding': 'gzip'}
+        
+        with patch.object(self.collector.http_session, 'get', return_value=mock_response):
+            with self.assertRaises(NetworkError):
+                self.collector._stream_url_to_gcs('http://example.com/full.csv.gz', 'raw/dvf/2024/full.csv.gz')
+        
+        self.collector.gcs_client.upload_from_stream.assert_not_called()
+    
+    def test_stream_url_to_gcs_known_small_file_skips_probe(self):
+        """Test a file listed below the threshold is fetched with a single conditional GET."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.status_code = 200
+        mock_response.headers = {'content-length': '10'}
+        
+        with patch.object(self.collector.http_session, 'get', return_value=mock_response) as mock_get:
+            size = self.collector._stream_url_to_gcs('http://example.com/full.csv.gz', 'raw/dvf/2024/full.csv.gz',
+                                                     size=10, validators={'If-None-Match': '"abc123"'})
+        
+        self.assertEqual(size, 10)
+        mock_get.assert_called_once_with('http://example.com/full.csv.gz', stream=True, timeout=300,
+                                         headers={'Accept-Encoding': 'identity', 'If-None-Match': '"abc123"'})
+    
+    def test_stream_url_to_gcs_probed_small_file_downloads_once(self):
+        """Test a probe reporting a small total size is followed by one full GET."""
+        probe_response = MagicMock()
+        probe_response.__enter__.return_value = probe_response
+        probe_response.status_code = 206
+        probe_response.headers = {'Content-Range': 'bytes 0-0/10'}
+        full_response = MagicMock()
+        full_response.__enter__.return_value = full_response
+        full_response.status_code = 200
+        full_response.headers = {'content-length': '10', 'ETag': '"abc123"'}
+        
+        with patch.object(self.collector.http_session, 'get',
+                          side_effect=[probe_response, full_response]) as mock_get:
+            size = self.collector._stream_url_to_gcs('http://example.com/full.csv.gz', 'raw/dvf/2024/full.csv.gz')
+        
+        self.assertEqual(size, 10)
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {'Accept-Encoding': 'identity'})
+        self.collector.gcs_client.upload_from_stream.assert_called_once_with(
+            full_response.raw,
+            'raw/dvf/2024/full.csv.gz',
+            size=10,
+            content_type='application/gzip',
+            metadata={'source_etag': '"abc123"'},
+            chunk_size=8 * 1024 * 1024
+        )
+        self.collector.gcs_client.compose.assert_not_called()
+    
+    def test_stream_url_to_gcs_large_file_uses_ranges(self):
+        """Test files above the threshold are uploaded as composed byte ranges."""
+        size = 150 * 1024 * 1024
+        probe_response = MagicMock()
+        probe_response.__enter__.return_value = probe_response
+        probe_response.status_code = 206
+        probe_response.headers = {'Content-Range': f'bytes 0-0/{size}', 'ETag': '"abc123"'}
+        part_response = MagicMock()
+        part_response.__enter__.return_value = part_response
+        part_response.status_code = 206
+        part_response.headers = {}
+        
+        with patch.object(self.collector.http_session, 'get',
+                          side_effect=[probe_response, part_response, part_response, part_response]) as mock_get:
+            result = self.collector._stream_url_to_gcs('http://example.com/full.csv.gz', 'raw/dvf/2024/full.csv.gz')
+        
+        # Only the one-byte probe precedes the parts, no full-body GET
+        self.assertEqual(result, size)
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertEqual(mock_get.call_args_list[0].kwargs['headers']['Range'], 'bytes=0-0')
+        ranges = sorted(call.kwargs['headers']['Range'] for call in mock_get.call_args_list[1:])
+        self.assertEqual(ranges, [
+            'bytes=0-52428799',
+            'bytes=104857600-157286399',
+            'bytes=52428800-104857599'
+        ])
+        part_paths = [f'raw/dvf/2024/full.csv.gz.part{index:02d}' for index in range(3)]
+        self.collector.gcs_client.compose.assert_called_once_with(
+            part_paths,
+            'raw/dvf/2024/full.csv.gz',
+            content_type='application/gzip',
+            metadata={'source_etag': '"abc123"'}
+        )
+        self.collector.gcs_client.delete_files.assert_called_once_with(part_paths)
+    
+    def test_stream_url_to_gcs_shares_transfer_limit(self):
+        """Test range parts never run more transfers than the shared limit."""
+        size = 150 * 1024 * 1024
+        self.collector._transfer_slots = threading.BoundedSemaphore(1)
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def make_response(status_code, headers):
+            response = MagicMock()
+            response.status_code = status_code
+            response.headers = headers
+            
+            def enter():
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.01)
+                return response
+            
+            def exit_(*args):
+                with lock:
+                    active.pop()
+            
+            response.__enter__.side_effect = enter
+            response.__exit__.side_effect = exit_
+            return response
+        
+        responses = [make_response(206, {'Content-Range': f'bytes 0-0/{size}'})]
+        responses += [make_response(206, {}) for _ in range(3)]
+        
+        with patch.object(self.collector.http_session, 'get', side_effect=responses):
+            self.collector._stream_url_to_gcs('http://example.com/full.csv.gz', 'raw/dvf/2024/full.csv.gz')
+        
+        self.assertEqual(max(peak), 1)
+    
+    def test_process_main_file_not_modified(self):
+        """Test a 304 response to the conditional GET skips the main file."""
+        self.collector.gcs_client.get_blob.return_value = Mock(
+            metadata={'source_etag': '"abc123"', 'source_last_modified': 'Tue, 08 Apr 2025 14:40:00 GMT'}
+        )
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.status_code = 304
+        
+        with patch.object(self.collector.http_session, 'get', return_value=mock_response) as mock_get, \
+             patch.object(self.collector, '_get_remote_file_metadata') as mock_metadata:
+            result = self.collector._process_main_file('2024')
+        
+        self.assertEqual(result['files_skipped'], 1)
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {
+            'Accept-Encoding': 'identity',
+            'If-None-Match': '"abc123"',
+            'If-Modified-Since': 'Tue, 08 Apr 2025 14:40:00 GMT',
+            'Range': 'bytes=0-0'
+        })
+        mock_metadata.assert_not_called()
+        self.collector.gcs_client.upload_from_stream.assert_not_called()
+    
+    @patch('requests.Session.get')
+    def test_process_year_reuses_year_listing(self, mock_get):
+        """Test the year listing supplies the main file size and the subdirectories."""
+        html_content = '''
+        <html><body><pre>
+        <a href="../">../</a>
+        <a href="communes/">communes/</a>                                          08-Apr-2025 14:40                   -
+        <a href="full.csv.gz">full.csv.gz</a>                                      08-Apr-2025 14:40            91646818
+        </pre></body></html>
+        '''
+        mock_response = Mock()
+        mock_response.content = html_content.encode()
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        self.collector.download_subdirs = True
+        empty_result = {'files_collected': 0, 'files_skipped': 0, 'total_size_bytes': 0, 'errors': []}
+        
+        with patch.object(self.collector, '_read_source_validators', return_value={}), \
+             patch.object(self.collector, '_get_remote_file_metadata') as mock_metadata, \
+             patch.object(self.collector, '_should_download_file',
+                          return_value=(False, "File exists with matching size")) as mock_should_download, \
+             patch.object(self.collector, '_process_subdirectory', return_value=empty_result) as mock_subdir:
+            result = self.collector._process_year('2024')
+        
+        self.assertEqual(result['files_skipped'], 1)
+        mock_get.assert_called_once()
+        mock_metadata.assert_not_called()
+        self.assertEqual(mock_should_download.call_args.args[1]['size'], 91646818)
+        mock_subdir.assert_called_once_with('2024', 'communes')
+    
+    def test_aprefetch_listings(self):
+        """Test subdirectory listings are fetched for the subdirectories each year has."""
+        listings = {
+            'https://files.data.gouv.fr/geo-dvf/latest/csv/2023/': {'communes/': {'name': 'communes/'}},
+            'https://files.data.gouv.fr/geo-dvf/latest/csv/2024/': {
+                'communes/': {'name': 'communes/'},
+                'departements/': {'name': 'departements/'}
+            }
+        }
+        fetched = []
+        
+        async def fetch(session, url):
+            fetched.append(url)
+            return listings.get(url, {})
+        
+        with patch.object(self.collector, '_afetch_listing', side_effect=fetch):
+            asyncio.run(self.collector._aprefetch_listings(['2023', '2024']))
+        
+        self.assertEqual(sorted(fetched), [
+            'https://files.data.gouv.fr/geo-dvf/latest/csv/2023/',
+            'https://files.data.gouv.fr/geo-dvf/latest/csv/2023/communes/',
+            'https://files.data.gouv.fr/geo-dvf/latest/csv/2024/',
+            'https://files.data.gouv.fr/geo-dvf/latest/csv/2024/communes/',
+            'https://files.data.gouv.fr/geo-dvf/latest/csv/2024/departements/'
+        ])
+    
     @patch.object(DVFCollector, '_get_available_years')
     @patch.object(DVFCollector, '_process_year')
     def test_collect_success(self, mock_process_year, mock_get_years):
@@ -357,6 +620,190 @@ class TestDVFCollector(unittest.TestCase):
             self.assertTrue(len(result['errors']) > 0)
             self.assertEqual(result['errors'][0]['year'], '2024')
     
+    def test_download_files_concurrent(self):
+        """Test downloading several files through the shared pool."""
+        with patch.object(self.collector, '_download_with_retry') as mock_download:
+            mock_download.side_effect = lambda url, **kwargs: not url.endswith('bad.csv')
+            
+            result = self.collector.download_files({
+                'https://example.com/a.csv': '/tmp/a.csv',
+                'https://example.com/b.csv': '/tmp/b.csv',
+                'https://example.com/bad.csv': '/tmp/bad.csv'
+            })
+        
+        self.assertEqual(result, {
+            'https://example.com/a.csv': True,
+            'https://example.com/b.csv': True,
+            'https://example.com/bad.csv': False
+        })
+        self.assertEqual(mock_download.call_count, 3)
+    
+    def test_download_files_propagates_error(self):
+        """Test unexpected download errors are propagated."""
+        with patch.object(self.collector, '_download_with_retry', side_effect=RuntimeError("boom")), \
+             self.assertRaises(RuntimeError):
+            self.collector.download_files({'https://example.com/a.csv': '/tmp/a.csv'})
+    
+    def test_save_metadata_uploads_from_memory(self):
+        """Test metadata is uploaded as the run record and last_run.json."""
+        gcs_client = self.collector.gcs_client
+        
+        gcs_client.download_as_bytes.side_effect = Exception("not found")
+        
+        self.collector.save_metadata({'collector': 'dvf', 'files_collected': 2})
+        
+        self.assertEqual(gcs_client.upload_from_bytes.call_count, 3)
+        uploads = {call.args[1]: call.args[0] for call in gcs_client.upload_from_bytes.call_args_list}
+        paths = sorted(uploads)
+        self.assertEqual(paths[0], 'metadata/dvf/last_run.json')
+        self.assertEqual(paths[1], 'metadata/dvf/last_run.sig')
+        self.assertTrue(paths[2].startswith('metadata/dvf/run_'))
+        self.assertEqual(
+            gzip.decompress(uploads['metadata/dvf/last_run.json']),
+            b'{"collector":"dvf","files_collected":2}'
+        )
+        last_run_call = next(
+            call for call in gcs_client.upload_from_bytes.call_args_list
+            if call.args[1] == 'metadata/dvf/last_run.json'
+        )
+        self.assertEqual(last_run_call.kwargs['content_encoding'], 'gzip')
+        gcs_client.copy_file.assert_not_called()
+    
+    def test_save_metadata_skips_unchanged_content(self):
+        """Test metadata equal to the previous run apart from timestamps only touches a marker."""
+        gcs_client = self.collector.gcs_client
+        gcs_client.download_as_bytes.side_effect = Exception("not found")
+        
+        self.collector.save_metadata({'collector': 'dvf', 'end_time': '2024-03-01T00:00:00'})
+        gcs_client.upload_from_bytes.reset_mock()
+        
+        run_time = datetime(2024, 3, 2, tzinfo=timezone.utc)
+        self.collector.save_metadata({'collector': 'dvf', 'end_time': '2024-03-02T00:00:00'}, run_time)
+        
+        gcs_client.upload_from_bytes.assert_called_once_with(
+            b'2024-03-02T00:00:00+00:00',
+            'metadata/dvf/last_run_touch.txt',
+            content_type='text/plain'
+        )
+    
+    def test_metadata_signature_ignores_nested_run_fields(self):
+        """Test per-layer timings and result timestamps do not change the signature."""
+        first = {
+            'timestamp': '2024-03-01T00:00:00',
+            'layers_summary': {'zone_urba': {'features_count': 3, 'processing_time_seconds': 1.5,
+                                             'watermark': '2024-03-01T00:00:00Z'}}
+        }
+        second = {
+            'timestamp': '2024-03-02T00:00:00',
+            'layers_summary': {'zone_urba': {'features_count': 3, 'processing_time_seconds': 2.5,
+                                             'watermark': '2024-03-02T00:00:00Z'}}
+        }
+        changed = {
+            'timestamp': '2024-03-02T00:00:00',
+            'layers_summary': {'zone_urba': {'features_count': 4, 'processing_time_seconds': 2.5}}
+        }
+        
+        self.assertEqual(DVFCollector._metadata_signature(first), DVFCollector._metadata_signature(second))
+        self.assertNotEqual(DVFCollector._metadata_signature(first), DVFCollector._metadata_signature(changed))
+    
+    def test_upload_many(self):
+        """Test batch upload results are mapped per GCS path."""
+        gcs_client = self.collector.gcs_client
+        gcs_client.upload_many.return_value = [None, Exception("upload failed")]
+        
+        result = self.collector.upload_many([
+            ('/tmp/a.csv', 'raw/dvf/a.csv'),
+            ('/tmp/b.csv', 'raw/dvf/b.csv')
+        ])
+        
+        self.assertEqual(result, {'raw/dvf/a.csv': True, 'raw/dvf/b.csv': False})
+        gcs_client.upload_many.assert_called_once()
+    
+    def test_save_metadata_uses_run_time(self):
+        """Test the run record is named after the given run time."""
+        run_time = datetime(2024, 3, 1, 12, 30, 45, tzinfo=timezone.utc)
+        
+        self.collector.save_metadata({'collector': 'dvf'}, run_time)
+        
+        paths = [call.args[1] for call in self.collector.gcs_client.upload_from_bytes.call_args_list]
+        self.assertIn('metadata/dvf/run_20240301_123045.json', paths)
+    
+    def test_run_merges_reported_progress(self):
+        """Test counters reported during collect() end up in the run result."""
+        def collect():
+            self.collector.report_progress('raw/dvf/2024/full.csv.gz')
+            self.collector.report_progress('raw/dvf/2023/full.csv.gz')
+            self.collector.report_error('Failed to download 2022', year='2022')
+            return {'years_processed': ['2024', '2023']}
+        
+        with patch.object(self.collector, 'should_collect', return_value=True), \
+             patch.object(self.collector, 'collect', side_effect=collect):
+            result = self.collector.run()
+        
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(result['files_collected'], 2)
+        self.assertEqual(result['errors'], [{'error': 'Failed to download 2022', 'year': '2022'}])
+        self.assertEqual(result['years_processed'], ['2024', '2023'])
+    
+    def test_should_collect_uses_blob_update_time(self):
+        """Test recent last_run.json metadata skips collection without download."""
+        gcs_client = self.collector.gcs_client
+        gcs_client.get_blob.return_value = Mock(updated=datetime.now(timezone.utc))
+        
+        self.assertFalse(self.collector.should_collect())
+        gcs_client.download_file.assert_not_called()
+        
+        # Second call is served from the in-process cache
+        self.assertFalse(self.collector.should_collect())
+        self.assertEqual(
+            [call.args[0] for call in gcs_client.get_blob.call_args_list],
+            ['metadata/dvf/last_run.json', 'metadata/dvf/last_run_touch.txt']
+        )
+    
+    def test_should_collect_uses_touch_time(self):
+        """Test a recent last_run_touch.txt skips collection after an unchanged run."""
+        gcs_client = self.collector.gcs_client
+        blobs = {
+            'metadata/dvf/last_run.json': Mock(updated=datetime(2000, 1, 1, tzinfo=timezone.utc)),
+            'metadata/dvf/last_run_touch.txt': Mock(updated=datetime.now(timezone.utc))
+        }
+        gcs_client.get_blob.side_effect = blobs.get
+        
+        self.assertFalse(self.collector.should_collect())
+    
+    def test_should_collect_reads_end_time_in_memory(self):
+        """Test end_time is read from the downloaded content when needed."""
+        gcs_client = self.collector.gcs_client
+        gcs_client.get_blob.return_value = Mock(updated=None)
+        gcs_client.download_as_bytes.return_value = b'{"status":"completed","end_time":"2000-01-01T00:00:00+00:00"}'
+        
+        self.assertTrue(self.collector.should_collect())
+        gcs_client.download_as_bytes.assert_called_once_with('metadata/dvf/last_run.json')
+        gcs_client.download_file.assert_not_called()
+    
+    def test_should_collect_schedule_elapsed(self):
+        """Test collection proceeds once the daily schedule has elapsed."""
+        self.collector.gcs_client.get_blob.return_value = Mock(
+            updated=datetime(2000, 1, 1, tzinfo=timezone.utc)
+        )
+        
+        self.assertEqual(self.collector.schedule_interval, timedelta(days=1))
+        self.assertTrue(self.collector.should_collect())
+    
+    def test_should_collect_near_schedule_boundary(self):
+        """Test a run just under a day ago still blocks a daily collection."""
+        self.collector.gcs_client.get_blob.return_value = Mock(
+            updated=datetime.now(timezone.utc) - timedelta(hours=23, minutes=59)
+        )
+        
+        self.assertFalse(self.collector.should_collect())
+    
+    def test_should_collect_no_previous_run(self):
+        """Test collection proceeds when no last run is recorded."""
+        self.collector.gcs_client.get_blob.return_value = None
+        
+        self.assertTrue(self.collector.should_collect())
+    
     def test_validate_data_valid(self):
         """Test data validation with valid data."""
         valid_data = {
@@ -7,6 +7,8 @@ Author: Claude Code Assistant
 Created: 2025-06-25
 """
 
+import asyncio
+import io
 import json
 import os
 import tempfile
@@ -16,7 +18,9 @@ from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import pytest
 import requests
+import yaml
 
+from collectors.insee_contours import insee_contours_collector
 from collectors.insee_contours.insee_contours_collector import INSEEContoursCollector, insee_contours_collector_main
 from utils import FranceDataError, NetworkError, ValidationError
 
@@ -57,6 +61,7 @@ class TestINSEEContoursCollector:
              patch('utils.gcs_client.get_gcs_client', return_value=mock_gcs_client):
             collector = INSEEContoursCollector(sample_config)
             collector.gcs_client = mock_gcs_client
+            insee_contours_collector._RESPONSE_CACHE.clear()
             return collector
     
     @pytest.fixture
@@ -158,22 +163,206 @@ class TestINSEEContoursCollector:
     
     def test_collect_ign_data(self, insee_collector):
         """测试IGN数据收集"""
-        with patch.object(insee_collector, '_download_geographic_file') as mock_download:
+        with patch.object(insee_collector, '_get_remote_file_metadata', return_value={'size': 1000}), \
+             patch.object(insee_collector, '_download_geographic_file') as mock_download:
             mock_download.return_value = {
                 'status': 'success',
                 'filename': 'contours_iris_lambert93_2024.zip',
                 'source': 'ign'
             }
             
-            results = insee_collector._collect_ign_data()
+            results = asyncio.run(insee_collector._collect_ign_data())
             
             # 验证调用了下载方法
             assert mock_download.call_count >= 1
             assert all(r['source'] == 'ign' for r in results if 'source' in r)
     
+    def test_collect_ign_data_uses_fallback_year(self, insee_collector):
+        """测试目标年份尚未发布时改用第一个可访问的备选年份"""
+        insee_collector.formats = ['shapefile']
+        insee_collector.target_year = 2025
+        insee_collector.fallback_years = [2024, 2023]
+        
+        def head(url):
+            return {'size': 1000} if '2024-01-01' in url else None
+        
+        with patch.object(insee_collector, '_get_remote_file_metadata', side_effect=head) as mock_head, \
+             patch.object(insee_collector, '_download_geographic_file',
+                          return_value={'status': 'success', 'source': 'ign'}) as mock_download:
+            asyncio.run(insee_collector._collect_ign_data())
+        
+        assert mock_head.call_count == 2
+        download_info = mock_download.call_args.args[0]
+        assert download_info['url'].endswith('SHP_LAMB93_FXX_2024-01-01/')
+        assert download_info['filename'] == 'contours_iris_lambert93_2024.zip'
+        assert download_info['year'] == 2024
+    
+    def test_collect_ign_data_no_available_year(self, insee_collector):
+        """测试所有年份都不可访问时不尝试下载"""
+        insee_collector.formats = ['shapefile']
+        with patch.object(insee_collector, '_get_remote_file_metadata', return_value=None), \
+             patch.object(insee_collector, '_download_geographic_file') as mock_download:
+            results = asyncio.run(insee_collector._collect_ign_data())
+        
+        assert results[0]['status'] == 'failed'
+        assert results[0]['dataset_id'] == 'iris_lambert93_shp'
+        mock_download.assert_not_called()
+    
+    def test_collect_sources_runs_concurrently(self, insee_collector):
+        """测试三个数据源并发收集且结果保持数据源顺序"""
+        started = []
+        
+        def collect_source(source):
+            async def collect(semaphore):
+                started.append(source)
+                # 每个数据源都要等到三个数据源都已开始后才返回
+                while len(started) < 3:
+                    await asyncio.sleep(0)
+                return [{'status': 'success', 'source': source}]
+            return collect
+        
+        with patch.object(insee_collector, '_collect_ign_data', side_effect=collect_source('ign')), \
+             patch.object(insee_collector, '_collect_datagouv_data', side_effect=collect_source('datagouv')), \
+             patch.object(insee_collector, '_collect_geozones_data', side_effect=collect_source('geozones')):
+            results = asyncio.run(asyncio.wait_for(insee_collector._collect_sources(), timeout=5))
+        
+        assert [r['source'] for r in results] == ['ign', 'datagouv', 'geozones']
+    
+    def test_collect_datagouv_data_downloads_resources(self, insee_collector, sample_datagouv_response):
+        """测试data.gouv.fr资源在工作线程中下载"""
+        with patch.object(insee_collector, '_get_dataset_resources',
+                          return_value=sample_datagouv_response['resources']), \
+             patch.object(insee_collector, '_download_geographic_file',
+                          return_value={'status': 'success', 'source': 'datagouv'}) as mock_download:
+            results = asyncio.run(insee_collector._collect_datagouv_data())
+        
+        assert len(results) == mock_download.call_count
+        assert all(r['source'] == 'datagouv' for r in results)
+    
+    def test_collect_datagouv_data_detects_format_once(self, insee_collector, sample_datagouv_response):
+        """测试每个资源的格式只检测一次，并沿用到过滤和文件名生成"""
+        resources = sample_datagouv_response['resources']
+        with patch.object(insee_collector, '_get_dataset_resources', return_value=resources), \
+             patch.object(insee_collector, '_detect_format', wraps=insee_collector._detect_format) as mock_detect, \
+             patch.object(insee_collector, '_download_geographic_file',
+                          return_value={'status': 'success', 'source': 'datagouv'}):
+            asyncio.run(insee_collector._collect_datagouv_data())
+        
+        # 两个数据集返回相同的资源列表
+        assert mock_detect.call_count == 2 * len(resources)
+    
+    def test_collect_datagouv_data_skips_unwanted_datasets(self, insee_collector):
+        """测试不需要的数据类型在请求资源列表之前就被过滤"""
+        insee_collector.data_types = ['regions']
+        with patch.object(insee_collector, '_get_dataset_resources', return_value=[]) as mock_resources:
+            asyncio.run(insee_collector._collect_datagouv_data())
+        
+        # 只剩下覆盖所有数据类型的GeoZones数据集
+        mock_resources.assert_called_once_with('https://www.data.gouv.fr/api/1/datasets/zones-geo/')
+    
+    def test_download_bounded_deduplicates_requests(self, insee_collector):
+        """测试同一URL和GCS路径的重复下载只执行一次"""
+        download_info = {
+            'filename': 'iris_2024.geojson',
+            'url': 'https://example.com/iris.geojson',
+            'data_type': 'iris',
+            'format': 'geojson',
+            'year': 2024
+        }
+        
+        async def download_twice():
+            semaphore = asyncio.Semaphore(2)
+            return await asyncio.gather(
+                insee_collector._download_bounded(semaphore, download_info, 'datagouv'),
+                insee_collector._download_bounded(semaphore, dict(download_info), 'datagouv'),
+                insee_collector._download_bounded(semaphore, download_info, 'geozones')
+            )
+        
+        with patch.object(insee_collector, '_download_geographic_file',
+                          side_effect=lambda info, source: {'status': 'success', 'source': source}) as mock_download:
+            results = asyncio.run(download_twice())
+        
+        assert [r['source'] for r in results] == ['datagouv', 'datagouv', 'geozones']
+        assert [r['status'] for r in results] == ['success', 'skipped', 'success']
+        assert results[1]['reason'] == 'duplicate_url'
+        assert results[1]['duplicate_of'] == {'url': 'https://example.com/iris.geojson', 'status': 'success'}
+        assert mock_download.call_count == 2
+        
+        # 复用的结果不计入成功下载数和数据源统计
+        async def collect_ign(semaphore):
+            return []
+        
+        async def collect_datagouv(semaphore):
+            return list(await asyncio.gather(
+                insee_collector._download_bounded(semaphore, download_info, 'datagouv'),
+                insee_collector._download_bounded(semaphore, dict(download_info), 'datagouv')
+            ))
+        
+        async def collect_geozones(semaphore):
+            return [await insee_collector._download_bounded(semaphore, download_info, 'geozones')]
+        
+        insee_collector.download_ign_data = insee_collector.download_datagouv = insee_collector.download_geozones = True
+        with patch.object(insee_collector, '_collect_ign_data', side_effect=collect_ign), \
+             patch.object(insee_collector, '_collect_datagouv_data', side_effect=collect_datagouv), \
+             patch.object(insee_collector, '_collect_geozones_data', side_effect=collect_geozones), \
+             patch.object(insee_collector, '_download_geographic_file',
+                          side_effect=lambda info, source: {'status': 'success', 'source': source}):
+            result = insee_collector.collect()
+        
+        assert result['files_processed'] == 3
+        assert result['successful_downloads'] == 2
+        assert result['skipped_downloads'] == 1
+        assert result['data_sources'] == {'ign_official': 0, 'datagouv': 1, 'geozones': 1}
+    
+    def test_download_bounded_serializes_urls_sharing_gcs_path(self, insee_collector):
+        """测试不同URL生成相同GCS路径时只下载一次，后一个URL单独记为跳过"""
+        first = {
+            'filename': 'iris_2024_shapefile.zip',
+            'url': 'https://example.com/iris-a.zip',
+            'data_type': 'iris',
+            'format': 'shapefile',
+            'year': 2024
+        }
+        second = dict(first, url='https://example.com/iris-b.zip')
+        
+        async def download_both():
+            semaphore = asyncio.Semaphore(2)
+            return await asyncio.gather(
+                insee_collector._download_bounded(semaphore, first, 'datagouv'),
+                insee_collector._download_bounded(semaphore, second, 'datagouv')
+            )
+        
+        with patch.object(insee_collector, '_download_geographic_file',
+                          side_effect=lambda info, source: {'status': 'success', 'url': info['url']}) as mock_download:
+            results = asyncio.run(download_both())
+        
+        assert mock_download.call_count == 1
+        assert results[0] == {'status': 'success', 'url': 'https://example.com/iris-a.zip'}
+        assert results[1]['status'] == 'skipped'
+        assert results[1]['reason'] == 'duplicate_gcs_path'
+        assert results[1]['url'] == 'https://example.com/iris-b.zip'
+    
+    def test_transfer_via_temp_file_uses_unique_paths(self, insee_collector):
+        """测试同名文件的临时路径互不相同，并在结束后删除"""
+        download_info = {'filename': 'iris_2024_shapefile.zip', 'format': 'shapefile'}
+        temp_files = []
+        
+        def fetch(url, local_path, validators):
+            temp_files.append(local_path)
+            return None
+        
+        with patch.object(insee_collector, '_fetch_to_file', side_effect=fetch):
+            for _ in range(2):
+                insee_collector._transfer_via_temp_file(
+                    'https://example.com/iris.zip', 'raw/x.zip', download_info, None, {}, {}
+                )
+        
+        assert temp_files[0] != temp_files[1]
+        assert all(path.suffix == '.zip' and not path.exists() for path in temp_files)
+    
     def test_get_dataset_resources_success(self, insee_collector, sample_datagouv_response):
         """测试成功获取数据集资源"""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = Mock()
             mock_response.json.return_value = sample_datagouv_response
             mock_response.raise_for_status.return_value = None
@@ -186,9 +375,29 @@ class TestINSEEContoursCollector:
             assert resources[0]['title'] == 'IRIS_shapefile.zip'
             assert resources[1]['format'] == 'GeoJSON'
     
+    def test_get_dataset_resources_cached(self, insee_collector, sample_datagouv_response):
+        """测试数据集资源在缓存有效期内复用"""
+        with patch('requests.Session.get') as mock_get:
+            mock_response = Mock()
+            mock_response.json.return_value = sample_datagouv_response
+            mock_response.raise_for_status.return_value = None
+            mock_get.return_value = mock_response
+            
+            api_url = 'https://www.data.gouv.fr/api/1/datasets/test-id/'
+            first = insee_collector._get_dataset_resources(api_url)
+            second = insee_collector._get_dataset_resources(api_url)
+            
+            assert first == second
+            mock_get.assert_called_once()
+            
+            # 过期后重新请求
+            insee_collector.api_cache_ttl = 0
+            insee_collector._get_dataset_resources(api_url)
+            assert mock_get.call_count == 2
+    
     def test_get_dataset_resources_network_error(self, insee_collector):
         """测试网络错误时获取数据集资源"""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_get.side_effect = requests.RequestException("Connection error")
             
             with pytest.raises(NetworkError):
@@ -221,7 +430,10 @@ class TestINSEEContoursCollector:
             ({'url': 'https://example.com/data.zip', 'format': 'SHP'}, 'shapefile'),
             ({'url': 'https://example.com/data.geojson', 'format': 'GeoJSON'}, 'geojson'),
             ({'url': 'https://example.com/data.gpkg', 'format': 'GPKG'}, 'geopackage'),
-            ({'url': 'https://example.com/data.txt', 'format': 'TXT'}, 'unknown')
+            ({'url': 'https://example.com/data.txt', 'format': 'TXT'}, 'unknown'),
+            ({'url': 'https://example.com/data.json?version=2', 'format': ''}, 'geojson'),
+            ({'url': 'https://example.com/contours_shp.zip', 'format': ''}, 'shapefile'),
+            ({'url': 'https://example.com/data.zip', 'format': '', 'mime': 'application/zip'}, 'shapefile')
         ]
         
         for resource, expected_format in test_cases:
@@ -248,8 +460,9 @@ class TestINSEEContoursCollector:
             'year': 2024
         }
         
-        with patch('collectors.insee_contours.insee_contours_collector.file_exists_in_gcs') as mock_exists, \
-             patch('collectors.insee_contours.insee_contours_collector.download_file_with_retry') as mock_download, \
+        insee_collector.gcs_client.get_blob.return_value = None
+        
+        with patch.object(insee_collector, '_fetch_to_file', return_value={'source_etag': '"v1"'}) as mock_download, \
              patch('collectors.insee_contours.insee_contours_collector.upload_to_gcs') as mock_upload, \
              patch.object(insee_collector, '_validate_geographic_file') as mock_validate, \
              patch.object(insee_collector, '_get_remote_file_metadata') as mock_metadata, \
@@ -257,7 +470,6 @@ class TestINSEEContoursCollector:
              patch('pathlib.Path.exists') as mock_exists_path, \
              patch('pathlib.Path.stat') as mock_stat:
             
-            mock_exists.return_value = False
             mock_exists_path.return_value = True
             mock_stat.return_value = Mock(st_size=1000)
             
@@ -266,9 +478,14 @@ class TestINSEEContoursCollector:
             assert result['status'] == 'success'
             assert result['filename'] == 'test_iris.zip'
             assert result['source'] == 'test'
-            mock_download.assert_called_once()
+            assert result['file_size'] == 1000
+            url, temp_file, validators = mock_download.call_args.args
+            assert (url, validators) == ('https://example.com/test.zip', {})
+            assert temp_file.name.startswith('test_iris_') and temp_file.suffix == '.zip'
             mock_upload.assert_called_once()
+            assert mock_upload.call_args.kwargs['metadata']['source_etag'] == '"v1"'
             mock_validate.assert_called_once()
+            mock_metadata.assert_not_called()
     
     def test_download_geographic_file_skip_existing(self, insee_collector):
         """测试跳过已存在的地理文件"""
@@ -278,13 +495,9 @@ class TestINSEEContoursCollector:
             'data_type': 'iris',
             'year': 2024
         }
+        insee_collector.gcs_client.get_blob.return_value = Mock(size=1000, metadata=None)
         
-        with patch('collectors.insee_contours.insee_contours_collector.file_exists_in_gcs') as mock_exists, \
-             patch('collectors.insee_contours.insee_contours_collector.get_file_metadata') as mock_local_meta, \
-             patch.object(insee_collector, '_get_remote_file_metadata') as mock_remote_meta:
-            
-            mock_exists.return_value = True
-            mock_local_meta.return_value = {'size': 1000}
+        with patch.object(insee_collector, '_get_remote_file_metadata') as mock_remote_meta:
             mock_remote_meta.return_value = {'size': 1000}
             
             result = insee_collector._download_geographic_file(download_info, source='test')
@@ -292,6 +505,62 @@ class TestINSEEContoursCollector:
             assert result['status'] == 'skipped'
             assert result['reason'] == 'file_exists_same_size'
     
+    def test_download_geographic_file_not_modified(self, insee_collector):
+        """测试源站返回304时跳过下载"""
+        download_info = {
+            'filename': 'test_iris.zip',
+            'url': 'https://example.com/test.zip',
+            'data_type': 'iris',
+            'year': 2024
+        }
+        insee_collector.gcs_client.get_blob.return_value = Mock(
+            size=1000,
+            metadata={'source_etag': '"v1"', 'source_last_modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+        )
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.status_code = 304
+        
+        with patch.object(insee_collector.http_session, 'get', return_value=mock_response) as mock_get, \
+             patch.object(insee_collector, '_get_remote_file_metadata') as mock_remote_meta, \
+             patch('collectors.insee_contours.insee_contours_collector.upload_to_gcs') as mock_upload:
+            result = insee_collector._download_geographic_file(download_info, source='test')
+        
+        assert result['status'] == 'skipped'
+        assert result['reason'] == 'not_modified'
+        assert mock_get.call_args.kwargs['headers'] == {
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'
+        }
+        mock_remote_meta.assert_not_called()
+        mock_upload.assert_not_called()
+    
+    def test_download_geographic_file_same_content(self, insee_collector):
+        """测试源站校验信息变化但内容相同时不重新上传"""
+        download_info = {
+            'filename': 'test_iris.zip',
+            'url': 'https://example.com/test.zip',
+            'data_type': 'iris',
+            'format': 'shapefile',
+            'year': 2024
+        }
+        existing_blob = Mock(size=1000, crc32c='AAAAAA==', metadata={'source_etag': '"v1"'})
+        insee_collector.gcs_client.get_blob.return_value = existing_blob
+        
+        with patch.object(insee_collector, '_fetch_to_file', return_value={'source_etag': '"v2"'}), \
+             patch.object(insee_collector, '_validate_geographic_file'), \
+             patch('collectors.insee_contours.insee_contours_collector.compute_crc32c', return_value='AAAAAA=='), \
+             patch('collectors.insee_contours.insee_contours_collector.upload_to_gcs') as mock_upload, \
+             patch('pathlib.Path.unlink'), \
+             patch('pathlib.Path.stat', return_value=Mock(st_size=1000)):
+            result = insee_collector._download_geographic_file(download_info, source='test')
+        
+        assert result['status'] == 'skipped'
+        assert result['reason'] == 'not_modified'
+        mock_upload.assert_not_called()
+        assert existing_blob.metadata == {'source_etag': '"v2"'}
+        existing_blob.patch.assert_called_once()
+    
     def test_download_geographic_file_failure(self, insee_collector):
         """测试地理文件下载失败"""
         download_info = {
@@ -300,11 +569,10 @@ class TestINSEEContoursCollector:
             'data_type': 'iris',
             'year': 2024
         }
+        download_info['format'] = 'shapefile'
+        insee_collector.gcs_client.get_blob.return_value = None
         
-        with patch('collectors.insee_contours.insee_contours_collector.file_exists_in_gcs') as mock_exists, \
-             patch('collectors.insee_contours.insee_contours_collector.download_file_with_retry') as mock_download:
-            
-            mock_exists.return_value = False
+        with patch.object(insee_collector, '_fetch_to_file') as mock_download:
             mock_download.side_effect = Exception("Download failed")
             
             result = insee_collector._download_geographic_file(download_info, source='test')
@@ -312,9 +580,179 @@ class TestINSEEContoursCollector:
             assert result['status'] == 'failed'
             assert 'Download failed' in result['error']
     
+    def test_download_geopackage_rejects_bad_header(self, insee_collector):
+        """测试GeoPackage文件头不对时不下载整个文件"""
+        download_info = {
+            'filename': 'test_iris.gpkg',
+            'url': 'https://example.com/test.gpkg',
+            'data_type': 'iris',
+            'format': 'geopackage',
+            'year': 2024
+        }
+        insee_collector.gcs_client.get_blob.return_value = None
+        mock_response = self._mock_stream_response(b'<!DOCTYPE html>\n<html>')
+        mock_response.status_code = 206
+        
+        with patch.object(insee_collector.http_session, 'get', return_value=mock_response) as mock_get, \
+             patch.object(insee_collector, '_transfer_via_temp_file') as mock_transfer:
+            result = insee_collector._download_geographic_file(download_info, source='test')
+        
+        assert result['status'] == 'failed'
+        assert mock_get.call_args.kwargs['headers'] == {'Range': 'bytes=0-15'}
+        mock_transfer.assert_not_called()
+    
+    def test_download_geopackage_header_not_modified(self, insee_collector):
+        """测试GeoPackage文件头请求兼作条件请求"""
+        download_info = {
+            'filename': 'test_iris.gpkg',
+            'url': 'https://example.com/test.gpkg',
+            'data_type': 'iris',
+            'format': 'geopackage',
+            'year': 2024
+        }
+        insee_collector.gcs_client.get_blob.return_value = Mock(metadata={'source_etag': '"v1"'})
+        mock_response = self._mock_stream_response(b'')
+        mock_response.status_code = 304
+        
+        with patch.object(insee_collector.http_session, 'get', return_value=mock_response) as mock_get, \
+             patch.object(insee_collector, '_transfer_via_temp_file') as mock_transfer:
+            result = insee_collector._download_geographic_file(download_info, source='test')
+        
+        assert result['status'] == 'skipped'
+        assert result['reason'] == 'not_modified'
+        assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"', 'Range': 'bytes=0-15'}
+        mock_transfer.assert_not_called()
+    
+    def _mock_stream_response(self, body, headers=None):
+        """构造流式响应，并让模拟的上传按16字节分块读取"""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.status_code = 200
+        mock_response.headers = headers or {}
+        mock_response.raw = io.BytesIO(body)
+        return mock_response
+    
+    def _consume_upload(self, insee_collector):
+        uploaded = []
+        
+        def upload(stream, gcs_path, **kwargs):
+            while True:
+                chunk = stream.read(16)
+                if not chunk:
+                    break
+                uploaded.append(chunk)
+        
+        insee_collector.gcs_client.upload_from_stream.side_effect = upload
+        return uploaded
+    
+    def test_stream_to_gcs_geojson(self, insee_collector, sample_geojson_data):
+        """测试GeoJSON边下载边验证并直接写入GCS"""
+        body = json.dumps(sample_geojson_data).encode()
+        mock_response = self._mock_stream_response(body, {
+            'content-length': str(len(body)),
+            'content-type': 'application/geo+json',
+            'ETag': '"v2"'
+        })
+        uploaded = self._consume_upload(insee_collector)
+        
+        with patch.object(insee_collector.http_session, 'get', return_value=mock_response):
+            size = insee_collector._stream_to_gcs(
+                'https://example.com/iris.geojson', 'raw/insee-contours/2024/test/iris.geojson',
+                'geojson', {}, {'source': 'test'}
+            )
+        
+        assert size == len(body)
+        assert b''.join(uploaded) == body
+        kwargs = insee_collector.gcs_client.upload_from_stream.call_args.kwargs
+        assert kwargs['size'] == len(body)
+        assert kwargs['content_type'] == 'application/geo+json'
+        assert kwargs['metadata'] == {'source': 'test', 'source_etag': '"v2"'}
+    
+    def test_stream_to_gcs_invalid_geojson_aborts_upload(self, insee_collector):
+        """测试GeoJSON验证失败时在最后一块数据交给上传之前中止"""
+        body = json.dumps({"type": "FeatureCollection", "features": []}).encode()
+        mock_response = self._mock_stream_response(body, {'content-length': str(len(body))})
+        uploaded = self._consume_upload(insee_collector)
+        
+        with patch.object(insee_collector.http_session, 'get', return_value=mock_response):
+            with pytest.raises(ValidationError, match="不包含任何要素"):
+                insee_collector._stream_to_gcs(
+                    'https://example.com/iris.geojson', 'raw/insee-contours/2024/test/iris.geojson',
+                    'geojson', {}, {}
+                )
+        
+        assert len(b''.join(uploaded)) < len(body)
+    
+    def _consume_uploads_by_path(self, insee_collector):
+        uploaded = {}
+        
+        def upload(stream, gcs_path, **kwargs):
+            chunks = []
+            while True:
+                chunk = stream.read(16)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            uploaded[gcs_path] = b''.join(chunks)
+        
+        insee_collector.gcs_client.upload_from_stream.side_effect = upload
+        return uploaded
+    
+    def test_stream_to_gcs_writes_geojson_seq_copy(self, insee_collector, sample_geojson_data):
+        """测试流式上传GeoJSON时同时生成每行一个要素的.geojsonl副本"""
+        insee_collector.write_geojson_seq = True
+        body = json.dumps(sample_geojson_data).encode()
+        mock_response = self._mock_stream_response(body, {'content-length': str(len(body))})
+        uploaded = self._consume_uploads_by_path(insee_collector)
+        
+        with patch.object(insee_collector.http_session, 'get', return_value=mock_response):
+            insee_collector._stream_to_gcs(
+                'https://example.com/iris.geojson', 'raw/insee-contours/2024/test/iris.geojson',
+                'geojson', {}, {}
+            )
+        
+        assert uploaded['raw/insee-contours/2024/test/iris.geojson'] == body
+        lines = uploaded['raw/insee-contours/2024/test/iris.geojsonl'].splitlines()
+        assert [json.loads(line) for line in lines] == sample_geojson_data['features']
+    
+    def test_stream_to_gcs_invalid_geojson_discards_seq_copy(self, insee_collector):
+        """测试原始文件验证失败时副本的上传同样不会提交"""
+        insee_collector.write_geojson_seq = True
+        body = b'{"type": "FeatureCollection", "features": [{"type": "Feature", "properties": {}}], "x": '
+        mock_response = self._mock_stream_response(body, {'content-length': str(len(body))})
+        uploaded = self._consume_uploads_by_path(insee_collector)
+        
+        with patch.object(insee_collector.http_session, 'get', return_value=mock_response):
+            with pytest.raises(ValidationError):
+                insee_collector._stream_to_gcs(
+                    'https://example.com/iris.geojson', 'raw/insee-contours/2024/test/iris.geojson',
+                    'geojson', {}, {}
+                )
+        
+        assert uploaded == {}
+    
+    def test_stream_to_gcs_transport_encoding_unknown_size(self, insee_collector, sample_geojson_data):
+        """测试传输压缩的响应不把压缩后的Content-Length当作文件大小"""
+        body = json.dumps(sample_geojson_data).encode()
+        mock_response = self._mock_stream_response(body, {
+            'content-length': '10',
+            'content-encoding': 'gzip'
+        })
+        self._consume_upload(insee_collector)
+        
+        with patch.object(insee_collector.http_session, 'get', return_value=mock_response):
+            size = insee_collector._stream_to_gcs(
+                'https://geo.api.gouv.fr/communes', 'raw/insee-contours/2024/geozones/communes.geojson',
+                'geojson', {}, {}
+            )
+        
+        assert size == len(body)
+        assert mock_response.raw.decode_content is True
+        assert insee_collector.gcs_client.upload_from_stream.call_args.kwargs['size'] is None
+    
     def test_get_remote_file_metadata_success(self, insee_collector):
         """测试成功获取远程文件元数据"""
-        with patch('requests.head') as mock_head:
+        with patch('requests.Session.head') as mock_head:
             mock_response = Mock()
             mock_response.headers = {
                 'content-length': '2000000',
@@ -332,12 +770,16 @@ class TestINSEEContoursCollector:
     
     def test_get_remote_file_metadata_failure(self, insee_collector):
         """测试获取远程文件元数据失败"""
-        with patch('requests.head') as mock_head:
+        with patch('requests.Session.head') as mock_head:
             mock_head.side_effect = requests.RequestException("Request failed")
             
             metadata = insee_collector._get_remote_file_metadata('https://example.com/test.zip')
             
             assert metadata is None
+            
+            # 失败的响应不缓存
+            insee_collector._get_remote_file_metadata('https://example.com/test.zip')
+            assert mock_head.call_count == 2
     
     def test_validate_shapefile_zip_success(self, insee_collector):
         """测试Shapefile ZIP验证成功"""
@@ -357,6 +799,24 @@ class TestINSEEContoursCollector:
             finally:
                 temp_path.unlink()
     
+    def test_validate_shapefile_zip_bad_crc(self, insee_collector):
+        """测试小文件CRC校验失败"""
+        with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_file:
+            with zipfile.ZipFile(temp_file.name, 'w') as zf:
+                zf.writestr('test.shp', b'shapefile content')
+                zf.writestr('test.shx', b'index content')
+                zf.writestr('test.dbf', b'attributes content')
+            
+            temp_path = Path(temp_file.name)
+            # 未压缩存储的内容可以直接改写，长度不变但CRC不再匹配
+            temp_path.write_bytes(temp_path.read_bytes().replace(b'attributes content', b'attributes CONTENT'))
+            
+            try:
+                with pytest.raises(ValidationError, match="CRC"):
+                    insee_collector._validate_geographic_file(temp_path, {'format': 'shapefile'})
+            finally:
+                temp_path.unlink()
+    
     def test_validate_shapefile_zip_missing_components(self, insee_collector):
         """测试Shapefile ZIP缺少组件"""
         with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_file:
@@ -433,6 +893,69 @@ class TestINSEEContoursCollector:
             finally:
                 temp_path.unlink()
     
+    def test_validate_geojson_seq_file(self, insee_collector):
+        """测试按行分隔的GeoJSONSeq文件"""
+        lines = [
+            '{"type": "Feature", "properties": {"code": "75101"}, "geometry": null}',
+            '{"type": "Feature", "properties": {"code": "75102"}, "geometry": null}'
+        ]
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.geojsonl', delete=False, encoding='utf-8') as temp_file:
+            temp_file.write('\n'.join(lines) + '\n')
+            temp_file.flush()
+            
+            temp_path = Path(temp_file.name)
+            
+            try:
+                insee_collector._validate_geojson_file(temp_path)
+            finally:
+                temp_path.unlink()
+    
+    def test_validate_geojson_seq_rejects_collections(self, insee_collector, sample_geojson_data):
+        """测试GeoJSONSeq中的非Feature记录"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.geojsonl', delete=False, encoding='utf-8') as temp_file:
+            temp_file.write(json.dumps(sample_geojson_data) + '\n' + json.dumps(sample_geojson_data) + '\n')
+            temp_file.flush()
+            
+            temp_path = Path(temp_file.name)
+            
+            try:
+                with pytest.raises(ValidationError, match="只能包含Feature"):
+                    insee_collector._validate_geojson_file(temp_path)
+            finally:
+                temp_path.unlink()
+    
+    @patch('collectors.insee_contours.insee_contours_collector.ijson', None)
+    def test_validate_geojson_file_without_ijson(self, insee_collector, sample_geojson_data):
+        """测试没有ijson时的GeoJSON验证"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.geojson', delete=False, encoding='utf-8') as temp_file:
+            json.dump({"type": "FeatureCollection", "features": []}, temp_file)
+            temp_file.flush()
+            
+            temp_path = Path(temp_file.name)
+            
+            try:
+                with pytest.raises(ValidationError, match="不包含任何要素"):
+                    insee_collector._validate_geojson_file(temp_path)
+            finally:
+                temp_path.unlink()
+    
+    @patch('collectors.insee_contours.insee_contours_collector.ijson', None)
+    def test_validate_geojson_seq_file_without_ijson(self, insee_collector, tmp_path):
+        """测试没有ijson时整体解析失败后逐个解码GeoJSONSeq记录"""
+        seq_path = tmp_path / 'iris.geojsonl'
+        seq_path.write_text(
+            '{"type": "Feature", "properties": {}, "geometry": null}\n'
+            '{"type": "Feature", "properties": {}, "geometry": null}\n',
+            encoding='utf-8'
+        )
+        insee_collector._validate_geojson_file(seq_path)
+        
+        invalid_path = tmp_path / 'invalid.geojson'
+        invalid_path.write_text('{"type": "FeatureCollection", "features": [', encoding='utf-8')
+        with pytest.raises(ValidationError, match="无效的JSON格式"):
+            insee_collector._validate_geojson_file(invalid_path)
+    
     def test_validate_geopackage_file_success(self, insee_collector):
         """测试GeoPackage文件验证成功"""
         with tempfile.NamedTemporaryFile(suffix='.gpkg', delete=False) as temp_file:
@@ -518,16 +1041,15 @@ class TestINSEEContoursCollectorIntegration:
             assert collector.target_year == 2024
             assert collector.download_ign_data is True
     
-    def test_cloud_function_entry_point_success(self):
+    def test_cloud_function_entry_point_success(self, tmp_path):
         """测试Cloud Function入口点成功"""
-        mock_config = {
+        config_path = tmp_path / 'config.yaml'
+        config_path.write_text(yaml.dump({
             'gcs_config': {'bucket_name': 'test-bucket'},
             'insee_contours': {'base_url': 'https://test.com/'}
-        }
+        }), encoding='utf-8')
         
-        with patch('builtins.open', mock_open_yaml(mock_config)), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.environ.get', return_value='/test/config.yaml'), \
+        with patch.dict(os.environ, {'CONFIG_PATH': str(config_path)}), \
              patch('collectors.insee_contours.insee_contours_collector.setup_logging'), \
              patch.object(INSEEContoursCollector, 'collect') as mock_collect:
             
@@ -543,24 +1065,29 @@ class TestINSEEContoursCollectorIntegration:
             assert result_data['collector'] == 'insee_contours'
             assert result_data['status'] == 'success'
     
-    def test_cloud_function_entry_point_error(self):
+    def test_cloud_function_entry_point_error(self, tmp_path):
         """测试Cloud Function入口点错误处理"""
-        with patch('os.path.exists', return_value=False):
+        with patch.dict(os.environ, {'CONFIG_PATH': str(tmp_path / 'missing.yaml')}):
             result = insee_contours_collector_main()
             result_data = json.loads(result)
             
             assert result_data['collector'] == 'insee_contours'
             assert result_data['status'] == 'error'
             assert 'error' in result_data
-
-
-def mock_open_yaml(yaml_content):
-    """模拟YAML文件读取"""
-    import yaml
-    from unittest.mock import mock_open
     
-    yaml_str = yaml.dump(yaml_content)
-    return mock_open(read_data=yaml_str)
+    def test_load_config_reuses_parsed_file_until_modified(self, tmp_path):
+        """测试配置文件未修改时复用解析结果，修改后重新解析"""
+        config_path = tmp_path / 'config.yaml'
+        config_path.write_text('insee_contours:\n  target_year: 2024\n', encoding='utf-8')
+        
+        first = insee_contours_collector._load_config(str(config_path))
+        assert insee_contours_collector._load_config(str(config_path)) is first
+        
+        config_path.write_text('insee_contours:\n  target_year: 2025\n', encoding='utf-8')
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        assert insee_contours_collector._load_config(str(config_path))['insee_contours']['target_year'] == 2025
 
 
 if __name__ == "__main__":
@@ -400,6 +400,9 @@ class TestMasterScheduler(unittest.TestCase):
         
         copy_call = mock_gcs_client.copy_file.call_args
         self.assertEqual(copy_call[0][1], 'scheduler/reports/latest_execution.json')
+        
+        # Temporary file is removed after upload
+        self.assertFalse(os.path.exists(upload_call[0][0]))
     
     @patch('scheduler.master_scheduler.get_config')
     @patch('scheduler.master_scheduler.get_gcs_client')
@@ -3,18 +3,49 @@
 import json
 import os
 import tempfile
+import threading
 import unittest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch, MagicMock, mock_open
 from pathlib import Path
+from urllib.parse import parse_qs, quote_plus, urlencode, urlparse
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import Point, Polygon
+from shapely.geometry import Point, Polygon, box
 import requests
+from tenacity import wait_none
 
 from collectors.plu.plu_collector import PLUCollector, plu_collector_main
 from utils.utils import setup_logging
 
 
+def _dotted_config(config):
+    """Build a get_config() stand-in resolving dotted keys against a nested dict."""
+    def get(key, default=None):
+        value = config
+        for part in key.split('.'):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
+    
+    loader = Mock()
+    loader.get.side_effect = get
+    return loader
+
+
+def _make_collector(plu_config, processing_config=None):
+    """Create a PLU collector against a mocked configuration and GCS client."""
+    config = {
+        'data_sources': {'plu': {'wfs_endpoint': 'https://test.example.com/wfs', **plu_config}},
+        'processing_config': processing_config or {},
+        'logging_config': {'level': 'INFO', 'enable_cloud_logging': False, 'format': 'json'}
+    }
+    with patch('collectors.base_collector.get_config', return_value=_dotted_config(config)), \
+         patch('collectors.base_collector.get_gcs_client', return_value=Mock()):
+        return PLUCollector()
+
+
 class TestPLUCollector(unittest.TestCase):
     """Test cases for PLU collector core functionality."""
     
@@ -105,13 +136,12 @@ class TestPLUCollector(unittest.TestCase):
             ]
         }
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_collector_initialization(self, mock_logging, mock_gcs, mock_config):
         """Test PLU collector initialization."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -126,13 +156,12 @@ class TestPLUCollector(unittest.TestCase):
         self.assertTrue(collector.use_bbox)
         self.assertTrue(collector.use_insee_codes)
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_collect_success(self, mock_logging, mock_gcs, mock_config):
         """Test successful PLU data collection."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -155,13 +184,12 @@ class TestPLUCollector(unittest.TestCase):
             self.assertEqual(len(result['errors']), 0)
             self.assertIn('layers_summary', result)
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_collect_with_layer_error(self, mock_logging, mock_gcs, mock_config):
         """Test PLU collection with layer processing error."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -182,13 +210,12 @@ class TestPLUCollector(unittest.TestCase):
             self.assertEqual(len(result['errors']), 1)
             self.assertEqual(result['errors'][0]['layer'], 'GPU.PRESCRIPTION_SURF')
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_create_bbox_filter(self, mock_logging, mock_gcs, mock_config):
         """Test bounding box filter creation."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -201,21 +228,20 @@ class TestPLUCollector(unittest.TestCase):
         self.assertEqual(bbox_filter['max_y'], 48.9)
         self.assertEqual(bbox_filter['srs'], 'CRS:84')
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_fetch_wfs_data_success(self, mock_get, mock_logging, mock_gcs, mock_config):
         """Test successful WFS data fetching."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
         # Mock successful HTTP response
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = self.sample_geojson_response
+        mock_response.content = json.dumps(self.sample_geojson_response).encode()
         mock_get.return_value = mock_response
         
         collector = PLUCollector()
@@ -231,20 +257,19 @@ class TestPLUCollector(unittest.TestCase):
         self.assertIn('service=WFS', call_args[0][0])
         self.assertIn('typename=GPU.ZONE_URBA', call_args[0][0])
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_fetch_wfs_data_with_bbox(self, mock_get, mock_logging, mock_gcs, mock_config):
         """Test WFS data fetching with bounding box filter."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = self.sample_geojson_response
+        mock_response.content = json.dumps(self.sample_geojson_response).encode()
         mock_get.return_value = mock_response
         
         collector = PLUCollector()
@@ -262,14 +287,13 @@ class TestPLUCollector(unittest.TestCase):
         call_args = mock_get.call_args
         self.assertIn('bbox=2.2%2C48.8%2C2.4%2C48.9%2CCRS%3A84', call_args[0][0])
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_fetch_wfs_data_network_error(self, mock_get, mock_logging, mock_gcs, mock_config):
         """Test WFS data fetching with network error."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -280,13 +304,12 @@ class TestPLUCollector(unittest.TestCase):
         
         self.assertIsNone(result)
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_fetch_data_by_insee_codes(self, mock_logging, mock_gcs, mock_config):
         """Test fetching data by INSEE codes."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -309,46 +332,34 @@ class TestPLUCollector(unittest.TestCase):
             self.assertIn('cql_filter', call_args[1])
             self.assertIn("INSEE_COM IN ('75101','69001')", call_args[1]['cql_filter'])
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_process_features_success(self, mock_logging, mock_gcs, mock_config):
         """Test successful feature processing."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
         collector = PLUCollector()
         
-        # Mock CRS transformation
-        with patch('geopandas.GeoDataFrame.from_features') as mock_from_features, \
-             patch('geopandas.GeoDataFrame.to_crs') as mock_to_crs:
-            
-            # Create mock GeoDataFrame
-            mock_gdf = Mock(spec=gpd.GeoDataFrame)
-            mock_gdf.empty = False
-            mock_gdf.geometry = Mock()
-            mock_gdf.geometry.is_valid = pd.Series([True, True])
-            mock_gdf.__len__ = Mock(return_value=2)
-            mock_gdf.loc = Mock()
-            
-            mock_from_features.return_value = mock_gdf
-            mock_to_crs.return_value = mock_gdf
-            
-            result = collector._process_features(self.sample_geojson_response, 'GPU.ZONE_URBA')
-            
-            self.assertIsNotNone(result)
-            mock_from_features.assert_called_once()
-            mock_to_crs.assert_called_once_with('EPSG:2154')
+        result = collector._process_features(self.sample_geojson_response, 'GPU.ZONE_URBA')
+        
+        self.assertIsNotNone(result)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result.crs.to_string(), 'EPSG:2154')
+        self.assertEqual(list(result['typezone']), ['AU', 'N'])
+        # Coordinates are reprojected, not just relabelled: central Paris in Lambert-93
+        min_x, min_y, max_x, max_y = result.total_bounds
+        self.assertTrue(640000 < min_x < max_x < 660000)
+        self.assertTrue(6850000 < min_y < max_y < 6870000)
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_process_features_empty_data(self, mock_logging, mock_gcs, mock_config):
         """Test processing empty feature data."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -359,24 +370,21 @@ class TestPLUCollector(unittest.TestCase):
         
         self.assertIsNone(result)
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_save_as_geojson_success(self, mock_logging, mock_gcs, mock_config):
         """Test successful GeoJSON saving."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
         collector = PLUCollector()
         
-        # Mock GeoDataFrame
-        mock_gdf = Mock(spec=gpd.GeoDataFrame)
-        mock_gdf.to_file = Mock()
+        gdf = gpd.GeoDataFrame({'typezone': ['U']}, geometry=[Point(2.3, 48.85)], crs='EPSG:4326')
         
-        with patch.object(collector, 'upload_to_gcs', return_value=True) as mock_upload:
-            result = collector._save_as_geojson(mock_gdf, 'test.geojson')
+        with patch.object(collector, 'upload_bytes_to_gcs', return_value=True) as mock_upload:
+            result = collector._save_as_geojson(gdf, 'test.geojson')
             
             self.assertTrue(result)
             mock_upload.assert_called_once()
@@ -385,24 +393,21 @@ class TestPLUCollector(unittest.TestCase):
             call_args = mock_upload.call_args
             self.assertTrue(call_args[0][1].endswith('/test.geojson'))
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_save_as_geopackage_success(self, mock_logging, mock_gcs, mock_config):
         """Test successful GeoPackage saving."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
         collector = PLUCollector()
         
-        # Mock GeoDataFrame
-        mock_gdf = Mock(spec=gpd.GeoDataFrame)
-        mock_gdf.to_file = Mock()
+        gdf = gpd.GeoDataFrame({'typezone': ['U']}, geometry=[Point(2.3, 48.85)], crs='EPSG:4326')
         
         with patch.object(collector, 'upload_to_gcs', return_value=True) as mock_upload:
-            result = collector._save_as_geopackage(mock_gdf, 'test.gpkg')
+            result = collector._save_as_geopackage(gdf, 'test.gpkg')
             
             self.assertTrue(result)
             mock_upload.assert_called_once()
@@ -411,13 +416,12 @@ class TestPLUCollector(unittest.TestCase):
             call_args = mock_upload.call_args
             self.assertTrue(call_args[0][1].endswith('/test.gpkg'))
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_validate_data_success(self, mock_logging, mock_gcs, mock_config):
         """Test successful data validation."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -435,13 +439,12 @@ class TestPLUCollector(unittest.TestCase):
         
         self.assertTrue(result)
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_validate_data_not_geodataframe(self, mock_logging, mock_gcs, mock_config):
         """Test data validation with non-GeoDataFrame input."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -451,13 +454,12 @@ class TestPLUCollector(unittest.TestCase):
         
         self.assertFalse(result)
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_validate_data_empty_geodataframe(self, mock_logging, mock_gcs, mock_config):
         """Test data validation with empty GeoDataFrame."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -471,13 +473,12 @@ class TestPLUCollector(unittest.TestCase):
         
         self.assertFalse(result)
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_validate_data_missing_geometry(self, mock_logging, mock_gcs, mock_config):
         """Test data validation with missing geometry column."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -491,6 +492,874 @@ class TestPLUCollector(unittest.TestCase):
         result = collector.validate_data(mock_gdf)
         
         self.assertFalse(result)
+    
+    # Tests for concurrent WFS requests
+    
+    def _setup_concurrency(self):
+        """Create a collector with three layers and three request workers."""
+        self.collector = _make_collector({
+            'layer_types': ['GPU.ZONE_URBA', 'GPU.PRESCRIPTION_SURF', 'GPU.INFO_SURF'],
+            'max_parallel_requests': 3
+        })
+    
+    def test_collect_runs_layers_concurrently(self):
+        """Test layers are fetched in parallel and summarized in configuration order."""
+        self._setup_concurrency()
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def collect_layer(layer_type, changed_since=None):
+            # Every layer waits until all three have started
+            barrier.wait()
+            if layer_type == 'GPU.PRESCRIPTION_SURF':
+                raise RuntimeError("WFS service unavailable")
+            return {'features_count': 5, 'files_created': 1}
+        
+        with patch.object(self.collector, '_collect_layer_data', side_effect=collect_layer):
+            result = self.collector.collect()
+        
+        self.assertEqual(result['layers_processed'], 2)
+        self.assertEqual(result['features_collected'], 10)
+        self.assertEqual(list(result['layers_summary']), ['GPU.ZONE_URBA', 'GPU.INFO_SURF'])
+        self.assertEqual(result['errors'][0]['layer'], 'GPU.PRESCRIPTION_SURF')
+    
+    def test_collect_shuts_down_request_executor(self):
+        """Test the WFS request pool does not outlive a collection run."""
+        self._setup_concurrency()
+        executors = []
+        
+        def collect_layer(layer_type, changed_since=None):
+            executors.append(self.collector._get_request_executor())
+            return {'features_count': 0, 'files_created': 0}
+        
+        with patch.object(self.collector, '_collect_layer_data', side_effect=collect_layer):
+            self.collector.collect()
+        
+        self.assertIsNone(self.collector._request_executor)
+        self.assertTrue(executors[0]._shutdown)
+    
+    def test_fetch_data_by_insee_codes_runs_batches_concurrently(self):
+        """Test INSEE batches are requested in parallel and merged in order."""
+        self._setup_concurrency()
+        insee_codes = [f'{75101 + i}' for i in range(25)]
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def fetch(layer_type, cql_filter=None, **paging):
+            barrier.wait()
+            first_code = cql_filter.split("'")[1]
+            return {'features': [{'type': 'Feature', 'properties': {'first': first_code}}]}
+        
+        with patch.object(self.collector, '_fetch_wfs_data', side_effect=fetch) as mock_fetch, \
+             patch.object(self.collector, '_insee_batch_size', return_value=10):
+            result = self.collector._fetch_data_by_insee_codes('GPU.ZONE_URBA', insee_codes)
+        
+        self.assertEqual(mock_fetch.call_count, 3)
+        self.assertEqual(
+            [feature['properties']['first'] for feature in result['features']],
+            ['75101', '75111', '75121']
+        )
+    
+    def test_insee_batches_fit_max_url_length(self):
+        """Test INSEE batches are as large as max_url_length allows."""
+        self._setup_concurrency()
+        insee_codes = [f'{10000 + i}' for i in range(2000)]
+        self.collector.max_url_length = 2000
+        filters = []
+        
+        def fetch_queries(layer_type, filters_list):
+            filters.extend(f['cql_filter'] for f in filters_list)
+            return [{'features': []} for _ in filters_list]
+        
+        with patch.object(self.collector, '_fetch_queries', side_effect=fetch_queries):
+            self.collector._fetch_data_by_insee_codes('GPU.ZONE_URBA', insee_codes)
+        
+        urls = [
+            self.collector._build_wfs_url('GPU.ZONE_URBA', cql_filter=f, start_index=10 ** 6, count=1000)
+            for f in filters
+        ]
+        self.assertTrue(all(len(url) <= 2000 for url in urls))
+        # Full batches come within a couple of codes of the limit
+        self.assertGreater(len(urls[0]) + 2 * len(quote_plus("'10000',")), 2000)
+        codes = [code for f in filters for code in f[len('INSEE_COM IN ('):-1].split(',')]
+        self.assertEqual(codes, [f"'{code}'" for code in insee_codes])
+    
+    def test_insee_codes_are_quoted_as_cql_literals(self):
+        """Test quotes inside INSEE codes are escaped."""
+        self._setup_concurrency()
+        with patch.object(self.collector, '_fetch_queries', return_value=[{'features': []}]) as mock_queries:
+            self.collector._fetch_data_by_insee_codes('GPU.ZONE_URBA', ['2A004', "x'y"])
+        
+        self.assertEqual(
+            mock_queries.call_args.args[1],
+            [{'cql_filter': "INSEE_COM IN ('2A004','x''y')"}]
+        )
+
+    
+    # Tests for WFS requests on the pooled session
+    
+    def _setup_wfs_requests(self):
+        """Create a collector that retries without waiting."""
+        self.collector = _make_collector(
+            {'layer_types': ['GPU.ZONE_URBA']},
+            {'max_retries': 3, 'retry_delay_seconds': 0}
+        )
+        self.collector._wfs_retrying = self.collector._wfs_retrying.copy(wait=wait_none())
+    
+    def _response(self, status_code, payload=None):
+        response = Mock(status_code=status_code)
+        response.content = json.dumps(payload).encode()
+        if status_code >= 400:
+            response.raise_for_status.side_effect = requests.HTTPError(response=response)
+        return response
+    
+    @patch('requests.Session.get')
+    def test_fetch_wfs_data_retries_transient_status(self, mock_get):
+        """Test 503 responses are retried on the collector session."""
+        self._setup_wfs_requests()
+        payload = {'type': 'FeatureCollection', 'features': []}
+        mock_get.side_effect = [self._response(503), self._response(200, payload)]
+        
+        result = self.collector._fetch_wfs_data('GPU.ZONE_URBA')
+        
+        self.assertEqual(result, payload)
+        self.assertEqual(mock_get.call_count, 2)
+    
+    @patch('requests.Session.get')
+    def test_fetch_wfs_data_does_not_retry_client_error(self, mock_get):
+        """Test 400 responses fail immediately."""
+        self._setup_wfs_requests()
+        mock_get.return_value = self._response(400)
+        
+        self.assertIsNone(self.collector._fetch_wfs_data('GPU.ZONE_URBA'))
+        self.assertEqual(mock_get.call_count, 1)
+    
+    @patch('requests.Session.get')
+    def test_fetch_wfs_data_gives_up_after_max_retries(self, mock_get):
+        """Test connection errors stop after max_retries attempts."""
+        self._setup_wfs_requests()
+        mock_get.side_effect = requests.ConnectionError("connection reset")
+        
+        self.assertIsNone(self.collector._fetch_wfs_data('GPU.ZONE_URBA'))
+        self.assertEqual(mock_get.call_count, 3)
+    
+    @patch('requests.Session.get')
+    def test_fetch_wfs_data_invalid_json(self, mock_get):
+        """Test an unparsable JSON body is reported as a failed request."""
+        self._setup_wfs_requests()
+        response = self._response(200)
+        response.content = b'{"type": "FeatureCollection", "features": ['
+        mock_get.return_value = response
+        
+        self.assertIsNone(self.collector._fetch_wfs_data('GPU.ZONE_URBA'))
+
+    
+    def test_build_wfs_url_matches_urlencode(self):
+        """Test the cached-prefix URL equals encoding all parameters at once."""
+        self._setup_wfs_requests()
+        collector = self.collector
+        bbox = {'min_x': 648000, 'min_y': 6859000, 'max_x': 663000, 'max_y': 6871000, 'srs': 'EPSG:2154'}
+        base = {
+            'service': 'WFS', 'version': collector.wfs_version, 'request': 'GetFeature',
+            'typename': 'GPU.ZONE_URBA', 'outputFormat': collector.output_format,
+            'srsname': collector.input_srs
+        }
+        
+        cases = [
+            ({}, {'maxfeatures': collector.max_features}),
+            ({'start_index': 2000, 'count': 1000, 'bbox_filter': bbox},
+             {'count': 1000, 'startIndex': 2000, 'bbox': '648000,6859000,663000,6871000,EPSG:2154'}),
+            ({'start_index': 0, 'count': 1000, 'cql_filter': "INSEE_COM IN ('75101','2A004')"},
+             {'count': 1000, 'startIndex': 0, 'cql_filter': "INSEE_COM IN ('75101','2A004')"}),
+        ]
+        for kwargs, params in cases:
+            with self.subTest(kwargs=kwargs):
+                self.assertEqual(
+                    collector._build_wfs_url('GPU.ZONE_URBA', **kwargs),
+                    f"{collector.wfs_endpoint}?{urlencode({**base, **params})}"
+                )
+        self.assertEqual(list(collector._wfs_url_prefixes), ['GPU.ZONE_URBA'])
+
+    
+    # Tests for the GCS cache of GetFeature responses
+    
+    def _setup_wfs_cache(self):
+        """Create a collector whose GCS client stores blobs in a dict."""
+        self.collector = _make_collector({'layer_types': ['GPU.ZONE_URBA'], 'wfs_cache_ttl_hours': 24})
+        self.blobs = {}
+        
+        def upload_from_bytes(data, gcs_path, content_type=None, metadata=None):
+            self.blobs[gcs_path] = Mock(updated=datetime.now(timezone.utc), metadata=metadata,
+                                        **{'download_as_bytes.return_value': data})
+        
+        self.collector.gcs_client.upload_from_bytes.side_effect = upload_from_bytes
+        self.collector.gcs_client.get_blob.side_effect = self.blobs.get
+        self.payload = b'{"type": "FeatureCollection", "features": [{"id": 1}]}'
+    
+    @patch('requests.Session.get')
+    def test_second_request_is_served_from_cache(self, mock_get):
+        """Test a repeated URL is read from GCS instead of the WFS."""
+        self._setup_wfs_cache()
+        mock_get.return_value.content = self.payload
+        
+        first = self.collector._fetch_wfs_data('GPU.ZONE_URBA', start_index=0, count=10)
+        second = self.collector._fetch_wfs_data('GPU.ZONE_URBA', start_index=0, count=10)
+        
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+        (gcs_path,) = self.blobs
+        self.assertTrue(gcs_path.startswith(f'{self.collector.metadata_path}/wfs_cache/'))
+    
+    @patch('requests.Session.get')
+    def test_expired_entry_is_refetched(self, mock_get):
+        """Test entries older than the TTL are ignored and deleted."""
+        self._setup_wfs_cache()
+        mock_get.return_value.content = self.payload
+        self.collector._fetch_wfs_data('GPU.ZONE_URBA')
+        (expired,) = self.blobs.values()
+        expired.updated -= timedelta(hours=25)
+        
+        self.collector._fetch_wfs_data('GPU.ZONE_URBA')
+        
+        self.assertEqual(mock_get.call_count, 2)
+        expired.delete.assert_called_once()
+    
+    @patch('requests.Session.get')
+    def test_incremental_request_is_not_cached(self, mock_get):
+        """Test queries filtered on the update watermark bypass the cache."""
+        self._setup_wfs_cache()
+        mock_get.return_value.content = self.payload
+        cql_filter = "gpu_timestamp AFTER 2024-03-01T00:00:00Z"
+        
+        self.collector._fetch_wfs_data('GPU.ZONE_URBA', cql_filter=cql_filter)
+        self.collector._fetch_wfs_data('GPU.ZONE_URBA', cql_filter=cql_filter)
+        
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(self.blobs, {})
+        self.collector.gcs_client.get_blob.assert_not_called()
+    
+    @patch('requests.Session.get')
+    def test_cache_errors_fall_back_to_wfs(self, mock_get):
+        """Test a failing cache never fails the request."""
+        self._setup_wfs_cache()
+        mock_get.return_value.content = self.payload
+        self.collector.gcs_client.get_blob.side_effect = RuntimeError("403 Forbidden")
+        self.collector.gcs_client.upload_from_bytes.side_effect = RuntimeError("403 Forbidden")
+        
+        result = self.collector._fetch_wfs_data('GPU.ZONE_URBA')
+        
+        self.assertEqual(result['features'], [{'id': 1}])
+    
+    @patch('requests.Session.get')
+    def test_watermark_is_bounded_by_cached_request_time(self, mock_get):
+        """Test a layer rebuilt from cached pages does not advance its watermark past them."""
+        self._setup_wfs_cache()
+        mock_get.return_value.content = self.payload
+        self.collector.use_bbox = False
+        self.collector.insee_codes = []
+        
+        with patch.object(self.collector, '_save_layer_data', return_value=False):
+            self.collector._collect_layer_data('GPU.ZONE_URBA')
+        requested_at = datetime.now(timezone.utc) - timedelta(hours=10)
+        for blob in self.blobs.values():
+            blob.metadata = {'requested_at': requested_at.isoformat()}
+        
+        with patch.object(self.collector, '_save_layer_data', return_value=True):
+            result = self.collector._collect_layer_data('GPU.ZONE_URBA')
+        
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(result['watermark'], requested_at.strftime('%Y-%m-%dT%H:%M:%SZ'))
+    
+    @patch('requests.Session.get')
+    def test_fresh_fetch_watermark_is_fetch_start(self, mock_get):
+        """Test a layer fetched from the WFS uses the time its fetch started."""
+        self._setup_wfs_cache()
+        mock_get.return_value.content = self.payload
+        self.collector.use_bbox = False
+        self.collector.insee_codes = []
+        before = datetime.now(timezone.utc).replace(microsecond=0)
+        
+        with patch.object(self.collector, '_save_layer_data', return_value=True):
+            result = self.collector._collect_layer_data('GPU.ZONE_URBA')
+        
+        watermark = datetime.strptime(result['watermark'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+        self.assertLessEqual(before, watermark)
+        (blob,) = self.blobs.values()
+        self.assertLessEqual(datetime.fromisoformat(blob.metadata['requested_at']), datetime.now(timezone.utc))
+    
+    @patch('requests.Session.get')
+    def test_invalid_response_is_not_cached(self, mock_get):
+        """Test unparsable responses are not stored."""
+        self._setup_wfs_cache()
+        mock_get.return_value.content = b'<html>Service unavailable'
+        
+        self.assertIsNone(self.collector._fetch_wfs_data('GPU.ZONE_URBA'))
+        self.assertEqual(self.blobs, {})
+
+    
+    # Tests for WFS 2.0 startIndex/count paging
+    
+    def _setup_paging(self):
+        """Create a collector with 2-feature pages and two request workers."""
+        self.collector = _make_collector({
+            'layer_types': ['GPU.ZONE_URBA'],
+            'page_size': 2,
+            'max_parallel_requests': 2
+        })
+    
+    def _paged_source(self, total, number_matched=True):
+        """Serve `total` numbered features page by page, recording requested offsets."""
+        offsets = []
+        
+        def fetch(layer_type, bbox_filter=None, cql_filter=None, start_index=None, count=None):
+            offsets.append(start_index)
+            features = [{'id': i} for i in range(start_index, min(start_index + count, total))]
+            page = {'type': 'FeatureCollection', 'features': features}
+            if number_matched:
+                page['numberMatched'] = total
+            return page
+        
+        return fetch, offsets
+    
+    def test_fetch_wfs_paged_uses_number_matched(self):
+        """Test all remaining pages are requested once numberMatched is known."""
+        self._setup_paging()
+        fetch, offsets = self._paged_source(5)
+        
+        with patch.object(self.collector, '_fetch_wfs_data', side_effect=fetch):
+            result = self.collector._fetch_wfs_paged('GPU.ZONE_URBA', cql_filter="INSEE_COM = '75101'")
+        
+        self.assertEqual([f['id'] for f in result['features']], [0, 1, 2, 3, 4])
+        self.assertEqual(sorted(offsets), [0, 2, 4])
+    
+    def test_fetch_wfs_paged_without_number_matched(self):
+        """Test pages are requested in waves until one comes back short."""
+        self._setup_paging()
+        fetch, offsets = self._paged_source(6, number_matched=False)
+        
+        with patch.object(self.collector, '_fetch_wfs_data', side_effect=fetch):
+            result = self.collector._fetch_wfs_paged('GPU.ZONE_URBA')
+        
+        self.assertEqual([f['id'] for f in result['features']], [0, 1, 2, 3, 4, 5])
+        # Waves of two pages after the first: [2, 4] then [6, 8]
+        self.assertEqual(sorted(offsets), [0, 2, 4, 6, 8])
+    
+    def test_fetch_wfs_paged_single_short_page(self):
+        """Test a first page shorter than page_size needs no further requests."""
+        self._setup_paging()
+        fetch, offsets = self._paged_source(1)
+        
+        with patch.object(self.collector, '_fetch_wfs_data', side_effect=fetch):
+            result = self.collector._fetch_wfs_paged('GPU.ZONE_URBA')
+        
+        self.assertEqual(len(result['features']), 1)
+        self.assertEqual(offsets, [0])
+    
+    def test_fetch_wfs_paged_failed_page(self):
+        """Test a failed page fails the whole query instead of returning partial data."""
+        self._setup_paging()
+        fetch, _ = self._paged_source(5)
+        
+        def failing_fetch(layer_type, **kwargs):
+            return None if kwargs['start_index'] == 2 else fetch(layer_type, **kwargs)
+        
+        with patch.object(self.collector, '_fetch_wfs_data', side_effect=failing_fetch):
+            self.assertIsNone(self.collector._fetch_wfs_paged('GPU.ZONE_URBA'))
+    
+    @patch('requests.Session.get')
+    def test_fetch_wfs_data_paging_params(self, mock_get):
+        """Test paged requests send count/startIndex instead of maxfeatures."""
+        self._setup_paging()
+        mock_get.return_value.content = b'{"type": "FeatureCollection", "features": []}'
+        
+        self.collector._fetch_wfs_data('GPU.ZONE_URBA', start_index=4, count=2)
+        
+        url = mock_get.call_args.args[0]
+        self.assertIn('count=2', url)
+        self.assertIn('startIndex=4', url)
+        self.assertNotIn('maxfeatures', url)
+
+    
+    # Tests for splitting the bbox into tiles
+    
+    def _setup_bbox_tiles(self):
+        """Create a collector with a 2x2 bbox grid."""
+        self.collector = _make_collector({
+            'layer_types': ['GPU.ZONE_URBA'],
+            'filter_options': {'bbox_grid': [2, 2]}
+        })
+        self.bbox = {'min_x': 2.2, 'min_y': 48.8, 'max_x': 2.4, 'max_y': 48.9, 'srs': 'CRS:84'}
+    
+    def test_tile_bbox_covers_bbox(self):
+        """Test tiles share edges and end exactly on the original bounds."""
+        self._setup_bbox_tiles()
+        tiles = PLUCollector._tile_bbox(self.bbox, 2, 2)
+        
+        self.assertEqual(len(tiles), 4)
+        self.assertEqual((tiles[0]['min_x'], tiles[0]['min_y']), (2.2, 48.8))
+        self.assertEqual((tiles[3]['max_x'], tiles[3]['max_y']), (2.4, 48.9))
+        self.assertEqual(tiles[0]['max_x'], tiles[1]['min_x'])
+        self.assertEqual(tiles[0]['max_y'], tiles[2]['min_y'])
+        self.assertTrue(all(tile['srs'] == 'CRS:84' for tile in tiles))
+    
+    def test_fetch_data_by_bbox_tiles_deduplicates_features(self):
+        """Test features returned by several tiles are kept once."""
+        self._setup_bbox_tiles()
+        barrier = threading.Barrier(4, timeout=5)
+        
+        def fetch(layer_type, bbox_filter=None, **filters):
+            barrier.wait()
+            # Every tile returns a feature of its own and the shared feature 'edge'
+            tile_id = f"{bbox_filter['min_x']:.1f}/{bbox_filter['min_y']:.2f}"
+            return {'features': [{'id': tile_id}, {'id': 'edge'}, {'properties': {}}]}
+        
+        with patch.object(self.collector, '_fetch_wfs_paged', side_effect=fetch) as mock_fetch:
+            result = self.collector._fetch_data_by_bbox_tiles('GPU.ZONE_URBA', self.bbox)
+        
+        self.assertEqual(mock_fetch.call_count, 4)
+        ids = [feature.get('id') for feature in result['features']]
+        self.assertEqual(ids.count('edge'), 1)
+        # Features without an id cannot be matched and are all kept
+        self.assertEqual(ids.count(None), 4)
+        self.assertEqual(len(ids), 9)
+    
+    def test_fetch_data_by_bbox_tiles_failed_tile(self):
+        """Test a failed tile fails the whole bbox query."""
+        self._setup_bbox_tiles()
+        def fetch(layer_type, bbox_filter=None, **filters):
+            return None if bbox_filter['min_x'] == 2.2 and bbox_filter['min_y'] == 48.8 else {'features': []}
+        
+        with patch.object(self.collector, '_fetch_wfs_paged', side_effect=fetch):
+            self.assertIsNone(self.collector._fetch_data_by_bbox_tiles('GPU.ZONE_URBA', self.bbox))
+    
+    def test_bbox_is_requested_in_output_srs(self):
+        """Test the configured lon/lat bbox is sent in Lambert-93 and features need no reprojection."""
+        self._setup_bbox_tiles()
+        collector = _make_collector({
+            'layer_types': ['GPU.ZONE_URBA'],
+            'output_srs': 'EPSG:2154',
+            'filter_options': {'default_bbox': self.bbox}
+        })
+        corners = gpd.GeoSeries(
+            [Point(2.2, 48.8), Point(2.4, 48.8), Point(2.2, 48.9), Point(2.4, 48.9)], crs='OGC:CRS84'
+        ).to_crs('EPSG:2154')
+        
+        bbox = collector.request_bbox
+        url = collector._build_wfs_url('GPU.ZONE_URBA', bbox_filter=bbox)
+        
+        self.assertIsNone(collector._transformer)
+        self.assertEqual(bbox['srs'], 'EPSG:2154')
+        self.assertTrue(all(isinstance(bbox[key], int) for key in ('min_x', 'min_y', 'max_x', 'max_y')))
+        self.assertTrue(box(bbox['min_x'], bbox['min_y'], bbox['max_x'], bbox['max_y']).contains(corners.union_all()))
+        self.assertEqual(parse_qs(urlparse(url).query)['srsname'], ['EPSG:2154'])
+    
+    def test_bbox_already_in_input_srs_is_unchanged(self):
+        """Test no projection happens when the bbox is in the requested SRS."""
+        self._setup_bbox_tiles()
+        self.assertIs(PLUCollector._project_bbox(self.bbox, 'CRS:84'), self.bbox)
+    
+    def test_single_tile_grid_sends_original_bbox(self):
+        """Test the default 1x1 grid requests the bbox unchanged."""
+        self._setup_bbox_tiles()
+        self.collector.bbox_grid = [1, 1]
+        
+        with patch.object(self.collector, '_fetch_wfs_paged', return_value={'features': []}) as mock_fetch:
+            self.collector._fetch_data_by_bbox_tiles('GPU.ZONE_URBA', self.bbox)
+        
+        mock_fetch.assert_called_once_with('GPU.ZONE_URBA', bbox_filter=self.bbox, cql_filter=None)
+
+    
+    # Tests for converting WFS features to a GeoDataFrame
+    
+    def _setup_feature_processing(self):
+        """Create a collector that keeps WGS84 and skips validation."""
+        self.collector = _make_collector({
+            'layer_types': ['GPU.ZONE_URBA'],
+            'input_srs': 'EPSG:4326',
+            'output_srs': 'EPSG:4326',
+            'validate_geometry': False
+        })
+    
+    def test_process_features_parses_geometries_and_properties(self):
+        """Test geometries are parsed and properties become columns in feature order."""
+        self._setup_feature_processing()
+        features = {'features': [
+            {'type': 'Feature', 'properties': {'typezone': 'U', 'libelle': 'UA'},
+             'geometry': {'type': 'Point', 'coordinates': [2.3, 48.85]}},
+            {'type': 'Feature', 'properties': {'typezone': 'N'},
+             'geometry': {'type': 'Polygon', 'coordinates': [[[0, 0], [1, 0], [1, 1], [0, 0]]]}}
+        ]}
+        
+        gdf = self.collector._process_features(features, 'GPU.ZONE_URBA')
+        
+        self.assertEqual(gdf.crs.to_string(), 'EPSG:4326')
+        self.assertEqual(list(gdf.geometry.geom_type), ['Point', 'Polygon'])
+        self.assertEqual((gdf.geometry.iloc[0].x, gdf.geometry.iloc[0].y), (2.3, 48.85))
+        self.assertEqual(list(gdf['typezone']), ['U', 'N'])
+        self.assertTrue(pd.isna(gdf['libelle'].iloc[1]))
+        self.assertEqual(list(gdf['layer_type']), ['GPU.ZONE_URBA'] * 2)
+        self.assertEqual(list(gdf['source']), ['GPU_WFS'] * 2)
+        for column in ('collection_timestamp', 'layer_type', 'source'):
+            self.assertIsInstance(gdf[column].dtype, pd.CategoricalDtype)
+            self.assertEqual(gdf[column].cat.codes.dtype, 'int8')
+    
+    def test_process_features_keeps_null_geometries(self):
+        """Test features without geometry or properties are kept as missing values."""
+        self._setup_feature_processing()
+        features = {'features': [
+            {'type': 'Feature', 'properties': None, 'geometry': None},
+            {'type': 'Feature', 'properties': {'typezone': 'A'},
+             'geometry': {'type': 'Point', 'coordinates': [1, 2]}}
+        ]}
+        
+        gdf = self.collector._process_features(features, 'GPU.ZONE_URBA')
+        
+        self.assertEqual(len(gdf), 2)
+        self.assertIsNone(gdf.geometry.iloc[0])
+        self.assertEqual(gdf['typezone'].iloc[1], 'A')
+    
+    def test_process_features_repairs_invalid_geometries(self):
+        """Test invalid polygons are repaired with make_valid without losing parts."""
+        self._setup_feature_processing()
+        self.collector.validate_geometry = True
+        bowtie = {'type': 'Polygon', 'coordinates': [[[0, 0], [1, 1], [1, 0], [0, 1], [0, 0]]]}
+        features = {'features': [
+            {'type': 'Feature', 'properties': {}, 'geometry': bowtie},
+            {'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Point', 'coordinates': [1, 2]}},
+            {'type': 'Feature', 'properties': {}, 'geometry': None}
+        ]}
+        
+        with self.assertLogs(self.collector.logger, level='WARNING') as logs:
+            gdf = self.collector._process_features(features, 'GPU.ZONE_URBA')
+        
+        self.assertIn('Found 1 invalid geometries', logs.output[0])
+        self.assertEqual(gdf.geometry.iloc[0].geom_type, 'MultiPolygon')
+        self.assertAlmostEqual(gdf.geometry.iloc[0].area, 0.5)
+        self.assertEqual(gdf.geometry.iloc[1].geom_type, 'Point')
+        self.assertIsNone(gdf.geometry.iloc[2])
+
+    
+    def test_same_srs_skips_reprojection(self):
+        """Test no transformer is built when input and output CRS are equivalent."""
+        self._setup_feature_processing()
+        collector = _make_collector({
+            'layer_types': ['GPU.ZONE_URBA'], 'input_srs': 'EPSG:4326', 'output_srs': 'epsg:4326'
+        })
+        
+        self.assertIsNone(collector._transformer)
+    
+    def test_process_features_reprojects_with_shared_transformer(self):
+        """Test reprojection matches to_crs and reuses one transformer across calls."""
+        self._setup_feature_processing()
+        collector = _make_collector({
+            'layer_types': ['GPU.ZONE_URBA'], 'input_srs': 'EPSG:4326', 'output_srs': 'EPSG:2154'
+        })
+        transformer = collector._transformer
+        features = {'features': [
+            {'type': 'Feature', 'properties': {},
+             'geometry': {'type': 'Polygon', 'coordinates': [[[2.3, 48.8], [2.4, 48.8], [2.4, 48.9], [2.3, 48.8]]]}},
+            {'type': 'Feature', 'properties': {}, 'geometry': None}
+        ]}
+        
+        first = collector._process_features(features, 'GPU.ZONE_URBA')
+        second = collector._process_features(features, 'GPU.PRESCRIPTION_SURF')
+        
+        expected = gpd.GeoSeries(
+            [Polygon([(2.3, 48.8), (2.4, 48.8), (2.4, 48.9), (2.3, 48.8)])], crs='EPSG:4326'
+        ).to_crs('EPSG:2154')
+        self.assertIs(collector._transformer, transformer)
+        self.assertEqual(first.crs.to_epsg(), 2154)
+        self.assertTrue(first.geometry.iloc[0].equals_exact(expected.iloc[0], 1e-6))
+        self.assertIsNone(first.geometry.iloc[1])
+        self.assertTrue(second.geometry.iloc[0].equals_exact(expected.iloc[0], 1e-6))
+
+    
+    # Tests for incremental collection based on gpu_timestamp
+    
+    def _setup_incremental(self):
+        """Create a collector whose GCS client stores objects in a dict."""
+        self.collector = _make_collector({
+            'layer_types': ['GPU.ZONE_URBA', 'GPU.INFO_SURF'],
+            'enable_incremental': True,
+            'output_formats': ['geojson'],
+            'filter_options': {'use_bbox': False, 'insee_codes': ['75101']}
+        })
+        self.objects = {}
+        
+        def download_as_bytes(gcs_path):
+            if gcs_path not in self.objects:
+                raise FileNotFoundError(gcs_path)
+            return self.objects[gcs_path]
+        
+        def upload_from_bytes(data, gcs_path, content_type=None, metadata=None):
+            self.objects[gcs_path] = data
+        
+        self.collector.gcs_client.download_as_bytes.side_effect = download_as_bytes
+        self.collector.gcs_client.upload_from_bytes.side_effect = upload_from_bytes
+    
+    def _feature(self):
+        return {'type': 'Feature', 'properties': {'typezone': 'U'},
+                'geometry': {'type': 'Point', 'coordinates': [2.3, 48.85]}}
+    
+    def test_second_run_only_requests_updated_features(self):
+        """Test the watermark of a complete run filters the next run."""
+        self._setup_incremental()
+        filters = []
+        
+        def fetch_queries(layer_type, filters_list):
+            filters.extend(f['cql_filter'] for f in filters_list)
+            return [{'features': [self._feature()]} for _ in filters_list]
+        
+        with patch.object(self.collector, '_fetch_queries', side_effect=fetch_queries), \
+             patch.object(self.collector, '_save_layer_data', return_value=True) as mock_save:
+            first = self.collector.collect()
+            second = self.collector.collect()
+        
+        state = json.loads(self.objects[self.collector.incremental_state_path])
+        watermark = state['layers']['GPU.ZONE_URBA']
+        self.assertFalse(first['layers_summary']['GPU.ZONE_URBA']['incremental'])
+        self.assertTrue(second['layers_summary']['GPU.ZONE_URBA']['incremental'])
+        self.assertEqual(filters[:2], ["INSEE_COM IN ('75101')"] * 2)
+        self.assertEqual(filters[2], f"INSEE_COM IN ('75101') AND (gpu_timestamp AFTER {watermark})")
+        self.assertEqual([c.kwargs['changes_only'] for c in mock_save.call_args_list], [False, False, True, True])
+    
+    def test_failed_layer_keeps_previous_watermark(self):
+        """Test a layer whose fetch failed is fully covered by the next run."""
+        self._setup_incremental()
+        def fetch_queries(layer_type, filters_list):
+            return [None if layer_type == 'GPU.INFO_SURF' else {'features': []} for _ in filters_list]
+        
+        with patch.object(self.collector, '_fetch_queries', side_effect=fetch_queries):
+            self.collector.collect()
+        
+        state = json.loads(self.objects[self.collector.incremental_state_path])
+        self.assertEqual(list(state['layers']), ['GPU.ZONE_URBA'])
+    
+    def test_changed_filters_ignore_previous_state(self):
+        """Test state recorded for other INSEE codes is not used."""
+        self._setup_incremental()
+        self.collector._save_incremental_state({'GPU.ZONE_URBA': '2024-01-01T00:00:00Z'})
+        self.collector.insee_codes = ['69001']
+        
+        self.assertEqual(self.collector._load_incremental_state(), {})
+    
+    def test_bbox_moves_into_cql_when_combined(self):
+        """Test a bbox combined with a CQL filter is expressed in CQL."""
+        self._setup_incremental()
+        bbox = {'min_x': 2.2, 'min_y': 48.8, 'max_x': 2.4, 'max_y': 48.9, 'srs': 'CRS:84'}
+        
+        url = self.collector._build_wfs_url(
+            'GPU.ZONE_URBA', bbox_filter=bbox, cql_filter='gpu_timestamp AFTER 2024-01-01T00:00:00Z'
+        )
+        
+        params = parse_qs(urlparse(url).query)
+        self.assertNotIn('bbox', params)
+        self.assertEqual(
+            params['cql_filter'],
+            ["BBOX(the_geom,2.2,48.8,2.4,48.9,'CRS:84') AND (gpu_timestamp AFTER 2024-01-01T00:00:00Z)"]
+        )
+
+    
+    # Tests for converting GML responses to feature collections
+    
+    WFS2_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<wfs:FeatureCollection xmlns:wfs="http://www.opengis.net/wfs/2.0"
+    xmlns:gml="http://www.opengis.net/gml/3.2" xmlns:gpu="http://gpu"
+    numberMatched="12" numberReturned="2">
+  <wfs:member>
+    <gpu:zone_urba gml:id="zone_urba.1">
+      <gml:boundedBy><gml:Envelope><gml:lowerCorner>0 0</gml:lowerCorner></gml:Envelope></gml:boundedBy>
+      <gpu:the_geom>
+        <gml:Polygon srsName="EPSG:2154">
+          <gml:exterior><gml:LinearRing><gml:posList>0 0 10 0 10 10 0 0</gml:posList></gml:LinearRing></gml:exterior>
+          <gml:interior><gml:LinearRing><gml:posList>1 1 2 1 2 2 1 1</gml:posList></gml:LinearRing></gml:interior>
+        </gml:Polygon>
+      </gpu:the_geom>
+      <gpu:typezone>U</gpu:typezone>
+      <gpu:libelle/>
+    </gpu:zone_urba>
+  </wfs:member>
+  <wfs:member>
+    <gpu:zone_urba gml:id="zone_urba.2">
+      <gpu:the_geom>
+        <gml:MultiSurface>
+          <gml:surfaceMember><gml:Polygon><gml:exterior><gml:LinearRing>
+            <gml:posList>0 0 1 0 1 1 0 0</gml:posList>
+          </gml:LinearRing></gml:exterior></gml:Polygon></gml:surfaceMember>
+          <gml:surfaceMember><gml:Polygon><gml:exterior><gml:LinearRing>
+            <gml:posList>5 5 6 5 6 6 5 5</gml:posList>
+          </gml:LinearRing></gml:exterior></gml:Polygon></gml:surfaceMember>
+        </gml:MultiSurface>
+      </gpu:the_geom>
+      <gpu:typezone>N</gpu:typezone>
+    </gpu:zone_urba>
+  </wfs:member>
+</wfs:FeatureCollection>"""
+    
+    def _setup_gml(self):
+        """Create a collector."""
+        self.collector = _make_collector({'layer_types': ['GPU.ZONE_URBA']})
+    
+    def test_parse_wfs2_response(self):
+        """Test WFS 2.0 members are converted with ids, properties, geometries and numberMatched."""
+        self._setup_gml()
+        result = self.collector._parse_gml_response(self.WFS2_RESPONSE)
+        
+        self.assertEqual(result['numberMatched'], 12)
+        first, second = result['features']
+        self.assertEqual(first['id'], 'zone_urba.1')
+        self.assertEqual(first['properties'], {'typezone': 'U', 'libelle': None})
+        self.assertEqual(first['geometry'], {
+            'type': 'Polygon',
+            'coordinates': [[[0, 0], [10, 0], [10, 10], [0, 0]], [[1, 1], [2, 1], [2, 2], [1, 1]]]
+        })
+        self.assertEqual(second['geometry']['type'], 'MultiPolygon')
+        self.assertEqual(len(second['geometry']['coordinates']), 2)
+        self.assertEqual(second['geometry']['coordinates'][1], [[[5, 5], [6, 5], [6, 6], [5, 5]]])
+    
+    def test_parse_gml_feature_member_points(self):
+        """Test WFS 1.x gml:featureMember responses and text input are supported."""
+        self._setup_gml()
+        gml = """<wfs:FeatureCollection xmlns:wfs="http://www.opengis.net/wfs"
+            xmlns:gml="http://www.opengis.net/gml" xmlns:gpu="http://gpu">
+          <gml:featureMember>
+            <gpu:info_pct gml:id="info_pct.7">
+              <gpu:the_geom><gml:Point><gml:pos>652000.5 6862000</gml:pos></gml:Point></gpu:the_geom>
+              <gpu:libelle>Élément de patrimoine</gpu:libelle>
+            </gpu:info_pct>
+          </gml:featureMember>
+        </wfs:FeatureCollection>"""
+        
+        result = self.collector._parse_gml_response(gml)
+        
+        self.assertNotIn('numberMatched', result)
+        (feature,) = result['features']
+        self.assertEqual(feature['geometry'], {'type': 'Point', 'coordinates': [652000.5, 6862000.0]})
+        self.assertEqual(feature['properties']['libelle'], 'Élément de patrimoine')
+    
+    def test_parse_gml_invalid_document(self):
+        """Test malformed XML is reported as a failure."""
+        self._setup_gml()
+        self.assertIsNone(self.collector._parse_gml_response(b'<wfs:FeatureCollection><unclosed>'))
+    
+    def test_parsed_features_build_geodataframe(self):
+        """Test parsed GML features go through the regular feature processing."""
+        self._setup_gml()
+        self.collector.validate_geometry = False
+        
+        gdf = self.collector._process_features(
+            self.collector._parse_gml_response(self.WFS2_RESPONSE), 'GPU.ZONE_URBA'
+        )
+        
+        self.assertEqual(list(gdf.geometry.geom_type), ['Polygon', 'MultiPolygon'])
+        self.assertAlmostEqual(gdf.geometry.iloc[0].area, 49.5)
+
+    
+    # Tests for the streaming GeoJSON writer
+    
+    def _setup_geojson_writer(self):
+        """Create a collector and a two-feature Lambert-93 GeoDataFrame."""
+        self.collector = _make_collector({'layer_types': ['GPU.ZONE_URBA']})
+        self.gdf = gpd.GeoDataFrame(
+            {'typezone': ['U', None], 'surface': [1.5, float('nan')]},
+            geometry=[Point(650000, 6860000), None],
+            crs='EPSG:2154'
+        )
+    
+    def _save(self, filename, **kwargs):
+        """Save self.gdf and return the uploaded GCS path and file content."""
+        uploaded = {}
+        
+        def upload(data, gcs_path, content_type=None):
+            uploaded[gcs_path] = data
+            return True
+        
+        with patch.object(self.collector, 'upload_bytes_to_gcs', side_effect=upload):
+            self.assertTrue(self.collector._save_as_geojson(self.gdf, filename, **kwargs))
+        
+        (gcs_path, content), = uploaded.items()
+        return gcs_path, content
+    
+    def test_save_as_geojson_writes_feature_collection(self):
+        """Test the FeatureCollection round-trips through geopandas with its CRS."""
+        self._setup_geojson_writer()
+        gcs_path, content = self._save('zone_urba.geojson')
+        
+        document = json.loads(content)
+        self.assertTrue(gcs_path.endswith('/zone_urba.geojson'))
+        self.assertEqual(document['crs']['properties']['name'], 'urn:ogc:def:crs:EPSG::2154')
+        self.assertEqual(document['features'][0]['geometry'], {'type': 'Point', 'coordinates': [650000.0, 6860000.0]})
+        # Missing values and NaN become null
+        self.assertEqual(document['features'][1], {'type': 'Feature', 'properties': {'typezone': None, 'surface': None}, 'geometry': None})
+    
+    def test_save_as_geojsonseq_writes_one_feature_per_line(self):
+        """Test line-delimited output has one Feature object per line."""
+        self._setup_geojson_writer()
+        _, content = self._save('zone_urba.geojsonl', line_delimited=True)
+        
+        features = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(features), 2)
+        self.assertEqual(features[0]['properties'], {'typezone': 'U', 'surface': 1.5})
+    
+    def test_save_as_geojson_upload_failure(self):
+        """Test a failed in-memory upload is reported."""
+        self._setup_geojson_writer()
+        self.collector.gcs_client.upload_from_bytes.side_effect = RuntimeError("503 Service Unavailable")
+        
+        self.assertFalse(self.collector._save_as_geojson(self.gdf, 'zone_urba.geojson'))
+        self.assertEqual(
+            self.collector.gcs_client.upload_from_bytes.call_args.kwargs['content_type'],
+            'application/geo+json'
+        )
+    
+    def test_save_layer_data_geojsonseq_format(self):
+        """Test the geojsonseq output format writes a .geojsonl file."""
+        self._setup_geojson_writer()
+        with patch.object(self.collector, '_save_as_geojson', return_value=True) as mock_save:
+            self.assertTrue(self.collector._save_layer_data(self.gdf, 'GPU.ZONE_URBA', 'geojsonseq'))
+        
+        filename = mock_save.call_args.args[1]
+        self.assertTrue(filename.startswith('gpu_zone_urba_') and filename.endswith('.geojsonl'))
+        self.assertTrue(mock_save.call_args.kwargs['line_delimited'])
+
+    
+    # Tests for GeoPackage output
+    
+    def _setup_geopackage_writer(self):
+        """Create a collector and a one-feature GeoDataFrame."""
+        self.collector = _make_collector({'layer_types': ['GPU.ZONE_URBA']})
+        self.gdf = gpd.GeoDataFrame(
+            {'typezone': ['U'], 'layer_type': pd.Categorical(['GPU.ZONE_URBA'])},
+            geometry=[Point(650000, 6860000)],
+            crs='EPSG:2154'
+        )
+    
+    def test_save_as_geopackage_writes_named_layer(self):
+        """Test the GeoPackage is written with the requested layer name."""
+        self._setup_geopackage_writer()
+        layers = {}
+        
+        def upload(local_path, gcs_path):
+            layers[gcs_path] = gpd.list_layers(local_path)['name'].tolist()
+            layers['data'] = gpd.read_file(local_path)
+            return True
+        
+        with patch.object(self.collector, 'upload_to_gcs', side_effect=upload):
+            self.assertTrue(self.collector._save_as_geopackage(self.gdf, 'zone.gpkg', layer='gpu_zone_urba'))
+        
+        self.assertEqual(layers[f'{self.collector.raw_path}/zone.gpkg'], ['gpu_zone_urba'])
+        # Categorical columns are written as plain text
+        self.assertEqual(list(layers['data']['layer_type']), ['GPU.ZONE_URBA'])
+        self.assertEqual(layers['data'].crs.to_epsg(), 2154)
+        self.assertEqual(list(layers['data']['typezone']), ['U'])
+    
+    def test_save_as_geopackage_without_pyogrio(self):
+        """Test GeoDataFrame.to_file is used when pyogrio is unavailable."""
+        self._setup_geopackage_writer()
+        with patch('collectors.plu.plu_collector.pyogrio', None), \
+             patch.object(gpd.GeoDataFrame, 'to_file') as mock_to_file, \
+             patch.object(self.collector, 'upload_to_gcs', return_value=True):
+            self.assertTrue(self.collector._save_as_geopackage(self.gdf, 'gpu_zone_urba_20240101.gpkg'))
+        
+        self.assertEqual(mock_to_file.call_args.kwargs, {'driver': 'GPKG', 'layer': 'gpu_zone_urba_20240101'})
 
 
 class TestPLUCollectorIntegration(unittest.TestCase):
@@ -512,13 +1381,12 @@ class TestPLUCollectorIntegration(unittest.TestCase):
             'features': {'enable_idempotency_check': False}
         }
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_collector_full_run_success(self, mock_logging, mock_gcs, mock_config):
         """Test complete collector run with success."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -541,13 +1409,12 @@ class TestPLUCollectorIntegration(unittest.TestCase):
             mock_collect.assert_called_once()
             mock_save_metadata.assert_called_once()
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_cloud_function_entry_point_success(self, mock_logging, mock_gcs, mock_config):
         """Test Cloud Function entry point with success."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -567,13 +1434,12 @@ class TestPLUCollectorIntegration(unittest.TestCase):
             body = json.loads(result['body'])
             self.assertEqual(body['status'], 'completed')
     
-    @patch('collectors.plu.plu_collector.get_config')
-    @patch('collectors.plu.plu_collector.get_gcs_client')
+    @patch('collectors.base_collector.get_config')
+    @patch('collectors.base_collector.get_gcs_client')
     @patch('utils.utils.setup_logging')
     def test_cloud_function_entry_point_error(self, mock_logging, mock_gcs, mock_config):
         """Test Cloud Function entry point with error."""
-        mock_config.return_value = Mock()
-        mock_config.return_value.get.side_effect = lambda key, default=None: self.mock_config.get(key.replace('.', '_'), {}).get(key.split('.')[-1], default) if '.' in key else self.mock_config.get(key, default)
+        mock_config.return_value = _dotted_config(self.mock_config)
         mock_gcs.return_value = Mock()
         mock_logging.return_value = Mock()
         
@@ -595,4 +1461,4 @@ class TestPLUCollectorIntegration(unittest.TestCase):
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
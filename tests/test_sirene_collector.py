@@ -7,10 +7,14 @@ Author: Claude Code Assistant
 Created: 2025-06-25
 """
 
+import io
 import json
 import os
 import tempfile
+import threading
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
@@ -107,6 +111,32 @@ class TestSireneCollector:
             assert result['files_processed'] == 1
             assert result['successful_downloads'] == 1
     
+    def test_save_metadata_skips_unchanged_collect_result(self, sirene_collector):
+        """测试两次内容相同的收集结果只更新last_run_touch.txt"""
+        gcs_client = sirene_collector.gcs_client
+        gcs_client.download_as_bytes.side_effect = Exception("not found")
+        files = [{'filename': 'test1.zip', 'date': datetime(2024, 6, 1)}]
+        
+        with patch.dict('collectors.base_collector._METADATA_SIG_CACHE', clear=True), \
+             patch.object(sirene_collector, '_get_available_files', return_value=files), \
+             patch.object(sirene_collector, '_filter_files_to_download', return_value=files), \
+             patch.object(sirene_collector, '_download_file', return_value={
+                 'filename': 'test1.zip', 'status': 'skipped', 'reason': 'not_modified'
+             }):
+            first = sirene_collector.collect()
+            sirene_collector.save_metadata(first)
+            gcs_client.upload_from_bytes.reset_mock()
+            
+            second = sirene_collector.collect()
+            run_time = datetime(2024, 6, 2, tzinfo=timezone.utc)
+            sirene_collector.save_metadata(second, run_time)
+        
+        gcs_client.upload_from_bytes.assert_called_once_with(
+            b'2024-06-02T00:00:00+00:00',
+            'metadata/sirene/last_run_touch.txt',
+            content_type='text/plain'
+        )
+    
     def test_collect_partial_failure(self, sirene_collector):
         """测试部分失败的数据收集"""
         with patch.object(sirene_collector, '_get_available_files') as mock_get_files, \
@@ -134,9 +164,32 @@ class TestSireneCollector:
             assert result['successful_downloads'] == 1
             assert result['failed_downloads'] == 1
     
+    def test_collect_downloads_files_concurrently(self, sirene_collector):
+        """测试文件并发下载，结果按文件顺序返回"""
+        files = [{'filename': f'test{i}.zip'} for i in range(3)]
+        barrier = threading.Barrier(len(files), timeout=5)
+        
+        def download(file_info):
+            # 三个下载必须同时在途才能通过屏障
+            barrier.wait()
+            if file_info['filename'] == 'test1.zip':
+                raise RuntimeError('boom')
+            return {'filename': file_info['filename'], 'status': 'success'}
+        
+        with patch.object(sirene_collector, '_get_available_files', return_value=files), \
+             patch.object(sirene_collector, '_filter_files_to_download', return_value=files), \
+             patch.object(sirene_collector, '_download_file', side_effect=download):
+            
+            result = sirene_collector.collect()
+        
+        assert [r['filename'] for r in result['details']] == ['test0.zip', 'test1.zip', 'test2.zip']
+        assert result['successful_downloads'] == 2
+        assert result['failed_downloads'] == 1
+        assert result['details'][1]['error'] == 'boom'
+    
     def test_get_available_files_success(self, sirene_collector, sample_html_response):
         """测试成功获取可用文件列表"""
-        with patch('requests.get') as mock_get:
+        with patch.object(sirene_collector.http_session, 'get') as mock_get:
             mock_response = Mock()
             mock_response.content = sample_html_response.encode('utf-8')
             mock_response.raise_for_status.return_value = None
@@ -154,7 +207,7 @@ class TestSireneCollector:
     
     def test_get_available_files_network_error(self, sirene_collector):
         """测试网络错误时获取文件列表"""
-        with patch('requests.get') as mock_get:
+        with patch.object(sirene_collector.http_session, 'get') as mock_get:
             mock_get.side_effect = requests.RequestException("Connection error")
             
             with pytest.raises(NetworkError):
@@ -202,6 +255,11 @@ class TestSireneCollector:
         assert info['category'] == 'historical'
         assert info['is_required'] is False
     
+    def test_parse_file_info_invalid(self, sirene_collector):
+        """测试无法解析的文件名"""
+        assert sirene_collector._parse_file_info('StockEtablissement_utf8.zip') is None
+        assert sirene_collector._parse_file_info('2024-13-01-StockEtablissement_utf8.zip') is None
+    
     def test_categorize_file(self, sirene_collector):
         """测试文件分类"""
         test_cases = [
@@ -282,75 +340,333 @@ class TestSireneCollector:
             'category': 'stock',
             'date': datetime.now()
         }
+        sirene_collector.gcs_client.get_blob.return_value = None
         
-        with patch('collectors.sirene.sirene_collector.file_exists_in_gcs') as mock_exists, \
-             patch('collectors.sirene.sirene_collector.download_file_with_retry') as mock_download, \
-             patch('collectors.sirene.sirene_collector.upload_to_gcs') as mock_upload, \
-             patch.object(sirene_collector, '_validate_zip_file') as mock_validate, \
-             patch.object(sirene_collector, '_get_remote_file_metadata') as mock_metadata, \
-             patch('pathlib.Path.unlink') as mock_unlink, \
-             patch('pathlib.Path.exists') as mock_exists_path, \
-             patch('pathlib.Path.stat') as mock_stat:
-            
-            mock_exists.return_value = False
-            mock_exists_path.return_value = True
-            mock_stat.return_value = Mock(st_size=1000)
+        with patch.object(sirene_collector, '_stream_to_gcs') as mock_stream:
+            mock_stream.return_value = 1000
             
             result = sirene_collector._download_file(file_info)
             
             assert result['status'] == 'success'
             assert result['filename'] == 'test.zip'
-            mock_download.assert_called_once()
-            mock_upload.assert_called_once()
-            mock_validate.assert_called_once()
+            assert result['file_size'] == 1000
+            # 新对象没有校验信息，发起普通GET
+            url, gcs_path, validators, metadata = mock_stream.call_args.args
+            assert gcs_path == 'raw/sirene/2024/test.zip'
+            assert validators == {}
+            assert metadata['file_type'] == 'StockEtablissement'
     
     def test_download_file_skip_existing(self, sirene_collector):
-        """测试跳过已存在的文件"""
+        """测试跳过已存在的文件（没有校验信息的旧对象按大小比较）"""
         file_info = {
             'filename': 'test.zip',
             'url': 'https://example.com/test.zip',
             'year': 2024
         }
+        sirene_collector.gcs_client.get_blob.return_value = Mock(size=1000, metadata=None)
         
-        with patch('collectors.sirene.sirene_collector.file_exists_in_gcs') as mock_exists, \
-             patch('collectors.sirene.sirene_collector.get_file_metadata') as mock_local_meta, \
-             patch.object(sirene_collector, '_get_remote_file_metadata') as mock_remote_meta:
+        with patch.object(sirene_collector, '_get_remote_file_metadata') as mock_remote_meta, \
+             patch.object(sirene_collector, '_stream_to_gcs') as mock_fetch:
             
-            mock_exists.return_value = True
-            mock_local_meta.return_value = {'size': 1000}
             mock_remote_meta.return_value = {'size': 1000}
             
             result = sirene_collector._download_file(file_info)
             
             assert result['status'] == 'skipped'
             assert result['reason'] == 'file_exists_same_size'
+            mock_fetch.assert_not_called()
+    
+    def test_download_file_not_modified(self, sirene_collector):
+        """测试源站返回304时跳过下载"""
+        file_info = {
+            'filename': 'test.zip',
+            'url': 'https://example.com/test.zip',
+            'year': 2024,
+            'file_type': 'StockEtablissement',
+            'category': 'stock',
+            'date': datetime.now()
+        }
+        sirene_collector.gcs_client.get_blob.return_value = Mock(
+            size=1000,
+            metadata={'source_etag': '"abc"', 'source_last_modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+        )
+        
+        with patch.object(sirene_collector.http_session, 'get') as mock_get, \
+             patch.object(sirene_collector, '_get_remote_file_metadata') as mock_remote_meta, \
+             patch.object(sirene_collector.gcs_client, 'upload_from_stream') as mock_upload:
+            
+            mock_get.return_value.__enter__.return_value = Mock(status_code=304)
+            
+            result = sirene_collector._download_file(file_info)
+            
+            assert result['status'] == 'skipped'
+            assert result['reason'] == 'not_modified'
+            # 条件请求只探测首字节，未修改时不会下载响应体
+            mock_get.assert_called_once()
+            assert mock_get.call_args.kwargs['headers'] == {
+                'If-None-Match': '"abc"',
+                'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+                'Accept-Encoding': 'identity',
+                'Range': 'bytes=0-0'
+            }
+            # 有校验信息时不再发HEAD请求
+            mock_remote_meta.assert_not_called()
+            mock_upload.assert_not_called()
     
     def test_download_file_failure(self, sirene_collector):
         """测试文件下载失败"""
         file_info = {
             'filename': 'test.zip',
             'url': 'https://example.com/test.zip',
-            'year': 2024
+            'year': 2024,
+            'file_type': 'StockEtablissement',
+            'category': 'stock',
+            'date': datetime.now()
         }
+        sirene_collector.gcs_client.get_blob.return_value = None
         
-        with patch('collectors.sirene.sirene_collector.file_exists_in_gcs') as mock_exists, \
-             patch('collectors.sirene.sirene_collector.download_file_with_retry') as mock_download:
-            
-            mock_exists.return_value = False
-            mock_download.side_effect = Exception("Download failed")
+        with patch.object(sirene_collector, '_stream_to_gcs') as mock_stream:
+            mock_stream.side_effect = Exception("Download failed")
             
             result = sirene_collector._download_file(file_info)
             
             assert result['status'] == 'failed'
             assert 'Download failed' in result['error']
     
+    @staticmethod
+    def _zip_bytes(members):
+        """构建内存中的ZIP文件"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zf:
+            for name, data in members.items():
+                zf.writestr(name, data)
+        return buffer.getvalue()
+    
+    def _stream_response(self, sirene_collector, body, headers):
+        """模拟流式响应，并把上传的字节收集起来"""
+        response = Mock(status_code=200, headers=headers)
+        response.raw = io.BytesIO(body)
+        uploaded = {}
+        
+        def upload_from_stream(stream, gcs_path, size=None, **kwargs):
+            # 与可续传上传一样按块读取，读满size即结束
+            chunks = []
+            while True:
+                chunk = stream.read(64 * 1024)
+                chunks.append(chunk)
+                if not chunk or (size is not None and stream.tell() >= size):
+                    break
+            uploaded[gcs_path] = (b''.join(chunks), kwargs)
+        
+        sirene_collector.gcs_client.upload_from_stream.side_effect = upload_from_stream
+        return response, uploaded
+    
+    def test_stream_to_gcs_uploads_zip(self, sirene_collector):
+        """测试ZIP直接流式写入GCS，只用末尾字节验证中央目录"""
+        # 大于保留的末尾字节数，验证只能依靠末尾的中央目录
+        body = self._zip_bytes({
+            'StockEtablissement_utf8.csv': os.urandom(3 * 1024 * 1024),
+            'README.txt': b'x'
+        })
+        response, uploaded = self._stream_response(sirene_collector, body, {
+            'content-length': str(len(body)),
+            'ETag': '"abc"'
+        })
+        
+        with patch.object(sirene_collector.http_session, 'get') as mock_get:
+            mock_get.return_value.__enter__.return_value = response
+            
+            size = sirene_collector._stream_to_gcs(
+                'https://example.com/test.zip', 'raw/sirene/2024/test.zip', {}, {'source_url': 'u'}
+            )
+        
+        assert size == len(body)
+        data, kwargs = uploaded['raw/sirene/2024/test.zip']
+        assert data == body
+        assert kwargs['content_type'] == 'application/zip'
+        assert kwargs['metadata'] == {'source_url': 'u', 'source_etag': '"abc"'}
+    
+    def test_stream_to_gcs_rejects_zip_without_csv(self, sirene_collector):
+        """测试不含CSV的ZIP在上传提交前被拒绝"""
+        body = self._zip_bytes({'README.txt': b'x'})
+        response, _ = self._stream_response(sirene_collector, body, {})
+        
+        with patch.object(sirene_collector.http_session, 'get') as mock_get:
+            mock_get.return_value.__enter__.return_value = response
+            
+            with pytest.raises(ValidationError, match='不包含CSV文件'):
+                sirene_collector._stream_to_gcs(
+                    'https://example.com/test.zip', 'raw/sirene/2024/test.zip', {}, {}
+                )
+    
+    def test_stream_to_gcs_rejects_truncated_zip(self, sirene_collector):
+        """测试截断的ZIP在上传提交前被拒绝"""
+        body = self._zip_bytes({'data.csv': b'a,b\n1,2\n'})[:-10]
+        response, _ = self._stream_response(sirene_collector, body, {})
+        
+        with patch.object(sirene_collector.http_session, 'get') as mock_get:
+            mock_get.return_value.__enter__.return_value = response
+            
+            with pytest.raises(ValidationError, match='无效的ZIP文件'):
+                sirene_collector._stream_to_gcs(
+                    'https://example.com/test.zip', 'raw/sirene/2024/test.zip', {}, {}
+                )
+    
+    def test_stream_to_gcs_small_file_after_range_probe(self, sirene_collector):
+        """测试探测得到的文件不大时改为一次完整下载"""
+        body = self._zip_bytes({'data.csv': b'a,b\n1,2\n'})
+        probe = Mock(status_code=206, headers={'Content-Range': f'bytes 0-0/{len(body)}', 'ETag': '"v1"'})
+        response, uploaded = self._stream_response(sirene_collector, body, {
+            'content-length': str(len(body)),
+            'ETag': '"v1"'
+        })
+        
+        with patch.object(sirene_collector.http_session, 'get') as mock_get:
+            mock_get.return_value.__enter__.side_effect = [probe, response]
+            
+            size = sirene_collector._stream_to_gcs(
+                'https://example.com/test.zip', 'raw/sirene/2024/test.zip', {}, {'source_url': 'u'}
+            )
+        
+        assert size == len(body)
+        assert mock_get.call_count == 2
+        assert 'Range' not in (mock_get.call_args.kwargs.get('headers') or {})
+        data, kwargs = uploaded['raw/sirene/2024/test.zip']
+        assert data == body
+        assert kwargs['metadata'] == {'source_url': 'u', 'source_etag': '"v1"'}
+        sirene_collector.gcs_client.compose.assert_not_called()
+    
+    def test_stream_to_gcs_large_file_uses_parallel_ranges(self, sirene_collector):
+        """测试大文件按字节范围并行上传后合并"""
+        body = self._zip_bytes({'StockUniteLegale_utf8.csv': os.urandom(300 * 1024)})
+        source_headers = {'content-length': str(len(body)), 'Accept-Ranges': 'bytes', 'ETag': '"v1"'}
+        sirene_collector.large_file_threshold = 100 * 1024
+        uploaded = {}
+        range_headers = []
+        
+        def get(url, headers=None, **kwargs):
+            response = Mock(headers=dict(source_headers))
+            if headers and 'Range' in headers:
+                range_headers.append(headers)
+                start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+                response.status_code = 206
+                response.headers['Content-Range'] = f'bytes {start}-{end}/{len(body)}'
+                response.raw = io.BytesIO(body[start:end + 1])
+            else:
+                response.status_code = 200
+                response.raw = io.BytesIO(body)
+            context = MagicMock()
+            context.__enter__.return_value = response
+            return context
+        
+        def upload_from_stream(stream, gcs_path, size=None, **kwargs):
+            uploaded[gcs_path] = stream.read(size)
+        
+        sirene_collector.gcs_client.upload_from_stream.side_effect = upload_from_stream
+        
+        with patch('collectors.base_collector._RANGE_PART_SIZE', 128 * 1024), \
+             patch.object(sirene_collector.http_session, 'get', side_effect=get) as mock_get:
+            size = sirene_collector._stream_to_gcs(
+                'https://example.com/test.zip', 'raw/sirene/2024/test.zip', {}, {'source_url': 'u'}
+            )
+        
+        assert size == len(body)
+        part_paths = sorted(uploaded)
+        assert len(part_paths) == 3
+        assert b''.join(uploaded[path] for path in part_paths) == body
+        # 只有单字节探测和分段请求，不会发起完整下载
+        probe, *part_headers = range_headers
+        assert mock_get.call_count == 4
+        assert probe['Range'] == 'bytes=0-0'
+        assert all(h['If-Range'] == '"v1"' and h['Accept-Encoding'] == 'identity' for h in part_headers)
+        
+        sirene_collector.gcs_client.compose.assert_called_once()
+        args, kwargs = sirene_collector.gcs_client.compose.call_args
+        assert args == (part_paths, 'raw/sirene/2024/test.zip')
+        assert kwargs['metadata'] == {'source_url': 'u', 'source_etag': '"v1"'}
+        sirene_collector.gcs_client.delete_files.assert_called_once_with(part_paths)
+    
+    def test_stream_to_gcs_rejects_transport_encoded_part(self, sirene_collector):
+        """测试源站对某一段做了传输压缩时不合并，已有对象保持不变"""
+        body = self._zip_bytes({'StockUniteLegale_utf8.csv': os.urandom(300 * 1024)})
+        sirene_collector.large_file_threshold = 100 * 1024
+        
+        def get(url, headers=None, **kwargs):
+            start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+            response = Mock(status_code=206, headers={'Content-Range': f'bytes {start}-{end}/{len(body)}'})
+            if start == 128 * 1024:
+                response.headers['Content-Encoding'] = 'gzip'
+            response.raw = io.BytesIO(body[start:end + 1])
+            context = MagicMock()
+            context.__enter__.return_value = response
+            return context
+        
+        with patch('collectors.base_collector._RANGE_PART_SIZE', 128 * 1024), \
+             patch.object(sirene_collector.http_session, 'get', side_effect=get), \
+             pytest.raises(NetworkError):
+            sirene_collector._stream_to_gcs('https://example.com/test.zip', 'raw/sirene/2024/test.zip', {}, {})
+        
+        sirene_collector.gcs_client.compose.assert_not_called()
+        sirene_collector.gcs_client.delete_files.assert_called_once()
+    
+    def test_stream_to_gcs_shares_transfer_limit(self, sirene_collector):
+        """测试并发文件的探测、分段请求共享同一个传输并发上限"""
+        body = self._zip_bytes({'StockUniteLegale_utf8.csv': os.urandom(300 * 1024)})
+        sirene_collector.large_file_threshold = 100 * 1024
+        sirene_collector._transfer_slots = threading.BoundedSemaphore(2)
+        lock = threading.Lock()
+        active = []
+        peak = []
+        
+        def get(url, headers=None, **kwargs):
+            start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+            response = Mock(status_code=206, headers={
+                'content-length': str(end - start + 1),
+                'Content-Range': f'bytes {start}-{end}/{len(body)}'
+            })
+            response.raw = io.BytesIO(body[start:end + 1])
+            
+            def enter():
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.01)
+                return response
+            
+            def exit_(*args):
+                with lock:
+                    active.pop()
+            
+            context = MagicMock()
+            context.__enter__.side_effect = enter
+            context.__exit__.side_effect = exit_
+            return context
+        
+        sirene_collector.gcs_client.upload_from_stream.side_effect = (
+            lambda stream, gcs_path, size=None, **kwargs: stream.read(size)
+        )
+        
+        with patch('collectors.base_collector._RANGE_PART_SIZE', 64 * 1024), \
+             patch.object(sirene_collector.http_session, 'get', side_effect=get), \
+             ThreadPoolExecutor(max_workers=4) as executor:
+            sizes = list(executor.map(
+                lambda i: sirene_collector._stream_to_gcs(
+                    f'https://example.com/test{i}.zip', f'raw/sirene/2024/test{i}.zip', {}, {}
+                ),
+                range(4)
+            ))
+        
+        assert sizes == [len(body)] * 4
+        assert max(peak) <= 2
+    
     def test_get_remote_file_metadata_success(self, sirene_collector):
         """测试成功获取远程文件元数据"""
-        with patch('requests.head') as mock_head:
+        with patch.object(sirene_collector.http_session, 'head') as mock_head:
             mock_response = Mock()
             mock_response.headers = {
                 'content-length': '1000',
                 'last-modified': 'Mon, 01 Jan 2024 00:00:00 GMT',
+                'etag': '"abc"',
                 'content-type': 'application/zip'
             }
             mock_response.raise_for_status.return_value = None
@@ -360,11 +676,12 @@ class TestSireneCollector:
             
             assert metadata['size'] == 1000
             assert metadata['last_modified'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+            assert metadata['etag'] == '"abc"'
             assert metadata['content_type'] == 'application/zip'
     
     def test_get_remote_file_metadata_failure(self, sirene_collector):
         """测试获取远程文件元数据失败"""
-        with patch('requests.head') as mock_head:
+        with patch.object(sirene_collector.http_session, 'head') as mock_head:
             mock_head.side_effect = requests.RequestException("Request failed")
             
             metadata = sirene_collector._get_remote_file_metadata('https://example.com/test.zip')
@@ -1,14 +1,18 @@
 """Unit tests for core utility functions."""
 
 import unittest
-from unittest.mock import Mock, patch, mock_open, MagicMock
+from unittest.mock import Mock, patch, MagicMock
 import os
 import tempfile
 import json
 import hashlib
 import base64
+import io
 from pathlib import Path
 
+import aiohttp
+from aiohttp import web
+
 import pytest
 import requests
 from google.cloud import storage
@@ -16,17 +20,25 @@ from google.cloud.exceptions import NotFound, Forbidden
 
 from utils.utils import (
     setup_logging,
+    build_http_session,
     download_file_with_retry,
+    download_file_async,
     upload_to_gcs,
     file_exists_in_gcs,
     get_file_metadata,
     validate_environment,
+    dumps_json,
+    loads_json,
+    extract_json_field,
+    compute_crc32c,
+    save_stream,
     FranceDataError,
     NetworkError,
     StorageError,
     ConfigurationError,
     ValidationError,
-    _compare_files_gcs
+    _compare_files_gcs,
+    _DOWNLOAD_CRC32C
 )
 
 
@@ -67,6 +79,18 @@ class TestSetupLogging(unittest.TestCase):
         # Should not raise exception
         logger = setup_logging("test.logger")
         self.assertEqual(logger.name, "test.logger")
+    
+    @patch('utils.utils._cloud_logging_configured', False)
+    @patch('utils.utils.cloud_logging.Client')
+    def test_setup_logging_configured_once(self, mock_cloud_client):
+        """Test handlers and cloud logging are set up once per process."""
+        first = setup_logging("test.logger.first")
+        second = setup_logging("test.logger.second")
+        setup_logging("test.logger.first")
+        
+        mock_cloud_client.assert_called_once()
+        self.assertEqual(len(first.handlers), 1)
+        self.assertIs(first.handlers[0], second.handlers[0])
 
 
 class TestDownloadFileWithRetry(unittest.TestCase):
@@ -78,7 +102,7 @@ class TestDownloadFileWithRetry(unittest.TestCase):
         # Mock successful response
         mock_response = Mock()
         mock_response.headers = {'content-length': '12'}  # Match actual content length
-        mock_response.iter_content.return_value = [b'test', b'data', b'here']
+        mock_response.raw = io.BytesIO(b'testdatahere')
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -110,7 +134,7 @@ class TestDownloadFileWithRetry(unittest.TestCase):
         """Test file size validation error."""
         mock_response = Mock()
         mock_response.headers = {'content-length': '20'}  # Expected 20 bytes
-        mock_response.iter_content.return_value = [b'short']  # Only 5 bytes
+        mock_response.raw = io.BytesIO(b'short')  # Only 5 bytes
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -128,7 +152,7 @@ class TestDownloadFileWithRetry(unittest.TestCase):
         """Test download with custom headers."""
         mock_response = Mock()
         mock_response.headers = {}
-        mock_response.iter_content.return_value = [b'data']
+        mock_response.raw = io.BytesIO(b'data')
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -149,6 +173,101 @@ class TestDownloadFileWithRetry(unittest.TestCase):
                 timeout=300,
                 headers=headers
             )
+    
+    @patch('requests.get')
+    def test_download_records_crc32c(self, mock_get):
+        """Test the checksum taken while downloading is reused for the file."""
+        mock_response = Mock()
+        mock_response.headers = {'content-length': '9'}
+        mock_response.raw = io.BytesIO(b'123456789')
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            local_path = os.path.join(tmpdir, "test.txt")
+            
+            download_file_with_retry("http://example.com/file", local_path)
+            
+            expected = base64.b64encode(bytes.fromhex('e3069283')).decode()
+            with patch('utils.utils.google_crc32c.Checksum') as mock_checksum:
+                self.assertEqual(compute_crc32c(local_path), expected)
+            mock_checksum.assert_not_called()
+    
+    def test_download_with_session(self):
+        """Test download reuses the given session."""
+        session = build_http_session()
+        mock_response = Mock()
+        mock_response.headers = {'content-length': '12'}
+        mock_response.raw = io.BytesIO(b"test content")
+        mock_response.raise_for_status.return_value = None
+        
+        with patch.object(session, 'get', return_value=mock_response) as mock_session_get, \
+             patch('requests.get') as mock_get, \
+             tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "test_file.txt")
+            
+            result = download_file_with_retry("http://example.com/file", local_path, session=session)
+            
+            self.assertTrue(result)
+            mock_session_get.assert_called_once()
+            mock_get.assert_not_called()
+
+
+class TestDownloadFileAsync(unittest.IsolatedAsyncioTestCase):
+    """Test cases for download_file_async function."""
+    
+    async def asyncSetUp(self):
+        """Start a local HTTP server serving a test payload."""
+        self.payload = b"test content" * 1000
+        
+        async def handle_file(request):
+            return web.Response(body=self.payload)
+        
+        async def handle_missing(request):
+            return web.Response(status=404)
+        
+        app = web.Application()
+        app.router.add_get('/file', handle_file)
+        app.router.add_get('/missing', handle_missing)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+    
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+    
+    async def test_successful_download(self):
+        """Test successful asynchronous file download."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "test_file.txt")
+            
+            result = await download_file_async(f"{self.base_url}/file", local_path, chunk_size=1024)
+            
+            self.assertTrue(result)
+            with open(local_path, 'rb') as f:
+                self.assertEqual(f.read(), self.payload)
+    
+    async def test_download_with_shared_session(self):
+        """Test several downloads through one client session."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            async with aiohttp.ClientSession() as session:
+                for name in ("a.txt", "b.txt"):
+                    local_path = os.path.join(temp_dir, name)
+                    result = await download_file_async(f"{self.base_url}/file", local_path, session=session)
+                    self.assertTrue(result)
+                
+                self.assertFalse(session.closed)
+    
+    async def test_http_error(self):
+        """Test HTTP errors are raised as NetworkError."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "test_file.txt")
+            
+            with self.assertRaises(NetworkError):
+                await download_file_async(f"{self.base_url}/missing", local_path, max_attempts=1)
 
 
 class TestGCSOperations(unittest.TestCase):
@@ -182,6 +301,22 @@ class TestGCSOperations(unittest.TestCase):
         finally:
             os.unlink(temp_path)
     
+    def test_upload_to_gcs_releases_recorded_crc32c(self):
+        """Test the checksum recorded at download time is used once and then dropped."""
+        mock_bucket = Mock()
+        mock_blob = Mock()
+        mock_bucket.blob.return_value = mock_blob
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            local_path = os.path.join(tmpdir, "test.txt")
+            save_stream(io.BytesIO(b'123456789'), local_path)
+            self.assertIn(local_path, _DOWNLOAD_CRC32C)
+            
+            upload_to_gcs(local_path, "test/path.txt", check_existing=False, bucket=mock_bucket)
+        
+        self.assertEqual(mock_blob.crc32c, base64.b64encode(bytes.fromhex('e3069283')).decode())
+        self.assertNotIn(local_path, _DOWNLOAD_CRC32C)
+    
     @patch('utils.utils.get_config')
     @patch('utils.utils.storage.Client')
     def test_upload_to_gcs_file_exists_same_content(self, mock_storage_client, mock_config):
@@ -287,25 +422,35 @@ class TestGCSOperations(unittest.TestCase):
 class TestCompareFilesGCS(unittest.TestCase):
     """Test GCS file comparison functionality."""
     
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'test_content')
+    
+    def tearDown(self):
+        os.remove(self.path)
+    
     def test_compare_files_match(self):
         """Test comparing files that match."""
         mock_blob = Mock()
-        mock_blob.size = 10
-        mock_blob.md5_hash = base64.b64encode(b'test_hash_bytes').decode()
+        mock_blob.size = 12
+        mock_blob.crc32c = compute_crc32c(self.path)
         
-        with patch('os.path.exists') as mock_exists, \
-             patch('os.path.getsize') as mock_getsize, \
-             patch('builtins.open', mock_open(read_data=b'test_content')) as mock_file, \
-             patch('hashlib.md5') as mock_md5:
-            
-            mock_exists.return_value = True
-            mock_getsize.return_value = 10
-            mock_md5.return_value.hexdigest.return_value = 'test_hash_bytes'.encode().hex()
-            
-            matches, reason = _compare_files_gcs(mock_blob, "test/path.txt")
-            
-            self.assertTrue(matches)
-            self.assertEqual(reason, "Files match")
+        matches, reason = _compare_files_gcs(mock_blob, self.path)
+        
+        self.assertTrue(matches)
+        self.assertEqual(reason, "Files match")
+    
+    def test_compare_files_crc32c_mismatch(self):
+        """Test comparing files with different content."""
+        mock_blob = Mock()
+        mock_blob.size = 12
+        mock_blob.crc32c = base64.b64encode(b'\x00\x00\x00\x00').decode()
+        
+        matches, reason = _compare_files_gcs(mock_blob, self.path)
+        
+        self.assertFalse(matches)
+        self.assertIn("CRC32C mismatch", reason)
     
     def test_compare_files_size_mismatch(self):
         """Test comparing files with different sizes."""
@@ -336,6 +481,21 @@ class TestCompareFilesGCS(unittest.TestCase):
             self.assertEqual(reason, "Local file does not exist")
 
 
+class TestComputeCrc32c(unittest.TestCase):
+    """Test cases for compute_crc32c function."""
+    
+    def test_known_value(self):
+        """Test checksum matches the GCS base64 encoding of a known CRC32C."""
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b'123456789')
+        try:
+            # CRC32C check value for '123456789' is 0xE3069283
+            expected = base64.b64encode(bytes.fromhex('e3069283')).decode()
+            self.assertEqual(compute_crc32c(f.name, chunk_size=4), expected)
+        finally:
+            os.remove(f.name)
+
+
 class TestValidateEnvironment(unittest.TestCase):
     """Test environment validation functionality."""
     
@@ -365,6 +525,7 @@ class TestValidateEnvironment(unittest.TestCase):
         self.assertEqual(len(result['errors']), 0)
         self.assertTrue(result['checks']['gcs_bucket_configured'])
         self.assertTrue(result['checks']['gcs_credentials'])
+        self.assertIn('crc32c_c_extension', result['checks'])
     
     @patch('utils.utils.get_config')
     def test_validate_environment_config_error(self, mock_config):
@@ -394,6 +555,72 @@ class TestValidateEnvironment(unittest.TestCase):
         self.assertFalse(result['checks']['gcs_credentials'])
 
 
+class TestDumpsJson(unittest.TestCase):
+    """Test cases for dumps_json function."""
+    
+    def test_compact_utf8_output(self):
+        """Test output is compact UTF-8 encoded JSON."""
+        result = dumps_json({'commune': 'Orléans', 'count': 3})
+        
+        self.assertIsInstance(result, bytes)
+        self.assertEqual(result, '{"commune":"Orléans","count":3}'.encode('utf-8'))
+        self.assertEqual(json.loads(result), {'commune': 'Orléans', 'count': 3})
+    
+    @patch('utils.utils.orjson', None)
+    def test_stdlib_fallback(self):
+        """Test output is identical without orjson."""
+        result = dumps_json({'commune': 'Orléans', 'count': 3})
+        
+        self.assertEqual(result, '{"commune":"Orléans","count":3}'.encode('utf-8'))
+    
+    def test_indent_matches_stdlib(self):
+        """Test indented output matches json.dumps with indent=2."""
+        data = {'commune': 'Orléans', 'files': [1, 2]}
+        expected = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        
+        self.assertEqual(dumps_json(data, indent=True), expected)
+        with patch('utils.utils.orjson', None):
+            self.assertEqual(dumps_json(data, indent=True), expected)
+    
+    def test_round_trip(self):
+        """Test loads_json decodes dumps_json output."""
+        data = {'files': [f'dept_{i}.csv' for i in range(3)], 'status': 'completed'}
+        
+        self.assertEqual(loads_json(dumps_json(data)), data)
+
+
+class TestExtractJsonField(unittest.TestCase):
+    """Test cases for extract_json_field function."""
+    
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'status': 'completed', 'files': ['a', 'b'], 'end_time': '2024-01-01T00:00:00+00:00'}, f)
+    
+    def tearDown(self):
+        os.remove(self.path)
+    
+    def test_extract_field(self):
+        """Test a top-level field is extracted."""
+        self.assertEqual(extract_json_field(self.path, 'end_time'), '2024-01-01T00:00:00+00:00')
+    
+    def test_missing_field(self):
+        """Test a missing field returns None."""
+        self.assertIsNone(extract_json_field(self.path, 'missing'))
+    
+    @patch('utils.utils.ijson', None)
+    def test_fallback_without_ijson(self):
+        """Test extraction without ijson."""
+        self.assertEqual(extract_json_field(self.path, 'files'), ['a', 'b'])
+    
+    def test_extract_field_from_bytes(self):
+        """Test extraction from in-memory content."""
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        
+        self.assertEqual(extract_json_field(data, 'status'), 'completed')
+
+
 class TestCustomExceptions(unittest.TestCase):
     """Test custom exception classes."""
     
@@ -10,11 +10,19 @@ This package provides centralized utility functions for:
 from .utils import (
     # Core utility functions
     setup_logging,
+    build_http_session,
     download_file_with_retry,
+    download_file_async,
     upload_to_gcs,
     file_exists_in_gcs,
     get_file_metadata,
     validate_environment,
+    dumps_json,
+    loads_json,
+    extract_json_field,
+    compute_crc32c,
+    forget_crc32c,
+    save_stream,
     
     # Custom exceptions
     FranceDataError,
@@ -29,11 +37,19 @@ from .gcs_client import GCSClient, get_gcs_client
 __all__ = [
     # Utility functions
     'setup_logging',
+    'build_http_session',
     'download_file_with_retry', 
+    'download_file_async',
     'upload_to_gcs',
     'file_exists_in_gcs',
     'get_file_metadata',
     'validate_environment',
+    'dumps_json',
+    'loads_json',
+    'extract_json_field',
+    'compute_crc32c',
+    'forget_crc32c',
+    'save_stream',
     
     # GCS client
     'GCSClient',
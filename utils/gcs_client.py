@@ -6,13 +6,15 @@ including uploading, downloading, listing files, and managing bucket directories
 
 import os
 import logging
-from typing import List, Optional, Tuple, Generator
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Generator
 from pathlib import Path
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 from google.cloud.exceptions import NotFound, Conflict
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from config.config_loader import get_config
+from utils.utils import compute_crc32c
 
 
 logger = logging.getLogger(__name__)
@@ -110,9 +112,91 @@ class GCSClient:
         if content_type:
             blob.content_type = content_type
         
-        blob.upload_from_filename(local_path)
+        threshold_mb = self.config.get('processing_config.large_file_threshold_mb', 100)
+        if os.path.getsize(local_path) > threshold_mb * 1024 * 1024:
+            # Large files are split into parts uploaded in parallel
+            transfer_manager.upload_chunks_concurrently(
+                local_path,
+                blob,
+                content_type=content_type,
+                worker_type=transfer_manager.THREAD
+            )
+        else:
+            blob.upload_from_filename(local_path)
         logger.info(f"Uploaded {local_path} to gs://{self.bucket_name}/{gcs_path}")
     
+    def upload_many(self, pairs: List[Tuple[str, str]],
+                    max_workers: int = 8) -> List[Optional[Exception]]:
+        """Upload several files concurrently.
+        
+        Args:
+            pairs: List of (local_path, gcs_path) tuples
+            max_workers: Maximum number of concurrent uploads
+            
+        Returns:
+            One entry per pair: None on success, otherwise the raised exception
+        """
+        file_blob_pairs = [
+            (local_path, self.bucket.blob(gcs_path))
+            for local_path, gcs_path in pairs
+        ]
+        results = transfer_manager.upload_many(
+            file_blob_pairs,
+            worker_type=transfer_manager.THREAD,
+            max_workers=max_workers
+        )
+        
+        uploaded = sum(1 for result in results if result is None)
+        logger.info(f"Uploaded {uploaded}/{len(pairs)} files to gs://{self.bucket_name}")
+        return results
+    
+    def upload_from_stream(self, stream: BinaryIO, gcs_path: str,
+                           size: Optional[int] = None,
+                           content_type: Optional[str] = None,
+                           metadata: Optional[Dict[str, str]] = None,
+                           chunk_size: Optional[int] = None) -> None:
+        """Upload content read from a file-like object without a local copy.
+        
+        The stream is consumed once, so retries must reopen it and call this
+        method again.
+        
+        Args:
+            stream: Readable binary stream (e.g. an HTTP response body)
+            gcs_path: Destination path in GCS
+            size: Number of bytes to upload, if known
+            content_type: MIME type of the content
+            metadata: Custom metadata stored with the object
+            chunk_size: Resumable upload chunk size (a multiple of 256 KiB),
+                bounding how much of the stream is buffered at once
+        """
+        blob = self.bucket.blob(gcs_path, chunk_size=chunk_size)
+        if metadata:
+            blob.metadata = metadata
+        blob.upload_from_file(stream, size=size, content_type=content_type, checksum='crc32c')
+        logger.info(f"Streamed upload to gs://{self.bucket_name}/{gcs_path}")
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    def upload_from_bytes(self, data: bytes, gcs_path: str,
+                          content_type: Optional[str] = None,
+                          content_encoding: Optional[str] = None,
+                          metadata: Optional[Dict[str, str]] = None) -> None:
+        """Upload in-memory content to GCS without a local file.
+        
+        Args:
+            data: Content to upload
+            gcs_path: Destination path in GCS
+            content_type: MIME type of the content
+            content_encoding: Content-Encoding of the data (e.g. 'gzip')
+            metadata: Custom metadata stored with the object
+        """
+        blob = self.bucket.blob(gcs_path)
+        if content_encoding:
+            blob.content_encoding = content_encoding
+        if metadata:
+            blob.metadata = metadata
+        blob.upload_from_string(data, content_type=content_type)
+        logger.info(f"Uploaded {len(data)} bytes to gs://{self.bucket_name}/{gcs_path}")
+    
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def download_file(self, gcs_path: str, local_path: str) -> None:
         """Download a file from GCS.
@@ -128,6 +212,18 @@ class GCSClient:
         blob.download_to_filename(local_path)
         logger.info(f"Downloaded gs://{self.bucket_name}/{gcs_path} to {local_path}")
     
+    def download_as_bytes(self, gcs_path: str) -> bytes:
+        """Download a file's content into memory.
+        
+        Args:
+            gcs_path: Path to file in GCS
+            
+        Returns:
+            File content
+        """
+        blob = self.bucket.blob(gcs_path)
+        return blob.download_as_bytes()
+    
     def file_exists(self, gcs_path: str) -> bool:
         """Check if a file exists in GCS.
         
@@ -162,6 +258,17 @@ class GCSClient:
             }
         return None
     
+    def get_blob(self, gcs_path: str) -> Optional[storage.Blob]:
+        """Get a blob with its metadata loaded, without downloading content.
+        
+        Args:
+            gcs_path: Path to file in GCS
+            
+        Returns:
+            Blob or None if file doesn't exist
+        """
+        return self.bucket.get_blob(gcs_path)
+    
     def list_files(self, prefix: str = "", delimiter: Optional[str] = None) -> List[str]:
         """List files in GCS bucket with given prefix.
         
@@ -175,6 +282,31 @@ class GCSClient:
         blobs = self.bucket.list_blobs(prefix=prefix, delimiter=delimiter)
         return [blob.name for blob in blobs if not blob.name.endswith('/')]
     
+    def list_files_metadata(self, prefix: str = "") -> Dict[str, Dict[str, Any]]:
+        """List files under a prefix with their metadata in one paginated call.
+        
+        Args:
+            prefix: Prefix to filter files
+            
+        Returns:
+            Dictionary mapping file path to its size, etag, update time and
+            custom metadata
+        """
+        blobs = self.bucket.list_blobs(
+            prefix=prefix,
+            fields='items(name,size,etag,metadata,updated),nextPageToken'
+        )
+        return {
+            blob.name: {
+                'size': blob.size,
+                'etag': blob.etag,
+                'updated': blob.updated.isoformat() if blob.updated else None,
+                'metadata': blob.metadata or {}
+            }
+            for blob in blobs
+            if not blob.name.endswith('/')
+        }
+    
     def list_directories(self, prefix: str = "") -> List[str]:
         """List directories in GCS bucket with given prefix.
         
@@ -213,6 +345,38 @@ class GCSClient:
             return True
         return False
     
+    def compose(self, source_paths: List[str], gcs_path: str,
+                content_type: Optional[str] = None,
+                metadata: Optional[Dict[str, str]] = None) -> None:
+        """Concatenate existing objects into a new object server-side.
+        
+        Args:
+            source_paths: Paths of the objects to concatenate, in order (at most 32)
+            gcs_path: Destination path in GCS
+            content_type: MIME type of the composed object
+            metadata: Custom metadata stored with the composed object
+        """
+        blob = self.bucket.blob(gcs_path)
+        if content_type:
+            blob.content_type = content_type
+        if metadata:
+            blob.metadata = metadata
+        blob.compose([self.bucket.blob(path) for path in source_paths])
+        logger.info(f"Composed {len(source_paths)} objects into gs://{self.bucket_name}/{gcs_path}")
+    
+    def delete_files(self, gcs_paths: List[str]) -> None:
+        """Delete several files in batched requests, ignoring missing ones.
+        
+        Args:
+            gcs_paths: Paths of the files to delete
+        """
+        # A batch holds at most 1000 calls
+        for start in range(0, len(gcs_paths), 1000):
+            with self.client.batch(raise_exception=False):
+                for gcs_path in gcs_paths[start:start + 1000]:
+                    self.bucket.blob(gcs_path).delete()
+        logger.info(f"Deleted {len(gcs_paths)} files from gs://{self.bucket_name}")
+    
     def copy_file(self, source_path: str, dest_path: str) -> None:
         """Copy a file within GCS.
         
@@ -230,7 +394,7 @@ class GCSClient:
         logger.info(f"Copied gs://{self.bucket_name}/{source_path} to "
                    f"gs://{self.bucket_name}/{dest_path}")
     
-    def stream_download(self, gcs_path: str, chunk_size: int = 8192) -> Generator[bytes, None, None]:
+    def stream_download(self, gcs_path: str, chunk_size: int = 1024 * 1024) -> Generator[bytes, None, None]:
         """Stream download a file from GCS.
         
         Args:
@@ -273,17 +437,10 @@ class GCSClient:
         if blob.size != local_size:
             return False, f"Size mismatch: local={local_size}, gcs={blob.size}"
         
-        # Compare MD5 hashes
-        import hashlib
-        with open(local_path, 'rb') as f:
-            local_md5 = hashlib.md5(f.read()).hexdigest()
-        
-        # GCS stores MD5 in base64
-        import base64
-        gcs_md5 = base64.b64decode(blob.md5_hash).hex()
-        
-        if local_md5 != gcs_md5:
-            return False, f"MD5 mismatch: local={local_md5}, gcs={gcs_md5}"
+        # Compare CRC32C checksums
+        local_crc32c = compute_crc32c(local_path)
+        if local_crc32c != blob.crc32c:
+            return False, f"CRC32C mismatch: local={local_crc32c}, gcs={blob.crc32c}"
         
         return True, "Files match"
 
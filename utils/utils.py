@@ -7,21 +7,43 @@ This module provides consolidated utility functions for:
 - Custom exceptions for robust error handling
 """
 
+import asyncio
 import logging
 import os
-import hashlib
 import base64
-from datetime import timezone
-from typing import Optional, Dict, Any, Tuple
+import io
+import json
+import shutil
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Tuple, Union
 from pathlib import Path
+import aiohttp
+import google_crc32c
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from requests.adapters import HTTPAdapter
+from tenacity import AsyncRetrying, retry, stop_after_attempt, wait_exponential
 from google.cloud import storage, logging as cloud_logging
 from google.cloud.exceptions import NotFound, Forbidden, ServiceUnavailable
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - ijson is optional
+    ijson = None
+
 from config.config_loader import get_config
 
 
+# CRC32C computed while downloading, keyed by local path with the (size, mtime_ns)
+# the file had when it was written so stale entries are ignored
+_DOWNLOAD_CRC32C: Dict[str, Tuple[int, int, str]] = {}
+
+
 # Custom Exceptions
 class FranceDataError(Exception):
     """Base exception for France data collection errors."""
@@ -48,6 +70,64 @@ class ValidationError(FranceDataError):
     pass
 
 
+class JsonFormatter(logging.Formatter):
+    """Format log records as single-line JSON for structured logging."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno
+        }
+        if record.exc_info:
+            log_entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(log_entry)
+
+
+# Process-wide logging state: console handlers are shared by every logger and
+# Cloud Logging is attached to the root logger only once
+_console_handlers: Dict[str, logging.Handler] = {}
+_cloud_logging_configured = False
+_logging_lock = threading.Lock()
+
+
+def _get_console_handler(log_format: str) -> logging.Handler:
+    """Return the shared console handler for a log format."""
+    key = "json" if log_format.lower() == "json" else "text"
+    with _logging_lock:
+        handler = _console_handlers.get(key)
+        if handler is None:
+            handler = logging.StreamHandler()
+            if key == "json":
+                handler.setFormatter(JsonFormatter())
+            else:
+                handler.setFormatter(logging.Formatter(
+                    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                    datefmt='%Y-%m-%d %H:%M:%S'
+                ))
+            _console_handlers[key] = handler
+    return handler
+
+
+def _setup_cloud_logging() -> None:
+    """Attach Google Cloud Logging to the root logger once per process."""
+    global _cloud_logging_configured
+    with _logging_lock:
+        if _cloud_logging_configured:
+            return
+        _cloud_logging_configured = True
+        try:
+            client = cloud_logging.Client()
+            client.setup_logging()
+        except Exception as e:
+            # Fallback to console logging if cloud logging fails
+            print(f"Warning: Could not setup Cloud Logging: {e}")
+
+
 def setup_logging(
     name: str,
     level: str = "INFO", 
@@ -56,6 +136,9 @@ def setup_logging(
 ) -> logging.Logger:
     """Setup centralized logging configuration.
     
+    Handlers are created once per process and shared, so calling this for
+    every collector instance only sets the logger level.
+    
     Args:
         name: Logger name (usually module or collector name)
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -70,53 +153,16 @@ def setup_logging(
     """
     try:
         logger = logging.getLogger(name)
-        logger.setLevel(getattr(logging, level.upper()))
-        
-        # Clear existing handlers to avoid duplicates
-        logger.handlers.clear()
+        logger.setLevel(level.upper())
         
-        # Setup Cloud Logging if enabled
         if enable_cloud_logging:
-            try:
-                client = cloud_logging.Client()
-                client.setup_logging()
-            except Exception as e:
-                # Fallback to console logging if cloud logging fails
-                print(f"Warning: Could not setup Cloud Logging: {e}")
-        
-        # Setup console handler
-        console_handler = logging.StreamHandler()
-        
-        if log_format.lower() == "json":
-            # JSON formatter for structured logging
-            import json
-            from datetime import datetime
-            
-            class JsonFormatter(logging.Formatter):
-                def format(self, record):
-                    log_entry = {
-                        'timestamp': datetime.now(timezone.utc).isoformat(),
-                        'level': record.levelname,
-                        'logger': record.name,
-                        'message': record.getMessage(),
-                        'module': record.module,
-                        'function': record.funcName,
-                        'line': record.lineno
-                    }
-                    if record.exc_info:
-                        log_entry['exception'] = self.formatException(record.exc_info)
-                    return json.dumps(log_entry)
-            
-            formatter = JsonFormatter()
-        else:
-            # Text formatter
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
+            _setup_cloud_logging()
         
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        # Replace any existing handlers to avoid duplicates
+        console_handler = _get_console_handler(log_format)
+        if logger.handlers != [console_handler]:
+            logger.handlers.clear()
+            logger.addHandler(console_handler)
         
         # Prevent propagation to root logger to avoid duplicate logs
         logger.propagate = False
@@ -127,6 +173,24 @@ def setup_logging(
         raise ConfigurationError(f"Failed to setup logging for {name}: {e}")
 
 
+def build_http_session(pool_maxsize: int = 20) -> requests.Session:
+    """Create a requests session with a shared connection pool.
+    
+    Retries are left to the tenacity decorators of the download helpers.
+    
+    Args:
+        pool_maxsize: Maximum number of connections kept per host
+        
+    Returns:
+        Configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -136,8 +200,9 @@ def download_file_with_retry(
     url: str,
     local_path: str,
     timeout: int = 300,
-    chunk_size: int = 8192,
-    headers: Optional[Dict[str, str]] = None
+    chunk_size: int = 1024 * 1024,
+    headers: Optional[Dict[str, str]] = None,
+    session: Optional[requests.Session] = None
 ) -> bool:
     """Download a file with exponential backoff retry logic.
     
@@ -147,6 +212,7 @@ def download_file_with_retry(
         timeout: Request timeout in seconds
         chunk_size: Download chunk size in bytes
         headers: Optional HTTP headers
+        session: Optional session to reuse pooled connections
         
     Returns:
         True if successful
@@ -164,7 +230,7 @@ def download_file_with_retry(
         Path(local_path).parent.mkdir(parents=True, exist_ok=True)
         
         # Make request with streaming
-        response = requests.get(
+        response = (session or requests).get(
             url, 
             stream=True, 
             timeout=timeout,
@@ -172,15 +238,11 @@ def download_file_with_retry(
         )
         response.raise_for_status()
         
-        # Download in chunks
+        # Copy the raw stream in large blocks without a Python-level chunk loop
         total_size = int(response.headers.get('content-length', 0))
-        downloaded_size = 0
+        response.raw.decode_content = True
         
-        with open(local_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=chunk_size):
-                if chunk:
-                    f.write(chunk)
-                    downloaded_size += len(chunk)
+        downloaded_size = save_stream(response.raw, local_path, chunk_size)
         
         # Validate download if content-length was provided
         if total_size > 0 and downloaded_size != total_size:
@@ -200,6 +262,125 @@ def download_file_with_retry(
         raise FranceDataError(f"Unexpected error downloading {url}: {e}")
 
 
+async def download_file_async(
+    url: str,
+    local_path: str,
+    timeout: int = 300,
+    chunk_size: int = 1024 * 1024,
+    headers: Optional[Dict[str, str]] = None,
+    max_attempts: int = 3,
+    session: Optional[aiohttp.ClientSession] = None
+) -> bool:
+    """Download a file asynchronously with exponential backoff retry logic.
+    
+    Coroutine counterpart of download_file_with_retry() so that many downloads
+    can share a single event loop and overlap their network latency.
+    
+    Args:
+        url: URL to download from
+        local_path: Local path to save file
+        timeout: Total request timeout in seconds
+        chunk_size: Download chunk size in bytes
+        headers: Optional HTTP headers
+        max_attempts: Maximum number of download attempts
+        session: Optional client session to reuse pooled connections
+        
+    Returns:
+        True if successful
+        
+    Raises:
+        NetworkError: If download fails after all retries
+        ValidationError: If file validation fails
+    """
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(max_attempts),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        reraise=True
+    ):
+        with attempt:
+            return await _download_file_async_once(
+                url, local_path, timeout, chunk_size, headers, session
+            )
+    return False
+
+
+async def _download_file_async_once(
+    url: str,
+    local_path: str,
+    timeout: int,
+    chunk_size: int,
+    headers: Optional[Dict[str, str]],
+    session: Optional[aiohttp.ClientSession]
+) -> bool:
+    """Perform a single asynchronous download attempt."""
+    logger = logging.getLogger(__name__)
+    
+    try:
+        logger.info(f"Downloading {url} to {local_path}")
+        
+        Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        owns_session = session is None
+        if owns_session:
+            session = aiohttp.ClientSession()
+        
+        try:
+            async with session.get(url, headers=headers or {}, timeout=client_timeout) as response:
+                response.raise_for_status()
+                
+                total_size = response.content_length or 0
+                downloaded_size = 0
+                checksum = google_crc32c.Checksum()
+                
+                # Local writes are short compared to network waits, so a plain
+                # file object is used rather than an async file wrapper
+                with open(local_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        f.write(chunk)
+                        checksum.update(chunk)
+                        downloaded_size += len(chunk)
+        finally:
+            if owns_session:
+                await session.close()
+        
+        if total_size > 0 and downloaded_size != total_size:
+            os.remove(local_path)
+            raise ValidationError(
+                f"Download size mismatch: expected {total_size}, got {downloaded_size}"
+            )
+        
+        _remember_crc32c(local_path, checksum)
+        logger.info(f"Successfully downloaded {downloaded_size} bytes to {local_path}")
+        return True
+        
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise NetworkError(f"HTTP request failed for {url}: {e}")
+    except (OSError, IOError) as e:
+        raise StorageError(f"File operation failed for {local_path}: {e}")
+    except FranceDataError:
+        raise
+    except Exception as e:
+        raise FranceDataError(f"Unexpected error downloading {url}: {e}")
+
+
+def _get_bucket(bucket_name: Optional[str] = None) -> storage.Bucket:
+    """Create a bucket handle for the GCS helpers when none is passed in.
+    
+    Args:
+        bucket_name: GCS bucket name (uses config if None)
+        
+    Returns:
+        Bucket handle on a new storage client
+    """
+    if not bucket_name:
+        config = get_config()
+        bucket_name = config.get_required('gcs_config.bucket_name')
+    
+    client = storage.Client()
+    return client.bucket(bucket_name)
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -210,7 +391,9 @@ def upload_to_gcs(
     gcs_path: str,
     bucket_name: Optional[str] = None,
     content_type: Optional[str] = None,
-    check_existing: bool = True
+    check_existing: bool = True,
+    bucket: Optional[storage.Bucket] = None,
+    metadata: Optional[Dict[str, str]] = None
 ) -> bool:
     """Upload a file to Google Cloud Storage with idempotency.
     
@@ -220,6 +403,8 @@ def upload_to_gcs(
         bucket_name: GCS bucket name (uses config if None)
         content_type: MIME type of file
         check_existing: Whether to check if file already exists with same content
+        bucket: Existing bucket handle to reuse instead of creating a client
+        metadata: Custom metadata stored with the object
         
     Returns:
         True if uploaded or already exists with same content
@@ -234,14 +419,9 @@ def upload_to_gcs(
         if not os.path.exists(local_path):
             raise ValidationError(f"Local file does not exist: {local_path}")
         
-        # Get bucket name from config if not provided
-        if not bucket_name:
-            config = get_config()
-            bucket_name = config.get_required('gcs_config.bucket_name')
-        
-        # Initialize GCS client
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
+        if bucket is None:
+            bucket = _get_bucket(bucket_name)
+        bucket_name = bucket.name
         blob = bucket.blob(gcs_path)
         
         # Check if file already exists and compare if requested
@@ -256,6 +436,13 @@ def upload_to_gcs(
         # Set content type if provided
         if content_type:
             blob.content_type = content_type
+        if metadata:
+            blob.metadata = metadata
+        
+        # Let GCS verify the upload against the checksum taken during download
+        crc32c = _cached_crc32c(local_path)
+        if crc32c:
+            blob.crc32c = crc32c
         
         # Upload file
         blob.upload_from_filename(local_path)
@@ -266,17 +453,21 @@ def upload_to_gcs(
         raise StorageError(f"GCS operation failed: {e}")
     except Exception as e:
         raise StorageError(f"Failed to upload {local_path} to {gcs_path}: {e}")
+    finally:
+        forget_crc32c(local_path)
 
 
 def file_exists_in_gcs(
     gcs_path: str,
-    bucket_name: Optional[str] = None
+    bucket_name: Optional[str] = None,
+    bucket: Optional[storage.Bucket] = None
 ) -> bool:
     """Check if a file exists in Google Cloud Storage.
     
     Args:
         gcs_path: Path to check in GCS
         bucket_name: GCS bucket name (uses config if None)
+        bucket: Existing bucket handle to reuse instead of creating a client
         
     Returns:
         True if file exists, False otherwise
@@ -285,12 +476,8 @@ def file_exists_in_gcs(
         StorageError: If GCS operation fails
     """
     try:
-        if not bucket_name:
-            config = get_config()
-            bucket_name = config.get_required('gcs_config.bucket_name')
-        
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
+        if bucket is None:
+            bucket = _get_bucket(bucket_name)
         blob = bucket.blob(gcs_path)
         
         return blob.exists()
@@ -303,13 +490,15 @@ def file_exists_in_gcs(
 
 def get_file_metadata(
     gcs_path: str,
-    bucket_name: Optional[str] = None
+    bucket_name: Optional[str] = None,
+    bucket: Optional[storage.Bucket] = None
 ) -> Optional[Dict[str, Any]]:
     """Get metadata for a file in Google Cloud Storage.
     
     Args:
         gcs_path: Path to file in GCS
         bucket_name: GCS bucket name (uses config if None)
+        bucket: Existing bucket handle to reuse instead of creating a client
         
     Returns:
         Dictionary with file metadata or None if file doesn't exist
@@ -318,12 +507,8 @@ def get_file_metadata(
         StorageError: If GCS operation fails
     """
     try:
-        if not bucket_name:
-            config = get_config()
-            bucket_name = config.get_required('gcs_config.bucket_name')
-        
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
+        if bucket is None:
+            bucket = _get_bucket(bucket_name)
         blob = bucket.blob(gcs_path)
         
         if blob.exists():
@@ -346,6 +531,99 @@ def get_file_metadata(
         raise StorageError(f"Failed to get metadata for {gcs_path}: {e}")
 
 
+def compute_crc32c(local_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Compute the CRC32C checksum of a local file in GCS format.
+    
+    Args:
+        local_path: Path to local file
+        chunk_size: Size of chunks read from the file
+        
+    Returns:
+        Base64-encoded big-endian CRC32C, as in storage.Blob.crc32c
+    """
+    cached = _cached_crc32c(local_path)
+    if cached is not None:
+        return cached
+    
+    checksum = google_crc32c.Checksum()
+    with open(local_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode('ascii')
+
+
+def save_stream(stream: Any, local_path: str, chunk_size: int = 1024 * 1024) -> int:
+    """Write a binary stream to a local file, checksumming it as it is written.
+    
+    The CRC32C is remembered so that compute_crc32c() and upload_to_gcs()
+    do not need to re-read the file. upload_to_gcs() drops it once used;
+    callers that discard the file without uploading it call forget_crc32c().
+    
+    Args:
+        stream: Readable binary stream (e.g. an HTTP response body)
+        local_path: Destination file path
+        chunk_size: Size of the blocks copied from the stream
+        
+    Returns:
+        Number of bytes written
+    """
+    with open(local_path, 'wb') as f:
+        writer = _ChecksumWriter(f)
+        shutil.copyfileobj(stream, writer, length=chunk_size)
+        size = f.tell()
+    
+    _remember_crc32c(local_path, writer.checksum)
+    return size
+
+
+class _ChecksumWriter:
+    """File wrapper that updates a CRC32C checksum with every write."""
+    
+    def __init__(self, f: Any):
+        self._f = f
+        self.checksum = google_crc32c.Checksum()
+    
+    def write(self, data: bytes) -> int:
+        self.checksum.update(data)
+        return self._f.write(data)
+
+
+def _remember_crc32c(local_path: str, checksum: 'google_crc32c.Checksum') -> None:
+    """Record the CRC32C of a file that was just written."""
+    stat = os.stat(local_path)
+    _DOWNLOAD_CRC32C[local_path] = (
+        stat.st_size,
+        stat.st_mtime_ns,
+        base64.b64encode(checksum.digest()).decode('ascii')
+    )
+
+
+def _cached_crc32c(local_path: str) -> Optional[str]:
+    """Return the CRC32C recorded at download time if the file is unchanged."""
+    entry = _DOWNLOAD_CRC32C.get(local_path)
+    if entry is None:
+        return None
+    try:
+        stat = os.stat(local_path)
+    except OSError:
+        forget_crc32c(local_path)
+        return None
+    size, mtime_ns, crc32c = entry
+    if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+        forget_crc32c(local_path)
+        return None
+    return crc32c
+
+
+def forget_crc32c(local_path: str) -> None:
+    """Drop the CRC32C recorded for a downloaded file.
+    
+    Args:
+        local_path: Path passed to save_stream() or the download functions
+    """
+    _DOWNLOAD_CRC32C.pop(local_path, None)
+
+
 def _compare_files_gcs(blob: storage.Blob, local_path: str) -> Tuple[bool, str]:
     """Compare a GCS blob with a local file.
     
@@ -369,15 +647,11 @@ def _compare_files_gcs(blob: storage.Blob, local_path: str) -> Tuple[bool, str]:
         if blob.size != local_size:
             return False, f"Size mismatch: local={local_size}, gcs={blob.size}"
         
-        # Compare MD5 hashes
-        with open(local_path, 'rb') as f:
-            local_md5 = hashlib.md5(f.read()).hexdigest()
-        
-        # GCS stores MD5 in base64, convert to hex
-        if blob.md5_hash:
-            gcs_md5 = base64.b64decode(blob.md5_hash).hex()
-            if local_md5 != gcs_md5:
-                return False, f"MD5 mismatch: local={local_md5}, gcs={gcs_md5}"
+        # Compare CRC32C checksums (stored for every object, including composites)
+        if blob.crc32c:
+            local_crc32c = compute_crc32c(local_path)
+            if local_crc32c != blob.crc32c:
+                return False, f"CRC32C mismatch: local={local_crc32c}, gcs={blob.crc32c}"
         
         return True, "Files match"
         
@@ -385,6 +659,63 @@ def _compare_files_gcs(blob: storage.Blob, local_path: str) -> Tuple[bool, str]:
         return False, f"Comparison failed: {e}"
 
 
+def dumps_json(data: Any, indent: bool = False) -> bytes:
+    """Serialize data to UTF-8 encoded JSON.
+    
+    Uses orjson when available and falls back to the standard library.
+    
+    Args:
+        data: JSON-serializable object
+        indent: Pretty-print with a two-space indent instead of compact output
+        
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads_json(data: Any) -> Any:
+    """Deserialize a JSON document.
+    
+    Args:
+        data: JSON document as bytes or str
+        
+    Returns:
+        Decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def extract_json_field(source: Union[str, bytes], field: str) -> Any:
+    """Read a single top-level field from a JSON document.
+    
+    With ijson the document is pull-parsed and reading stops as soon as the
+    field is found; otherwise the whole document is decoded.
+    
+    Args:
+        source: Path to a JSON file, or the document content as bytes
+        field: Name of the top-level field
+        
+    Returns:
+        Field value, or None if the field is absent
+    """
+    if isinstance(source, bytes):
+        if ijson is not None:
+            return next(ijson.items(io.BytesIO(source), field), None)
+        return loads_json(source).get(field)
+    
+    with open(source, 'rb') as f:
+        if ijson is not None:
+            return next(ijson.items(f, field), None)
+        return loads_json(f.read()).get(field)
+
+
 def validate_environment() -> Dict[str, Any]:
     """Validate that all required environment variables and dependencies are available.
     
@@ -425,6 +756,13 @@ def validate_environment() -> Dict[str, Any]:
             results['errors'].append(f"GCS credentials issue: {e}")
             results['checks']['gcs_credentials'] = False
         
+        # Check that CRC32C runs in the C extension (the Python fallback is far slower)
+        results['checks']['crc32c_c_extension'] = google_crc32c.implementation == 'c'
+        if not results['checks']['crc32c_c_extension']:
+            results['warnings'].append(
+                "google-crc32c is using its pure Python implementation; checksums will be slow"
+            )
+        
         # Check data source configurations
         data_sources = ['dvf', 'sirene', 'insee_contours', 'plu']
         for source in data_sources: